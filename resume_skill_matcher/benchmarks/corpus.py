@@ -0,0 +1,209 @@
+"""
+Deterministic synthetic resume / job description corpus.
+
+Skills come from skills.csv, MASTER_SKILLS and ROLE_KEYWORDS, so every
+extractor in the project finds something. The same seed and sizes always
+produce the same text.
+
+    python benchmarks/corpus.py out_dir --pairs 20 --resume-words 600 --formats txt docx pdf
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from skills.master_skills import MASTER_SKILLS  # noqa: E402
+
+FORMATS = ("txt", "docx", "pdf")
+
+FILLER = (
+    "delivered features on schedule while working closely with product and design teams",
+    "improved reliability of internal services and reduced support tickets",
+    "mentored new team members and reviewed code for quality and clarity",
+    "documented processes and shared knowledge across teams",
+    "collaborated with stakeholders to refine requirements and priorities",
+)
+
+SENIORITY = ("intern", "junior", "2-4 years", "senior")
+
+REQUIREMENT_TEMPLATES = (
+    "Must have hands-on experience with {skill}",
+    "Knowledge of {skill} is required",
+    "Should have proficiency in {skill}",
+    "Ability to build production systems using {skill}",
+    "Responsible for maintaining services written in {skill}",
+)
+
+
+# =====================
+# VOCABULARY
+# =====================
+def load_vocabulary(csv_path=os.path.join(PROJECT_DIR, "skills.csv")):
+    """Every skill name and alias the extractors know, plus role keywords."""
+    from matcher.utils import ROLE_KEYWORDS
+
+    skills = set()
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            skills.add(row["skill"].strip().lower())
+            skills.update(a.strip().lower() for a in (row.get("aliases") or "").split("|") if a.strip())
+    for aliases in MASTER_SKILLS.values():
+        skills.update(aliases)
+
+    return {
+        "skills": sorted(skills),
+        "roles": {role: list(keywords) for role, keywords in sorted(ROLE_KEYWORDS.items())},
+    }
+
+
+# =====================
+# TEXT
+# =====================
+def _sentences(rng, words, skills, density):
+    """Filler sentences where roughly `density` of sentences mention a skill."""
+    out = []
+    count = 0
+    while count < words:
+        sentence = rng.choice(FILLER)
+        if rng.random() < density:
+            sentence += f" using {rng.choice(skills)}"
+        out.append(sentence[0].upper() + sentence[1:] + ".")
+        count += len(sentence.split())
+    return out
+
+
+def make_resume(rng, vocab, role, words=600, skill_density=0.3):
+    keywords = vocab["roles"][role]
+    skills = rng.sample(vocab["skills"], k=min(12, len(vocab["skills"]))) + keywords
+    body = _sentences(rng, words, skills, skill_density)
+    third = max(1, len(body) // 3)
+
+    return "\n".join([
+        "SUMMARY",
+        f"{rng.choice(SENIORITY).title()} {role.lower()} focused on {', '.join(keywords[:3])}.",
+        "",
+        "SKILLS",
+        ", ".join(sorted(set(skills))),
+        "",
+        "EXPERIENCE",
+        *body[:third],
+        "",
+        "PROJECTS",
+        *body[third:2 * third],
+        "",
+        "EDUCATION",
+        "Bachelor of Technology in Computer Science.",
+        *body[2 * third:],
+    ])
+
+
+def make_jd(rng, vocab, role, words=300, skill_density=0.3):
+    keywords = vocab["roles"][role]
+    skills = rng.sample(vocab["skills"], k=min(8, len(vocab["skills"]))) + keywords
+    requirements = [
+        rng.choice(REQUIREMENT_TEMPLATES).format(skill=skill) + "."
+        for skill in skills[:max(3, int(len(skills) * skill_density * 2))]
+    ]
+    return "\n".join([
+        f"{role} ({rng.choice(SENIORITY)})",
+        "",
+        "RESPONSIBILITIES",
+        *_sentences(rng, words, skills, skill_density),
+        "",
+        "REQUIREMENTS",
+        *requirements,
+    ])
+
+
+# =====================
+# FILES
+# =====================
+def write_document(text, path):
+    """Writes text as .txt, .docx or .pdf depending on the extension."""
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".txt":
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    elif ext == ".docx":
+        from docx import Document
+
+        doc = Document()
+        for line in text.split("\n"):
+            doc.add_paragraph(line)
+        doc.save(path)
+
+    elif ext == ".pdf":
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
+        c = canvas.Canvas(path, pagesize=A4)
+        y = A4[1] - 50
+        for line in text.split("\n"):
+            # crude wrap at ~95 characters, enough for text extraction
+            for start in range(0, max(len(line), 1), 95):
+                if y < 50:
+                    c.showPage()
+                    y = A4[1] - 50
+                c.drawString(40, y, line[start:start + 95])
+                y -= 14
+        c.save()
+
+    else:
+        raise ValueError(f"Unsupported format: {ext}")
+
+
+def generate_corpus(out_dir, pairs=10, resume_words=600, jd_words=300,
+                    skill_density=0.3, formats=FORMATS, seed=1234):
+    """
+    Writes `pairs` resume/JD pairs in each format and returns
+    [{"id", "role", "format", "resume", "jd"}, ...].
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    vocab = load_vocabulary()
+    rng = random.Random(seed)
+    roles = sorted(vocab["roles"])
+
+    corpus = []
+    for i in range(pairs):
+        role = roles[i % len(roles)]
+        resume = make_resume(rng, vocab, role, resume_words, skill_density)
+        jd = make_jd(rng, vocab, role, jd_words, skill_density)
+
+        for fmt in formats:
+            resume_path = os.path.join(out_dir, f"resume_{i:04d}.{fmt}")
+            jd_path = os.path.join(out_dir, f"jd_{i:04d}.{fmt}")
+            write_document(resume, resume_path)
+            write_document(jd, jd_path)
+            corpus.append({"id": i, "role": role, "format": fmt, "resume": resume_path, "jd": jd_path})
+
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--pairs", type=int, default=10)
+    parser.add_argument("--resume-words", type=int, default=600)
+    parser.add_argument("--jd-words", type=int, default=300)
+    parser.add_argument("--skill-density", type=float, default=0.3)
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS)
+    parser.add_argument("--seed", type=int, default=1234)
+    options = parser.parse_args()
+
+    corpus = generate_corpus(
+        options.out_dir, options.pairs, options.resume_words, options.jd_words,
+        options.skill_density, options.formats, options.seed,
+    )
+    print(f"Wrote {len(corpus)} resume/JD pairs to {options.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
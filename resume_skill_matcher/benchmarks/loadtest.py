@@ -0,0 +1,365 @@
+"""
+Open-loop load driver for the upload, chat and report-download flows.
+
+Requests are scheduled at a fixed rate whether or not earlier ones have
+finished, and latency is measured from each request's scheduled start,
+so a saturated server shows up as latency instead of a lower send rate.
+Every virtual user keeps its own login session and has at most one
+request in flight.
+
+    python benchmarks/stubs.py &
+    set -a; . benchmarks/loadtest.env; set +a; python manage.py runserver --noreload &
+    python benchmarks/loadtest.py --create-users 8 --rps 4 --duration 120 \\
+        --mix upload=1 chat=3 chat_stream=1 report=2 --output load.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+# Answers the views send when the LLM backend failed or was rate limited;
+# they arrive with HTTP 200 but count as errors here
+FALLBACK_MARKERS = (
+    "Sorry, I couldn't reach the AI server",
+    "the AI server stopped responding",
+    "handling a lot of questions",
+    "AI error:",
+    "[stream error:",
+)
+QUESTIONS = (
+    "How can I improve my resume summary?",
+    "Which skills from the job description am I missing?",
+    "How should I describe my last project?",
+    "Is my experience section too long?",
+    "What should I learn next for this role?",
+)
+DEFAULT_MIX = {"upload": 1, "chat": 3, "chat_stream": 1, "report": 2}
+USER_PASSWORD = "load-test-password"
+
+
+class FlowError(Exception):
+    """A flow finished but its response counts as a failure."""
+
+
+# =====================
+# RESULTS
+# =====================
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class Recorder:
+    """Per-flow latencies and error reasons, safe across threads."""
+
+    def __init__(self):
+        self._samples = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, flow, ms, error=None):
+        with self._lock:
+            self._samples.setdefault(flow, []).append(ms)
+            if error is not None:
+                reasons = self._errors.setdefault(flow, {})
+                reasons[error] = reasons.get(error, 0) + 1
+
+    def summary(self, elapsed):
+        with self._lock:
+            flows = {flow: sorted(samples) for flow, samples in self._samples.items()}
+            errors = {flow: dict(reasons) for flow, reasons in self._errors.items()}
+
+        out = {}
+        for flow, ordered in sorted(flows.items()):
+            failed = sum(errors.get(flow, {}).values())
+            out[flow] = {
+                "requests": len(ordered),
+                "errors": failed,
+                "error_rate": round(failed / len(ordered), 4),
+                "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(ordered, 0.50), 1),
+                "p95_ms": round(percentile(ordered, 0.95), 1),
+                "p99_ms": round(percentile(ordered, 0.99), 1),
+                "max_ms": round(ordered[-1], 1),
+                "error_reasons": errors.get(flow, {}),
+            }
+        return out
+
+
+# =====================
+# SCHEDULER
+# =====================
+def run_load(users, flows, mix, rps, duration, seed=None, recorder=None):
+    """
+    Issues rps requests per second for duration seconds. Each request
+    picks a flow by the weights in mix and runs flows[name](user) on an
+    idle user. Returns (summary, elapsed seconds).
+    """
+    recorder = recorder or Recorder()
+    rng = random.Random(seed)
+    names = [name for name in mix if mix[name] > 0]
+    weights = [mix[name] for name in names]
+
+    idle = queue.Queue()
+    for user in users:
+        idle.put(user)
+
+    def execute(name, scheduled):
+        user = idle.get()
+        error = None
+        try:
+            flows[name](user)
+        except FlowError as e:
+            error = str(e)
+        except Exception as e:
+            error = type(e).__name__
+        finally:
+            idle.put(user)
+        recorder.record(name, (time.perf_counter() - scheduled) * 1000, error)
+
+    total = max(1, int(rps * duration))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(users))) as pool:
+        for i in range(total):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(execute, rng.choices(names, weights)[0], scheduled)
+    elapsed = time.perf_counter() - start
+    return recorder.summary(elapsed), elapsed
+
+
+# =====================
+# FLOWS
+# =====================
+class VirtualUser:
+    """One logged-in browser session against the app."""
+
+    def __init__(self, base_url, email, password=USER_PASSWORD, corpus=(), timeout=120):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.email = email
+        self.password = password
+        self.corpus = list(corpus)
+        self.timeout = timeout
+        self.http = requests.Session()
+        self.chat_session_id = None
+        self._docs = itertools.cycle(self.corpus) if self.corpus else None
+        self._questions = itertools.count()
+
+    def _url(self, path):
+        return self.base_url + path
+
+    def _csrf(self):
+        return {"X-CSRFToken": self.http.cookies.get("csrftoken", ""), "Referer": self._url("/")}
+
+    def login(self):
+        self.http.get(self._url("/accounts/login/"), timeout=self.timeout)
+        response = self.http.post(
+            self._url("/accounts/login/"),
+            data={"login": self.email, "password": self.password},
+            headers=self._csrf(),
+            timeout=self.timeout,
+        )
+        if "sessionid" not in self.http.cookies:
+            raise FlowError(f"login failed for {self.email} ({response.status_code})")
+
+    def upload(self):
+        doc = next(self._docs)
+        if "csrftoken" not in self.http.cookies:
+            self.http.get(self._url("/"), timeout=self.timeout)
+        with open(doc["resume"], "rb") as resume, open(doc["jd"], "rb") as jd:
+            response = self.http.post(
+                self._url("/"),
+                files={"resume_file": resume, "jd_file": jd},
+                headers=self._csrf(),
+                timeout=self.timeout,
+            )
+        if response.status_code != 200:
+            raise FlowError(f"HTTP {response.status_code}")
+
+    def _question(self):
+        # Numbered so the answer cache does not turn the test into cache hits
+        n = next(self._questions)
+        return f"{QUESTIONS[n % len(QUESTIONS)]} ({self.email} #{n})"
+
+    def chat(self):
+        response = self.http.post(
+            self._url("/chatbot/api/"),
+            json={"question": self._question(), "session_id": self.chat_session_id},
+            headers=self._csrf(),
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise FlowError(f"HTTP {response.status_code}")
+        data = response.json()
+        self.chat_session_id = data.get("session_id")
+        _check_answer(data.get("answer", ""))
+
+    def chat_stream(self):
+        with self.http.post(
+            self._url("/chatbot/api/stream/"),
+            json={"question": self._question(), "session_id": self.chat_session_id},
+            headers=self._csrf(),
+            stream=True,
+            timeout=self.timeout,
+        ) as response:
+            if response.status_code != 200:
+                raise FlowError(f"HTTP {response.status_code}")
+            self.chat_session_id = response.headers.get("X-Chat-Session-Id")
+            answer = "".join(response.iter_content(chunk_size=None, decode_unicode=True))
+        _check_answer(answer)
+
+    def report(self, fmt="pdf"):
+        response = self.http.get(self._url(f"/download-report/?format={fmt}"), timeout=self.timeout)
+        if response.status_code != 200:
+            raise FlowError(f"HTTP {response.status_code}")
+
+
+def _check_answer(answer):
+    if not answer:
+        raise FlowError("empty answer")
+    for marker in FALLBACK_MARKERS:
+        if marker in answer:
+            raise FlowError("fallback answer")
+
+
+FLOWS = {
+    "upload": VirtualUser.upload,
+    "chat": VirtualUser.chat,
+    "chat_stream": VirtualUser.chat_stream,
+    "report": VirtualUser.report,
+}
+
+
+# =====================
+# SETUP
+# =====================
+def create_users(count, prefix="loadtest"):
+    """Creates (or resets) count users in the app's database; returns their emails."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "resume_skill_matcher.settings")
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import User
+
+    emails = []
+    for i in range(count):
+        email = f"{prefix}{i}@example.com"
+        user, _ = User.objects.get_or_create(username=f"{prefix}{i}", defaults={"email": email})
+        user.email = email
+        user.set_password(USER_PASSWORD)
+        user.save()
+        emails.append(email)
+    return emails
+
+
+def prepare_users(base_url, emails, corpus, password=USER_PASSWORD):
+    """Logs every user in and runs one upload so report downloads have data."""
+    users = []
+    for i, email in enumerate(emails):
+        user = VirtualUser(base_url, email, password, corpus[i:] + corpus[:i])
+        user.login()
+        user.upload()
+        users.append(user)
+    return users
+
+
+def parse_mix(items):
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in FLOWS:
+            raise argparse.ArgumentTypeError(f"unknown flow {name!r}; choose from {', '.join(FLOWS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# =====================
+# CLI
+# =====================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rps", type=float, default=2)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--mix", nargs="+", default=[f"{k}={v}" for k, v in DEFAULT_MIX.items()],
+                        help="flow=weight pairs")
+    parser.add_argument("--users", nargs="*", default=[], help="emails of existing users (password: --password)")
+    parser.add_argument("--password", default=USER_PASSWORD)
+    parser.add_argument("--create-users", type=int, default=0,
+                        help="create N users in the app database first (needs Django settings)")
+    parser.add_argument("--pairs", type=int, default=10, help="synthetic resume/JD pairs to upload")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--max-error-rate", type=float, help="exit 1 if any flow's error rate is higher")
+    parser.add_argument("--max-p95-ms", type=float, help="exit 1 if any flow's p95 is higher")
+    options = parser.parse_args()
+
+    from benchmarks.corpus import generate_corpus
+
+    mix = parse_mix(options.mix)
+    emails = list(options.users)
+    password = options.password
+    if options.create_users:
+        emails += create_users(options.create_users)
+        password = USER_PASSWORD
+    if not emails:
+        parser.error("give --users or --create-users")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = generate_corpus(tmp, pairs=options.pairs, formats=["pdf", "docx"], seed=options.seed)
+        print(f"Preparing {len(emails)} users...", file=sys.stderr)
+        users = prepare_users(options.base_url, emails, corpus, password)
+        print(f"Running {options.rps} rps for {options.duration:.0f}s...", file=sys.stderr)
+        results, elapsed = run_load(users, FLOWS, mix, options.rps, options.duration, options.seed)
+
+    print(f"{'flow':<12} {'reqs':>6} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for flow, stats in results.items():
+        print(f"{flow:<12} {stats['requests']:>6} {stats['error_rate'] * 100:>5.1f}% "
+              f"{stats['p50_ms']:>8.0f} {stats['p95_ms']:>8.0f} {stats['p99_ms']:>8.0f}")
+
+    if options.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "base_url": options.base_url,
+                "target_rps": options.rps,
+                "duration": options.duration,
+                "elapsed": round(elapsed, 2),
+                "users": len(users),
+                "mix": mix,
+            },
+            "results": results,
+        }
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failed = [
+        flow for flow, stats in results.items()
+        if (options.max_error_rate is not None and stats["error_rate"] > options.max_error_rate)
+        or (options.max_p95_ms is not None and stats["p95_ms"] > options.max_p95_ms)
+    ]
+    for flow in failed:
+        print(f"OVER BUDGET: {flow}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Benchmark harness for the matching pipeline.
+
+Builds a synthetic corpus (benchmarks/corpus.py) in a temp dir, runs each
+benchmark against a throwaway test database with the LLM calls stubbed,
+writes the timings as JSON and exits non-zero when a median exceeds
+benchmarks/thresholds.json or regresses against a baseline run. The
+thresholds are about three times the slowest median of a few clean runs,
+so only real regressions trip them; re-measure when the pipeline changes.
+
+    python benchmarks/run.py --pairs 10 --repeat 5 --output bench.json
+    python benchmarks/run.py --baseline bench.json --tolerance 0.25
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+STUB_FEEDBACK = "SECTION: Overall Fit\nGood match.\n\nSECTION: Improvements\n- Add metrics."
+
+
+# =====================
+# TIMING
+# =====================
+def time_calls(fn, items, repeat=5, warmup=1):
+    """Per-call timings of fn(item) over every item, repeated."""
+    for item in items[:warmup]:
+        fn(item)
+
+    samples = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            fn(item)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+# =====================
+# BENCHMARKS
+# =====================
+def build_cases(corpus, media_root):
+    """[(name, items, fn)] for every benchmark over the given corpus."""
+    from unittest import mock
+
+    from django.contrib.auth.models import User
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test import Client, override_settings
+
+    from matcher.reports.render import render_report
+    from matcher.utils import (
+        ats_scorecard, calculate_match_score, extract_requirements, extract_skills,
+        extract_text_from_file, requirement_match_score,
+    )
+    from skills.utils import extract_skills_from_text
+
+    cases = []
+    formats = sorted({doc["format"] for doc in corpus})
+    for fmt in formats:
+        paths = [doc["resume"] for doc in corpus if doc["format"] == fmt]
+        cases.append((f"extract_text_from_file[{fmt}]", paths, extract_text_from_file))
+
+    base = [doc for doc in corpus if doc["format"] == formats[0]]
+    pairs = []
+    for doc in base:
+        resume_text = extract_text_from_file(doc["resume"])
+        jd_text = extract_text_from_file(doc["jd"])
+        resume_skills = extract_skills(resume_text)
+        jd_skills = extract_skills(jd_text)
+        pairs.append({
+            "resume_text": resume_text,
+            "jd_text": jd_text,
+            "resume_skills": resume_skills,
+            "jd_skills": jd_skills,
+            "requirements": extract_requirements(jd_text),
+        })
+
+    texts = [p["resume_text"] for p in pairs]
+    cases += [
+        ("extract_skills", texts, extract_skills),
+        ("skills.extract_skills_from_text", texts, extract_skills_from_text),
+        ("ats_scorecard", pairs, lambda p: ats_scorecard(
+            p["resume_text"], p["jd_text"], p["resume_skills"], p["jd_skills"])),
+        ("requirement_match_score", pairs, lambda p: requirement_match_score(
+            p["resume_text"], p["requirements"])),
+    ]
+
+    contexts = []
+    for p in pairs:
+        ats_scores, ats_insights = ats_scorecard(p["resume_text"], p["jd_text"], p["resume_skills"], p["jd_skills"])
+        score = calculate_match_score(p["resume_skills"], p["jd_skills"])
+        contexts.append({
+            "score": score,
+            "confidence_level": "High" if score >= 75 else "Medium" if score >= 50 else "Low",
+            "skills": p["resume_skills"],
+            "missing_skills": sorted(set(p["jd_skills"]) - set(p["resume_skills"])),
+            "section_scores": {"technical": min(100, score + 10), "experience": score, "ats": min(100, score + 20)},
+            "ats_scores": ats_scores,
+            "ats_insights": ats_insights,
+            "warnings": [{"level": "warning", "message": "Synthetic benchmark warning."}],
+            "recruiter_feedback": STUB_FEEDBACK,
+        })
+    for fmt in ("pdf", "docx"):
+        cases.append((f"report[{fmt}]", contexts, lambda ctx, fmt=fmt: render_report(fmt, ctx)))
+
+    user, _ = User.objects.get_or_create(username="benchmark")
+    client = Client()
+    client.force_login(user)
+
+    def upload(doc):
+        with open(doc["resume"], "rb") as r, open(doc["jd"], "rb") as j:
+            files = {
+                "resume_file": SimpleUploadedFile(os.path.basename(doc["resume"]), r.read()),
+                "jd_file": SimpleUploadedFile(os.path.basename(doc["jd"]), j.read()),
+            }
+        with override_settings(MEDIA_ROOT=media_root), \
+                mock.patch("matcher.pipeline.recruiter_resume_feedback", return_value=STUB_FEEDBACK):
+            response = client.post("/", files)
+        if response.status_code != 200:
+            raise RuntimeError(f"upload pipeline returned {response.status_code}")
+
+    for fmt in formats:
+        cases.append((f"upload_pipeline[{fmt}]", [d for d in corpus if d["format"] == fmt], upload))
+
+    return cases
+
+
+def selected(name, patterns):
+    """
+    Whether --only picks benchmark name. Names contain brackets
+    ("report[pdf]"), which fnmatch reads as a character class, so a
+    pattern equal to the name always matches before fnmatch is tried.
+    """
+    return any(name == pattern or fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def run_benchmarks(corpus, media_root, repeat=5, only=None):
+    cases = build_cases(corpus, media_root)
+    if only:
+        cases = [case for case in cases if selected(case[0], only)]
+        if not cases:
+            raise ValueError(f"--only {' '.join(only)} matches no benchmark")
+
+    results = {}
+    for name, items, fn in cases:
+        results[name] = time_calls(fn, items, repeat=repeat)
+    return results
+
+
+# =====================
+# REGRESSION CHECKS
+# =====================
+def check_regressions(results, thresholds=None, baseline=None, tolerance=0.25):
+    """Human-readable list of benchmarks over their threshold or baseline."""
+    problems = []
+    for name, stats in sorted(results.items()):
+        limit = (thresholds or {}).get(name, {}).get("median_ms")
+        if limit is not None and stats["median_ms"] > limit:
+            problems.append(f"{name}: median {stats['median_ms']} ms > threshold {limit} ms")
+
+        previous = (baseline or {}).get(name)
+        if previous and stats["median_ms"] > previous["median_ms"] * (1 + tolerance):
+            problems.append(
+                f"{name}: median {stats['median_ms']} ms > baseline "
+                f"{previous['median_ms']} ms +{int(tolerance * 100)}%"
+            )
+    return problems
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# =====================
+# CLI
+# =====================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=10)
+    parser.add_argument("--resume-words", type=int, default=600)
+    parser.add_argument("--jd-words", type=int, default=300)
+    parser.add_argument("--skill-density", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="names or fnmatch patterns of benchmarks to run")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    options = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "resume_skill_matcher.settings")
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from benchmarks.corpus import generate_corpus
+
+    setup_test_environment()
+    old_db_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        call_command("import_skills", os.path.join(PROJECT_DIR, "skills.csv"), stdout=open(os.devnull, "w"))
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = generate_corpus(
+                os.path.join(tmp, "corpus"), options.pairs, options.resume_words,
+                options.jd_words, options.skill_density, seed=options.seed,
+            )
+            try:
+                results = run_benchmarks(corpus, os.path.join(tmp, "media"), options.repeat, options.only)
+            except ValueError as e:
+                parser.error(str(e))
+    finally:
+        connection.creation.destroy_test_db(old_db_name, verbosity=0)
+        teardown_test_environment()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pairs": options.pairs,
+            "resume_words": options.resume_words,
+            "jd_words": options.jd_words,
+            "skill_density": options.skill_density,
+            "seed": options.seed,
+            "repeat": options.repeat,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    thresholds = load_json(options.thresholds) if os.path.exists(options.thresholds) else {}
+    baseline = load_json(options.baseline)["results"] if options.baseline else None
+    problems = check_regressions(results, thresholds, baseline, options.tolerance)
+    for problem in problems:
+        print("REGRESSION:", problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
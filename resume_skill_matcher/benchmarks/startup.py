@@ -0,0 +1,128 @@
+"""
+Startup benchmark: import time and peak memory of `manage.py check`.
+
+Every worker boot and management command pays this cost, so it is kept
+under a budget (enforced by matcher.tests.StartupBudgetTests).
+
+    python benchmarks/startup.py [--top 15] [manage.py args...]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1000"))
+RSS_BUDGET_MB = float(os.getenv("STARTUP_RSS_BUDGET_MB", "120"))
+
+# Must only be imported by the code paths that use them
+HEAVY_MODULES = (
+    "google.genai",
+    "sklearn",
+    "scipy",
+    "matplotlib",
+    "reportlab",
+    "pdfplumber",
+    "docx",
+    "langchain_community",
+)
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+# Runs manage.py and reports the process's own peak RSS. Measured from
+# inside because a forked child's rusage also counts the parent's pages.
+WRAPPER = """
+import runpy, sys
+sys.argv = ["manage.py", *sys.argv[1:]]
+try:
+    runpy.run_path("manage.py", run_name="__main__")
+finally:
+    try:
+        with open("/proc/self/status") as f:
+            peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    except OSError:
+        import resource
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            peak_kb //= 1024
+    sys.stderr.write(f"peak rss kb: {peak_kb}\\n")
+"""
+PEAK_RE = re.compile(r"^peak rss kb: (\d+)$", re.M)
+
+
+def measure(args=("check",)):
+    """
+    Runs manage.py with -X importtime and returns
+    {"import_ms", "rss_mb", "modules": {name: (self_us, cumulative_us)},
+     "top": [(cumulative_us, name), ...] for top-level imports}.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", WRAPPER, *args],
+        cwd=PROJECT_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    stderr = proc.stderr
+    if proc.returncode:
+        raise RuntimeError(f"manage.py {' '.join(args)} failed:\n{stderr[-2000:]}")
+
+    modules = {}
+    top = []
+    total_us = 0
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = (int(self_us), int(cumulative_us))
+        total_us += int(self_us)
+        if len(indent) == 1:
+            top.append((int(cumulative_us), name))
+
+    rss_kb = int(PEAK_RE.search(stderr).group(1))
+    return {
+        "import_ms": round(total_us / 1000, 1),
+        "rss_mb": round(rss_kb / 1024, 1),
+        "modules": modules,
+        "top": sorted(top, reverse=True),
+    }
+
+
+def heavy_modules_loaded(result):
+    """Entries of HEAVY_MODULES that were imported (or had a submodule imported)."""
+    return [
+        heavy for heavy in HEAVY_MODULES
+        if any(name == heavy or name.startswith(heavy + ".") for name in result["modules"])
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("manage_args", nargs="*", default=["check"])
+    options = parser.parse_args()
+
+    result = measure(options.manage_args)
+
+    print(f"manage.py {' '.join(options.manage_args)}")
+    print(f"  imports: {result['import_ms']} ms (budget {IMPORT_BUDGET_MS} ms)")
+    print(f"  peak RSS: {result['rss_mb']} MB (budget {RSS_BUDGET_MB} MB)")
+    print("\nSlowest top-level imports:")
+    for cumulative_us, name in result["top"][:options.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    heavy = heavy_modules_loaded(result)
+    if heavy:
+        print("\nHeavy modules loaded at startup:", ", ".join(heavy))
+
+    over = result["import_ms"] > IMPORT_BUDGET_MS or result["rss_mb"] > RSS_BUDGET_MB
+    return 1 if over or heavy else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
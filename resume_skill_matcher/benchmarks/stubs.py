@@ -0,0 +1,208 @@
+"""
+Local stand-ins for the two LLM backends, for load tests without quotas.
+
+One HTTP server answers both contracts:
+
+    POST /v1beta/models/<model>:generateContent   Gemini (google-genai client)
+    POST /chat, POST /chat/stream, GET /           chatbot/app.py
+
+Each backend has its own latency (mean and jitter, in ms) and error rate.
+Point the app at it with the variables in benchmarks/loadtest.env.
+
+    python benchmarks/stubs.py --port 8765 --chat-latency 1200 --chat-error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GEMINI_PATH = re.compile(r"^/v1(beta)?/models/[^/:]+:generateContent$")
+
+FEEDBACK_TEXT = (
+    "SECTION: Overall Fit\n"
+    "- The resume covers most of the core requirements.\n\n"
+    "SECTION: Improvements\n"
+    "- Quantify impact in recent roles.\n"
+    "- Mirror the job description's keywords.\n\n"
+    "SECTION: Missing Skills (if any)\n"
+    "- None critical."
+)
+CHAT_ANSWER = (
+    "Focus your summary on the role you are applying for, lead each bullet with "
+    "an action verb and add a measurable result wherever you can."
+)
+
+
+# =====================
+# BEHAVIOUR
+# =====================
+class Backend:
+    """Latency and error injection for one stubbed service."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_status=503,
+                 token_delay_ms=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_delay_ms = token_delay_ms
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next_call(self):
+        """(delay in seconds, fail?) for the next request."""
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms)) / 1000
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors}
+
+
+# =====================
+# HANDLER
+# =====================
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return None
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/":
+            self._send_json(200, {"status": "ok", "stub": True})
+        elif self.path == "/stats":
+            self._send_json(200, {name: b.stats() for name, b in self.server.backends.items()})
+        else:
+            self._send_json(404, {"detail": "Not Found"})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        body = self._read_json()
+        if body is None:
+            self._send_json(400, {"detail": "Invalid JSON"})
+        elif GEMINI_PATH.match(path):
+            self._gemini()
+        elif path == "/chat":
+            self._chat(stream=False)
+        elif path == "/chat/stream":
+            self._chat(stream=True)
+        else:
+            self._send_json(404, {"detail": "Not Found"})
+
+    def _gemini(self):
+        delay, fail = self.server.backends["gemini"].next_call()
+        time.sleep(delay)
+        status = self.server.backends["gemini"].error_status
+        if fail:
+            self._send_json(status, {"error": {"code": status, "message": "Injected stub error", "status": "UNAVAILABLE"}})
+            return
+        self._send_json(200, {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": FEEDBACK_TEXT}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0, "totalTokenCount": 0},
+        })
+
+    def _chat(self, stream):
+        backend = self.server.backends["chat"]
+        delay, fail = backend.next_call()
+        time.sleep(delay)
+        if fail:
+            self._send_json(backend.error_status, {"detail": "Injected stub error"})
+            return
+        if not stream:
+            self._send_json(200, {"answer": CHAT_ANSWER})
+            return
+
+        # Word-by-word chunks, like the real token stream
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for word in CHAT_ANSWER.split(" "):
+            data = (word + " ").encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+            time.sleep(backend.token_delay_ms / 1000)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, gemini=None, chat=None, verbose=False):
+        self.backends = {"gemini": gemini or Backend(), "chat": chat or Backend()}
+        self.verbose = verbose
+        super().__init__(address, StubHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+# =====================
+# CLI
+# =====================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--verbose", action="store_true")
+    for name, latency, status in (("gemini", 800, 503), ("chat", 1500, 500)):
+        parser.add_argument(f"--{name}-latency", type=float, default=latency, help="mean ms")
+        parser.add_argument(f"--{name}-jitter", type=float, default=latency / 4, help="std dev ms")
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0)
+        parser.add_argument(f"--{name}-error-status", type=int, default=status)
+    parser.add_argument("--chat-token-delay", type=float, default=20, help="ms between streamed words")
+    options = parser.parse_args()
+
+    gemini = Backend(options.gemini_latency, options.gemini_jitter, options.gemini_error_rate,
+                     options.gemini_error_status, seed=options.seed)
+    chat = Backend(options.chat_latency, options.chat_jitter, options.chat_error_rate,
+                   options.chat_error_status, options.chat_token_delay, seed=options.seed)
+    server = StubServer((options.host, options.port), gemini, chat, options.verbose)
+    print(f"LLM stubs listening on {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 import os
-from fastapi import FastAPI, HTTPException
+import time
+import asyncio
+import hashlib
+from collections import deque
+from types import SimpleNamespace
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
-from huggingface_hub import InferenceClient
+from huggingface_hub import AsyncInferenceClient
 from fastapi.responses import StreamingResponse
 
 # =====================
@@ -13,14 +19,23 @@ HF_TOKEN = os.environ.get("HF_TOKEN")
 if not HF_TOKEN:
     raise RuntimeError("HF_TOKEN environment variable not set")
 
-client = InferenceClient(
+# Prefix of the trailer a stream ends with when generation failed midway;
+# the Django proxy looks for it to keep failed answers out of its cache
+STREAM_ERROR_MARKER = "[stream error:"
+
+# Generations allowed to run against the model at the same time
+MAX_CONCURRENT_GENERATIONS = int(os.environ.get("MAX_CONCURRENT_GENERATIONS", "4"))
+# Requests allowed to wait for a slot before new ones get a 429
+MAX_QUEUE_DEPTH = int(os.environ.get("MAX_QUEUE_DEPTH", "16"))
+
+client = AsyncInferenceClient(
     model=MODEL_ID,
     token=HF_TOKEN
 )
 
 app = FastAPI(
     title="Resume Career Assistant API",
-    version="1.0.0"
+    version="1.1.0"
 )
 
 # =====================
@@ -34,42 +49,295 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     answer: str
 
+# =====================
+# METRICS
+# =====================
+class LatencyStats:
+    """Running count/total plus a window of recent samples for percentiles."""
+
+    def __init__(self, window=500):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.recent.append(ms)
+
+    def snapshot(self):
+        ordered = sorted(self.recent)
+
+        def pct(p):
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+        }
+
+
+METRICS = {
+    "latency": LatencyStats(),
+    "queue_wait": LatencyStats(),
+}
+COUNTERS = {
+    "requests": 0,
+    "generations": 0,
+    "coalesced": 0,
+    "shed": 0,
+    "errors": 0,
+}
+
+# =====================
+# CONCURRENCY GATE
+# =====================
+class GenerationGate:
+    """
+    Caps in-flight generations with a semaphore and sheds load
+    (HTTP 429) once too many requests are already queued for a slot.
+    """
+
+    def __init__(self, limit, max_queue):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.active = 0
+
+    async def acquire(self, request_state=None):
+        if self.waiting >= self.max_queue:
+            COUNTERS["shed"] += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many pending generations, retry shortly.",
+                headers={"Retry-After": "2"},
+            )
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        acquired_at = time.perf_counter()
+        wait_ms = (acquired_at - queued_at) * 1000
+        METRICS["queue_wait"].observe(wait_ms)
+        if request_state is not None:
+            request_state.queue_wait_ms = wait_ms
+            request_state.acquired_at = acquired_at
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self.semaphore.release()
+
+    def releaser(self):
+        """A release() that only takes effect once, for slots held across a response."""
+        released = False
+
+        def release_once():
+            nonlocal released
+            if not released:
+                released = True
+                self.release()
+
+        return release_once
+
+    @asynccontextmanager
+    async def slot(self, request_state=None):
+        await self.acquire(request_state)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+gate = GenerationGate(MAX_CONCURRENT_GENERATIONS, MAX_QUEUE_DEPTH)
+
+# prompt key -> asyncio.Task producing the answer
+IN_FLIGHT = {}
+
+# =====================
+# LATENCY MIDDLEWARE
+# =====================
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    started = time.perf_counter()
+    request.state.queue_wait_ms = 0.0
+    response = await call_next(request)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    # A stream's headers go out before generation; SlotStreamingResponse times it when it ends
+    streamed = request.url.path == "/chat/stream" and response.status_code == 200
+    if request.url.path.startswith("/chat") and not streamed:
+        METRICS["latency"].observe(elapsed_ms)
+
+    response.headers["X-Latency-Ms"] = f"{elapsed_ms:.1f}"
+    response.headers["X-Queue-Wait-Ms"] = f"{request.state.queue_wait_ms:.1f}"
+    return response
+
 # =====================
 # HEALTH CHECK
 # =====================
 @app.get("/")
-def health():
+async def health():
     return {"status": "ok", "service": "llama3-career-api"}
 
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "in_flight": gate.active,
+        "queued": gate.waiting,
+        "max_concurrent": gate.limit,
+        "max_queue_depth": gate.max_queue,
+        "counters": dict(COUNTERS),
+        "latency": METRICS["latency"].snapshot(),
+        "queue_wait": METRICS["queue_wait"].snapshot(),
+    }
+
 # =====================
-# CHAT ENDPOINT
+# PROMPT
 # =====================
-@app.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
+def build_prompt(request: ChatRequest) -> str:
     """
     HuggingFace Llama-3 expects ONE prompt string.
     Do NOT send messages[].
     """
-
-    # 🔑 CRITICAL: single prompt
-    final_prompt = (
+    return (
         f"{request.system_prompt}\n\n"
         f"{request.prompt}"
     )
 
-    try:
-        
-        response = client.text_generation(
+
+def prompt_key(final_prompt: str, max_tokens: int) -> str:
+    return hashlib.sha256(f"{max_tokens}\x00{final_prompt}".encode("utf-8")).hexdigest()
+
+
+async def generate(final_prompt: str, max_tokens: int, timing=None) -> str:
+    async with gate.slot(timing):
+        COUNTERS["generations"] += 1
+        return await client.text_generation(
             prompt=final_prompt,
-            max_new_tokens=request.max_tokens,
+            max_new_tokens=max_tokens,
             temperature=0.3,
             top_p=0.9,
         )
 
+# =====================
+# CHAT ENDPOINT
+# =====================
+@app.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest, http_request: Request):
+    COUNTERS["requests"] += 1
+
+    # 🔑 CRITICAL: single prompt
+    final_prompt = build_prompt(request)
+    key = prompt_key(final_prompt, request.max_tokens)
+
+    # Identical prompt already generating: share its result
+    arrived = time.perf_counter()
+    entry = IN_FLIGHT.get(key)
+    follower = entry is not None
+    if follower:
+        COUNTERS["coalesced"] += 1
+        task, timing = entry
+    else:
+        timing = SimpleNamespace()
+        task = asyncio.ensure_future(generate(final_prompt, request.max_tokens, timing))
+        IN_FLIGHT[key] = (task, timing)
+        task.add_done_callback(lambda _: IN_FLIGHT.pop(key, None))
+
+    try:
+        # shield: one caller disconnecting must not cancel the shared generation
+        response = await asyncio.shield(task)
+
+        # A follower waited for the leader's slot from the moment it arrived
+        wait_ms = max(0.0, (getattr(timing, "acquired_at", arrived) - arrived) * 1000)
+        http_request.state.queue_wait_ms = wait_ms
+        if follower:
+            METRICS["queue_wait"].observe(wait_ms)
         return ChatResponse(answer=response)
-        
 
+    except HTTPException:
+        raise
     except Exception as e:
+        COUNTERS["errors"] += 1
         raise HTTPException(status_code=500, detail=str(e))
-    
-    
\ No newline at end of file
+
+# =====================
+# STREAMING CHAT ENDPOINT
+# =====================
+class SlotStreamingResponse(StreamingResponse):
+    """
+    Releases the stream's generation slot when the response ends, even
+    if the client left before the body generator ever ran (its finally
+    would never execute, and the slot would leak), and records the
+    request's latency then, from started to the last token.
+    """
+
+    def __init__(self, content, release, started, **kwargs):
+        super().__init__(content, **kwargs)
+        self.release = release
+        self.started = started
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+            METRICS["latency"].observe((time.perf_counter() - self.started) * 1000)
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """
+    Same contract as /chat, but tokens are sent as plain text
+    chunks the moment the model produces them.
+    Streams hold a generation slot until they finish and are never coalesced.
+    """
+    COUNTERS["requests"] += 1
+    started = time.perf_counter()
+    final_prompt = build_prompt(request)
+
+    await gate.acquire(http_request.state)
+    release = gate.releaser()
+
+    try:
+        COUNTERS["generations"] += 1
+        tokens = await client.text_generation(
+            prompt=final_prompt,
+            max_new_tokens=request.max_tokens,
+            temperature=0.3,
+            top_p=0.9,
+            stream=True,
+        )
+    except Exception as e:
+        release()
+        COUNTERS["errors"] += 1
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def token_stream():
+        # Errors after the first byte can't change the status code,
+        # so surface them inline and close the stream.
+        try:
+            async for token in tokens:
+                if token:
+                    yield token
+        except Exception as e:
+            COUNTERS["errors"] += 1
+            yield f"\n\n{STREAM_ERROR_MARKER} {e}]"
+        finally:
+            release()
+
+    return SlotStreamingResponse(token_stream(), release, started, media_type="text/plain; charset=utf-8")
@@ -1,10 +1,11 @@
-from langchain_community.document_loaders import (
-    PyPDFLoader,
-    TextLoader,
-    Docx2txtLoader
-)
-
 def load_document(file_path):
+    # langchain_community takes ~0.3s to import; only uploads need it
+    from langchain_community.document_loaders import (
+        PyPDFLoader,
+        TextLoader,
+        Docx2txtLoader
+    )
+
     if file_path.endswith(".pdf"):
         return PyPDFLoader(file_path).load()
     elif file_path.endswith(".docx"):
@@ -0,0 +1,228 @@
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import Counter
+
+from chatbot.vector_store import chunk_document, tokenize
+
+# =====================
+# CONFIG
+# =====================
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chatbot-data")
+SNIPPET_CHARS = 400
+
+MAGIC = b"KBM25\x01"
+# magic, n_snippets, n_terms, avg_len, sources_off, snippets_off, terms_off, postings_off, text_off
+HEADER = struct.Struct("<6s2xIIfIIIII")
+SNIPPET = struct.Struct("<IIII")      # text offset, text length, token count, source index
+TERM = struct.Struct("<HII")          # term byte length, document frequency, postings offset
+POSTING_WIDTH = 8                     # uint32 snippet id + uint32 term frequency
+
+# =====================
+# BUILD
+# =====================
+def load_snippets(data_dir=DATA_DIR):
+    snippets = []
+    for name in sorted(os.listdir(data_dir)):
+        if not name.endswith(".txt"):
+            continue
+        with open(os.path.join(data_dir, name), encoding="utf-8") as f:
+            text = f.read()
+        for paragraph in text.split("\n\n"):
+            if paragraph.strip():
+                snippets += chunk_document(paragraph, name, chunk_chars=SNIPPET_CHARS)
+    return snippets
+
+
+def build_index(out_path, data_dir=DATA_DIR):
+    """
+    Serializes a BM25 inverted index over the guideline files.
+    Layout: header | source names | snippet table | term table | postings | text.
+    Returns the number of snippets indexed.
+    """
+    snippets = load_snippets(data_dir)
+
+    sources = sorted({s["source"] for s in snippets})
+    source_ids = {name: i for i, name in enumerate(sources)}
+    sources_blob = "\n".join(sources).encode("utf-8")
+
+    text_blob = bytearray()
+    snippet_rows = []
+    postings = {}
+    total_len = 0
+
+    for sid, snippet in enumerate(snippets):
+        encoded = snippet["text"].encode("utf-8")
+        tf = Counter(tokenize(snippet["text"]))
+        length = sum(tf.values())
+        total_len += length
+
+        snippet_rows.append(SNIPPET.pack(len(text_blob), len(encoded), length, source_ids[snippet["source"]]))
+        text_blob += encoded
+
+        for term, freq in tf.items():
+            postings.setdefault(term, []).append((sid, freq))
+
+    terms_blob = bytearray()
+    postings_blob = bytearray()
+    for term in sorted(postings):
+        encoded = term.encode("utf-8")
+        entries = postings[term]
+        terms_blob += TERM.pack(len(encoded), len(entries), len(postings_blob)) + encoded
+        for sid, freq in entries:
+            postings_blob += struct.pack("<II", sid, freq)
+
+    avg_len = (total_len / len(snippets)) if snippets else 0.0
+
+    sources_off = HEADER.size
+    snippets_off = sources_off + len(sources_blob)
+    snippets_off += (-snippets_off) % 4
+    terms_off = snippets_off + SNIPPET.size * len(snippet_rows)
+    postings_off = terms_off + len(terms_blob)
+    postings_off += (-postings_off) % 4
+    text_off = postings_off + len(postings_blob)
+
+    # A unique staging file per build, so concurrent builds can't write into each other's output
+    f = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(out_path)), prefix=".kb-", suffix=".tmp", delete=False
+    )
+    try:
+        f.write(HEADER.pack(
+            MAGIC, len(snippets), len(postings), avg_len,
+            sources_off, snippets_off, terms_off, postings_off, text_off,
+        ))
+        f.write(sources_blob)
+        f.write(b"\0" * (snippets_off - sources_off - len(sources_blob)))
+        f.write(b"".join(snippet_rows))
+        f.write(terms_blob)
+        f.write(b"\0" * (postings_off - terms_off - len(terms_blob)))
+        f.write(postings_blob)
+        f.write(text_blob)
+        f.close()
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, out_path)
+    except BaseException:
+        f.close()
+        if os.path.exists(f.name):
+            os.unlink(f.name)
+        raise
+
+    return len(snippets)
+
+# =====================
+# LOAD / SEARCH
+# =====================
+class KnowledgeIndex:
+    """
+    Read-only BM25 index backed by an mmap of the built artifact.
+    Only the term dictionary is decoded at load time; postings and
+    snippet text are read from the mapping per query.
+    """
+
+    def __init__(self, path, k1=1.2, b=0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+        if self._mm is None or self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a knowledge index: {path}")
+
+        (_, self.n_snippets, n_terms, self.avg_len, sources_off,
+         self._snippets_off, terms_off, self._postings_off, self._text_off) = HEADER.unpack_from(self._mm, 0)
+
+        view = memoryview(self._mm)
+        sources = bytes(view[sources_off:sources_off + (self._snippets_off - sources_off)]).rstrip(b"\0")
+        self.sources = sources.decode("utf-8").split("\n") if sources else []
+
+        snippet_table = view[self._snippets_off:terms_off].cast("I")
+        self._lengths = snippet_table[2::4]
+
+        self._terms = {}
+        pos = terms_off
+        for _ in range(n_terms):
+            term_len, df, offset = TERM.unpack_from(self._mm, pos)
+            pos += TERM.size
+            term = bytes(view[pos:pos + term_len]).decode("utf-8")
+            pos += term_len
+            idf = math.log(1 + (self.n_snippets - df + 0.5) / (df + 0.5))
+            self._terms[term] = (idf, self._postings_off + offset, df)
+
+    def snippet(self, sid):
+        text_off, text_len, _, source = SNIPPET.unpack_from(self._mm, self._snippets_off + sid * SNIPPET.size)
+        start = self._text_off + text_off
+        return {
+            "source": self.sources[source],
+            "text": self._mm[start:start + text_len].decode("utf-8"),
+        }
+
+    def search(self, query, k=3):
+        scores = {}
+        avg_len = self.avg_len or 1.0
+        for term in set(tokenize(query)):
+            entry = self._terms.get(term)
+            if entry is None:
+                continue
+            idf, offset, df = entry
+            postings = memoryview(self._mm)[offset:offset + df * POSTING_WIDTH].cast("I")
+            for i in range(0, len(postings), 2):
+                sid, freq = postings[i], postings[i + 1]
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[sid] / avg_len)
+                scores[sid] = scores.get(sid, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+        ranked = sorted(scores.items(), key=lambda s: (-s[1], s[0]))[:k]
+        return [dict(self.snippet(sid), score=round(score, 4)) for sid, score in ranked]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _is_stale(path, data_dir):
+    if not os.path.exists(path):
+        return True
+    built_at = os.path.getmtime(path)
+    return any(
+        os.path.getmtime(os.path.join(data_dir, name)) > built_at
+        for name in os.listdir(data_dir)
+    )
+
+
+def get_knowledge_index(path, data_dir=DATA_DIR):
+    """
+    Process-wide index. Rebuilt from chatbot-data only when the artifact
+    is missing or older than the data files (normally it ships prebuilt).
+    """
+    global _index
+    if _index is not None:
+        return _index
+
+    with _index_lock:
+        if _index is None:
+            if _is_stale(path, data_dir):
+                build_index(path, data_dir)
+            _index = KnowledgeIndex(path)
+    return _index
+
+
+def guideline_context(path, query, k=3, char_budget=1200):
+    """Top matching guideline snippets formatted for a prompt, or ""."""
+    try:
+        hits = get_knowledge_index(path).search(query, k=k)
+    except (OSError, ValueError):
+        return ""
+
+    parts = []
+    used = 0
+    for hit in hits:
+        if used + len(hit["text"]) > char_budget:
+            break
+        parts.append(f"- ({hit['source']}) {hit['text']}")
+        used += len(hit["text"])
+    return "\n".join(parts)
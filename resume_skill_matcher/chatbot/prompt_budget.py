@@ -0,0 +1,163 @@
+import logging
+import math
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# =====================
+# TOKEN ESTIMATE
+# =====================
+# Word pieces and single punctuation marks, roughly how BPE tokenizers split text
+PIECE_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+CHARS_PER_WORD_TOKEN = 6
+
+
+def estimate_tokens(text):
+    """
+    Local approximation of a Llama/Gemini token count.
+    Every word, number or symbol is at least one token and long words
+    are split every ~6 characters. Errs slightly on the high side.
+    """
+    if not text:
+        return 0
+    return sum(
+        max(1, math.ceil(len(piece) / CHARS_PER_WORD_TOKEN))
+        for piece in PIECE_RE.findall(text)
+    )
+
+# =====================
+# TRIMMING
+# =====================
+BOUNDARIES = {
+    "section": re.compile(r"(\n\s*\n|\n(?=---)|\n)"),
+    "sentence": re.compile(r"((?<=[.!?])\s+|\n+)"),
+    "word": re.compile(r"(\s+)"),
+}
+
+
+def trim_to_tokens(text, max_tokens, boundary="sentence", keep="head"):
+    """
+    Shortens text to at most max_tokens, cutting only at the given
+    boundary ("section", "sentence" or "word"). keep="head" keeps the
+    beginning, keep="tail" keeps the end. Falls back to the next finer
+    boundary when even one unit is too big.
+    """
+    if max_tokens <= 0 or not text:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # split() with a capture group keeps the separators at odd indexes
+    pieces = BOUNDARIES[boundary].split(text)
+    units = [
+        pieces[i] + (pieces[i + 1] if i + 1 < len(pieces) else "")
+        for i in range(0, len(pieces), 2)
+    ]
+    if keep == "tail":
+        units.reverse()
+
+    kept = []
+    used = 0
+    for unit in units:
+        cost = estimate_tokens(unit)
+        if used + cost > max_tokens:
+            break
+        kept.append(unit)
+        used += cost
+
+    if not kept:
+        finer = {"section": "sentence", "sentence": "word"}.get(boundary)
+        if finer is None:
+            return ""
+        return trim_to_tokens(units[0].strip(), max_tokens, finer, keep)
+
+    if keep == "tail":
+        kept.reverse()
+    return "".join(kept).strip()
+
+# =====================
+# ALLOCATION
+# =====================
+class Segment:
+    """
+    One part of a prompt.
+    fixed segments are never trimmed; the rest share what is left of
+    the total budget, each capped at its own max_tokens.
+    """
+
+    def __init__(self, name, text, max_tokens=None, fixed=False, boundary="sentence", keep="head"):
+        self.name = name
+        self.text = text or ""
+        self.max_tokens = max_tokens
+        self.fixed = fixed
+        self.boundary = boundary
+        self.keep = keep
+
+
+def fit_segments(segments, total_tokens, site=None):
+    """
+    Allocates total_tokens across segments and returns {name: text}.
+    Flexible segments that need less than an equal share keep all of
+    their text; the leftover is split among the ones that need more.
+    """
+    result = {}
+    remaining = total_tokens
+    demands = {}
+
+    for seg in segments:
+        cost = estimate_tokens(seg.text)
+        if seg.fixed:
+            result[seg.name] = seg.text
+            remaining -= cost
+        else:
+            demands[seg.name] = min(cost, seg.max_tokens) if seg.max_tokens is not None else cost
+
+    remaining = max(0, remaining)
+    allocation = {}
+    pending = sorted(demands, key=demands.get)
+    while pending:
+        share = remaining // len(pending)
+        name = pending.pop(0)
+        allocation[name] = min(demands[name], share)
+        remaining -= allocation[name]
+
+    for seg in segments:
+        if not seg.fixed:
+            result[seg.name] = trim_to_tokens(seg.text, allocation[seg.name], seg.boundary, seg.keep)
+
+    if site:
+        record_prompt(site, result)
+    return result
+
+# =====================
+# PROMPT SIZE STATS
+# =====================
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def record_prompt(site, parts):
+    sizes = {name: estimate_tokens(text) for name, text in parts.items()}
+    total = sum(sizes.values())
+
+    with _stats_lock:
+        entry = _stats.setdefault(site, {"count": 0, "total_tokens": 0, "max_tokens": 0})
+        entry["count"] += 1
+        entry["total_tokens"] += total
+        entry["max_tokens"] = max(entry["max_tokens"], total)
+        entry["last"] = sizes
+
+    logger.debug("prompt %s: %s tokens %s", site, total, sizes)
+    return total
+
+
+def prompt_size_stats():
+    with _stats_lock:
+        return {
+            site: dict(
+                entry,
+                avg_tokens=round(entry["total_tokens"] / entry["count"], 1),
+            )
+            for site, entry in _stats.items()
+        }
@@ -0,0 +1,182 @@
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+# =====================
+# CONFIG
+# =====================
+CHUNK_CHARS = 800
+CHUNK_OVERLAP_SENTENCES = 1
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "does", "for",
+    "from", "has", "have", "how", "i", "in", "is", "it", "me", "my", "of",
+    "on", "or", "the", "this", "to", "was", "what", "when", "where", "which",
+    "who", "with", "you", "your",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def tokenize(text):
+    return [
+        t.rstrip(".") for t in TOKEN_RE.findall(text.lower())
+        if t.rstrip(".") and t.rstrip(".") not in STOPWORDS
+    ]
+
+# =====================
+# CHUNKING
+# =====================
+def chunk_document(text, source, chunk_chars=CHUNK_CHARS):
+    """
+    Splits a document into ~chunk_chars pieces on sentence boundaries.
+    The last sentence of each chunk is repeated at the start of the next
+    so facts that straddle a boundary are still retrievable.
+    """
+    sentences = []
+    for sentence in SENTENCE_RE.split(text):
+        sentence = sentence.strip() if sentence else ""
+        # Extracted PDFs often have no punctuation at all: hard-wrap on words.
+        while len(sentence) > chunk_chars:
+            cut = sentence.rfind(" ", 0, chunk_chars)
+            cut = cut if cut > 0 else chunk_chars
+            sentences.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        if sentence:
+            sentences.append(sentence)
+
+    chunks = []
+    current = []
+    size = 0
+
+    for sentence in sentences:
+        if current and size + len(sentence) > chunk_chars:
+            chunks.append(" ".join(current))
+            current = [
+                s for s in current[len(current) - CHUNK_OVERLAP_SENTENCES:]
+                if len(s) < chunk_chars // 4
+            ] if CHUNK_OVERLAP_SENTENCES else []
+            size = sum(len(s) + 1 for s in current)
+        current.append(sentence)
+        size += len(sentence) + 1
+
+    if current:
+        chunks.append(" ".join(current))
+
+    return [{"source": source, "text": c} for c in chunks]
+
+# =====================
+# BM25 INDEX
+# =====================
+class BM25Index:
+    """Small in-memory Okapi BM25 index over chunk dicts."""
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokenize(c["text"])) for c in chunks]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        doc_freq = Counter()
+        for tf in self.term_freqs:
+            doc_freq.update(tf.keys())
+
+        n = len(chunks)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def score(self, query_terms, i):
+        tf = self.term_freqs[i]
+        norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / (self.avg_length or 1))
+        total = 0.0
+        for term in query_terms:
+            f = tf.get(term)
+            if f:
+                total += self.idf[term] * f * (self.k1 + 1) / (f + norm)
+        return total
+
+    def search(self, query, k=6):
+        """Returns [(score, chunk_index)] best first, zero scores dropped."""
+        query_terms = set(tokenize(query))
+        scored = [(self.score(query_terms, i), i) for i in range(len(self.chunks))]
+        scored = [s for s in scored if s[0] > 0]
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return scored[:k]
+
+
+_INDEX_CACHE = OrderedDict()
+_INDEX_CACHE_SIZE = 32
+_INDEX_CACHE_LOCK = threading.Lock()
+
+
+def get_index(chunks):
+    """BM25 index for a chunk list, reused across requests in this process."""
+    key = hashlib.sha256(
+        "\x00".join(c["source"] + "\x01" + c["text"] for c in chunks).encode("utf-8")
+    ).hexdigest()
+
+    with _INDEX_CACHE_LOCK:
+        index = _INDEX_CACHE.get(key)
+        if index is not None:
+            _INDEX_CACHE.move_to_end(key)
+            return index
+
+    # Built outside the lock; two threads may both build it, one copy is kept
+    index = BM25Index(chunks)
+    with _INDEX_CACHE_LOCK:
+        index = _INDEX_CACHE.setdefault(key, index)
+        _INDEX_CACHE.move_to_end(key)
+        while len(_INDEX_CACHE) > _INDEX_CACHE_SIZE:
+            _INDEX_CACHE.popitem(last=False)
+    return index
+
+# =====================
+# CONTEXT SELECTION
+# =====================
+def select_context(chunks, query, char_budget=3000, top_k=6):
+    """
+    Picks the chunks most relevant to the query that fit in char_budget
+    and returns them in document order, grouped under their source.
+    Questions with no keyword overlap (e.g. "summarize this") get the
+    opening chunks instead.
+    """
+    if not chunks:
+        return ""
+
+    index = get_index(chunks)
+    ranked = [i for _, i in index.search(query, k=top_k)]
+    if not ranked:
+        ranked = list(range(len(chunks)))
+
+    picked = []
+    used = 0
+    for i in ranked:
+        size = len(chunks[i]["text"])
+        if used + size > char_budget:
+            continue
+        picked.append(i)
+        used += size
+        if len(picked) >= top_k:
+            break
+
+    if not picked:
+        # Even the best chunk is over budget: send its head.
+        best = ranked[0]
+        return f"--- Document: {chunks[best]['source']} ---\n{chunks[best]['text'][:char_budget]}"
+
+    parts = []
+    last_source = None
+    for i in sorted(picked):
+        if chunks[i]["source"] != last_source:
+            last_source = chunks[i]["source"]
+            parts.append(f"--- Document: {last_source} ---")
+        parts.append(chunks[i]["text"])
+
+    return "\n".join(parts)
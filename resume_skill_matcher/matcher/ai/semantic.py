@@ -1,9 +1,11 @@
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from matcher.embeddings import encode
+
+# The model lives in the shared embedding server (manage.py run_embedding_server);
+# encode() loads it in this process only when the server isn't running.
 
 def semantic_match_score(resume_text, jd_text):
-    embeddings = model.encode([resume_text, jd_text])
+    embeddings = encode([resume_text, jd_text])
     score = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
     return round(score * 100, 2)
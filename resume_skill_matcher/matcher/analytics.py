@@ -0,0 +1,219 @@
+# matcher/analytics.py
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import MatchAnalytics, MatchRollupDaily, MatchRollupUser, ResumeMatchLog
+
+
+# ---------------------------------------------------------
+# SCORE HISTOGRAM (mergeable quantile sketch)
+# ---------------------------------------------------------
+# Scores are percentages, so one bin per point is exact to within
+# rounding and two sketches merge by adding bins.
+BINS = 101
+
+
+def score_bin(score):
+    return min(BINS - 1, max(0, int(round(score))))
+
+
+def merge_hist(*hists):
+    merged = [0] * BINS
+    for hist in hists:
+        for i, n in enumerate(hist or ()):
+            merged[i] += n
+    return merged
+
+
+def hist_quantile(hist, q):
+    """Score at quantile q (0..1), or None for an empty histogram."""
+    total = sum(hist)
+    if not total:
+        return None
+    target = q * total
+    seen = 0
+    for score, n in enumerate(hist):
+        seen += n
+        if n and seen >= target:
+            return score
+    return BINS - 1
+
+
+def hist_percentile_rank(hist, score):
+    """Percent of recorded matches scoring strictly below score."""
+    total = sum(hist)
+    if not total:
+        return None
+    below = sum(hist[:score_bin(score)])
+    return round(100 * below / total, 1)
+
+
+# ---------------------------------------------------------
+# RECORDING
+# ---------------------------------------------------------
+def _apply(rollup, score, semantic_score):
+    hist = rollup.score_hist or [0] * BINS
+    hist[score_bin(score)] += 1
+    rollup.score_hist = hist
+    rollup.count += 1
+    rollup.score_sum += score
+    if semantic_score is not None:
+        rollup.semantic_count += 1
+        rollup.semantic_sum += semantic_score
+
+
+def record_match(user, score, semantic_score=None, report_id=None, resume=None, job_description=None):
+    """
+    Logs one match and folds it into the daily and per-user rollups in
+    the same transaction. Matches with a semantic score also get a
+    MatchAnalytics row.
+    """
+    with transaction.atomic():
+        log = ResumeMatchLog.objects.create(
+            user=user, score=score, report_id=report_id, resume=resume, job_description=job_description
+        )
+        if semantic_score is not None:
+            MatchAnalytics.objects.create(user=user, score=score, semantic_score=semantic_score)
+
+        daily, _ = MatchRollupDaily.objects.select_for_update().get_or_create(
+            day=timezone.localdate(log.created_at)
+        )
+        _apply(daily, score, semantic_score)
+        daily.save()
+
+        per_user, _ = MatchRollupUser.objects.select_for_update().get_or_create(user=user)
+        _apply(per_user, score, semantic_score)
+        per_user.last_match_at = log.created_at
+        per_user.save()
+
+    return log
+
+
+def record_rescores(changes):
+    """
+    Moves re-scored matches between histogram bins in the daily and
+    per-user rollups. changes is [(ResumeMatchLog with its new score,
+    old score)]; call inside the transaction that saves the logs.
+    """
+    deltas = {}
+    for log, old_score in changes:
+        for key in (("day", timezone.localdate(log.created_at)), ("user", log.user_id)):
+            hist, total = deltas.setdefault(key, ([0] * BINS, [0.0]))
+            hist[score_bin(old_score)] -= 1
+            hist[score_bin(log.score)] += 1
+            total[0] += log.score - old_score
+
+    for (field, value), (hist, total) in deltas.items():
+        model = MatchRollupDaily if field == "day" else MatchRollupUser
+        lookup = {"day": value} if field == "day" else {"user_id": value}
+        rollup = model.objects.select_for_update().filter(**lookup).first()
+        if rollup is None:
+            continue  # not backfilled yet; backfill_match_rollups will count the new scores
+        rollup.score_hist = merge_hist(rollup.score_hist, hist)
+        rollup.score_sum += total[0]
+        rollup.save(update_fields=["score_hist", "score_sum"])
+
+
+def rebuild_rollups(chunk_size=2000):
+    """
+    Recomputes every rollup from ResumeMatchLog (scores) and
+    MatchAnalytics (semantic scores). Memory grows with the number of
+    days and users, not matches. Returns the number of matches folded in.
+    """
+    daily = {}
+    users = {}
+
+    def entry(table, key):
+        return table.setdefault(key, {
+            "count": 0, "score_sum": 0.0, "semantic_count": 0, "semantic_sum": 0.0,
+            "score_hist": [0] * BINS, "last_match_at": None,
+        })
+
+    logs = ResumeMatchLog.objects.values_list("user_id", "score", "created_at")
+    matches = 0
+    for user_id, score, created_at in logs.iterator(chunk_size=chunk_size):
+        for e in (entry(daily, timezone.localdate(created_at)), entry(users, user_id)):
+            e["count"] += 1
+            e["score_sum"] += score
+            e["score_hist"][score_bin(score)] += 1
+            e["last_match_at"] = max(filter(None, (e["last_match_at"], created_at)))
+        matches += 1
+
+    semantic = MatchAnalytics.objects.values_list("user_id", "semantic_score", "created_at")
+    for user_id, semantic_score, created_at in semantic.iterator(chunk_size=chunk_size):
+        for e in (entry(daily, timezone.localdate(created_at)), entry(users, user_id)):
+            e["semantic_count"] += 1
+            e["semantic_sum"] += semantic_score
+
+    with transaction.atomic():
+        MatchRollupDaily.objects.all().delete()
+        MatchRollupUser.objects.all().delete()
+
+        MatchRollupDaily.objects.bulk_create(
+            [MatchRollupDaily(day=day, **{k: v for k, v in e.items() if k != "last_match_at"})
+             for day, e in daily.items()],
+            batch_size=500,
+        )
+        MatchRollupUser.objects.bulk_create(
+            [MatchRollupUser(user_id=user_id, **e) for user_id, e in users.items()],
+            batch_size=500,
+        )
+
+    return matches
+
+
+# ---------------------------------------------------------
+# DASHBOARD
+# ---------------------------------------------------------
+def _avg(total, count):
+    return round(total / count, 2) if count else 0
+
+
+def dashboard_stats(user, days=30):
+    """
+    Everything the result dashboard shows, read from the rollups only:
+    a handful of queries whose cost depends on days and bins, never on
+    how many matches are stored.
+    """
+    totals = MatchRollupDaily.objects.aggregate(
+        count=Sum("count"),
+        score_sum=Sum("score_sum"),
+        semantic_count=Sum("semantic_count"),
+        semantic_sum=Sum("semantic_sum"),
+    )
+    overall_hist = merge_hist(*MatchRollupDaily.objects.values_list("score_hist", flat=True))
+
+    since = timezone.localdate() - timedelta(days=days - 1)
+    trend = []
+    for row in MatchRollupDaily.objects.filter(day__gte=since).order_by("day"):
+        trend.append({
+            "day": row.day.isoformat(),
+            "count": row.count,
+            "avg": _avg(row.score_sum, row.count),
+            "p25": hist_quantile(row.score_hist, 0.25),
+            "p50": hist_quantile(row.score_hist, 0.50),
+            "p90": hist_quantile(row.score_hist, 0.90),
+        })
+
+    mine = MatchRollupUser.objects.filter(user=user).first()
+    my_avg = _avg(mine.score_sum, mine.count) if mine else None
+
+    return {
+        "total_matches": totals["count"] or 0,
+        "avg_score": _avg(totals["score_sum"] or 0, totals["count"] or 0),
+        "avg_semantic": _avg(totals["semantic_sum"] or 0, totals["semantic_count"] or 0),
+        "percentiles": {
+            f"p{int(q * 100)}": hist_quantile(overall_hist, q)
+            for q in (0.25, 0.5, 0.75, 0.9)
+        },
+        # 10-point buckets for the distribution chart; 100 joins 90-99
+        "distribution": [sum(overall_hist[i:i + 10]) for i in range(0, 90, 10)] + [sum(overall_hist[90:])],
+        "trend": trend,
+        "my_matches": mine.count if mine else 0,
+        "my_avg_score": my_avg,
+        "my_percentile": hist_percentile_rank(overall_hist, my_avg) if mine else None,
+    }
@@ -0,0 +1,60 @@
+import base64
+import binascii
+import os
+
+from django.conf import settings
+from rest_framework import serializers
+
+from matcher.utils import SUPPORTED_EXTENSIONS
+
+DOCUMENTS = ("resume", "jd")
+
+
+def sniff_extension(data):
+    """Best guess at a document type when no filename is given."""
+    if data.startswith(b"%PDF"):
+        return ".pdf"
+    if data.startswith(b"PK\x03\x04"):
+        return ".docx"
+    return ".txt"
+
+
+class MatchRequestSerializer(serializers.Serializer):
+    """
+    Each document is either raw text (<doc>_text) or a base64-encoded
+    .pdf/.docx/.txt file (<doc>_file, with an optional <doc>_filename
+    for its type).
+    """
+
+    resume_text = serializers.CharField(required=False, trim_whitespace=False)
+    resume_file = serializers.CharField(required=False)
+    resume_filename = serializers.CharField(required=False, max_length=255)
+    jd_text = serializers.CharField(required=False, trim_whitespace=False)
+    jd_file = serializers.CharField(required=False)
+    jd_filename = serializers.CharField(required=False, max_length=255)
+    feedback = serializers.BooleanField(default=False)
+    store = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        for doc in DOCUMENTS:
+            text, encoded = data.get(f"{doc}_text"), data.get(f"{doc}_file")
+            if bool(text) == bool(encoded):
+                raise serializers.ValidationError({doc: f"Send exactly one of {doc}_text or {doc}_file."})
+            if encoded:
+                data[f"{doc}_bytes"], data[f"{doc}_ext"] = self._decode(doc, encoded, data.get(f"{doc}_filename"))
+        return data
+
+    def _decode(self, doc, encoded, filename):
+        limit = settings.MATCH_API_MAX_DOCUMENT_BYTES
+        # base64 is 4/3 the size of the data; refuse before decoding
+        if len(encoded) > limit * 4 // 3 + 4:
+            raise serializers.ValidationError({f"{doc}_file": f"Larger than {limit} bytes."})
+        try:
+            data = base64.b64decode(encoded, validate=True)
+        except (binascii.Error, ValueError):
+            raise serializers.ValidationError({f"{doc}_file": "Not valid base64."})
+
+        ext = os.path.splitext(filename)[1].lower() if filename else sniff_extension(data)
+        if ext not in SUPPORTED_EXTENSIONS:
+            raise serializers.ValidationError({f"{doc}_filename": f"Unsupported file format: {ext}"})
+        return data, ext
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import MatchAPIView
+
+urlpatterns = [
+    path("", MatchAPIView.as_view(), name="match-api"),
+]
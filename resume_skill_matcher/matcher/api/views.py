@@ -0,0 +1,70 @@
+from django.core.files.base import ContentFile
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from matcher.analytics import record_match
+from matcher.document_store import put_document
+from matcher.instrumentation import stage
+from matcher.pipeline import analyze_texts, save_documents
+from matcher.utils import extract_text_from_bytes, normalize_text
+
+from .serializers import DOCUMENTS, MatchRequestSerializer
+
+
+class MatchAPIView(APIView):
+    """
+    Scores a resume against a job description, without HTML.
+    Input (JSON):
+      { "resume_text": "...", "jd_file": "<base64>", "jd_filename": "jd.pdf",
+        "feedback": false, "store": false }
+    Output:
+      the full analysis (score, breakdown, roles, requirements, ATS
+      scores, warnings, feedback); with "store": true also resume_id,
+      job_description_id and match_id.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = MatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        texts = {}
+        with stage("parse"):
+            for doc in DOCUMENTS:
+                if f"{doc}_bytes" not in data:
+                    texts[doc] = normalize_text(data[f"{doc}_text"])
+                    continue
+                try:
+                    texts[doc] = extract_text_from_bytes(data[f"{doc}_bytes"], data[f"{doc}_ext"])
+                except Exception as e:
+                    return Response(
+                        {f"{doc}_file": [f"Could not read the document: {type(e).__name__}"]},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+        analysis = analyze_texts(texts["resume"], texts["jd"], feedback=data["feedback"])
+        if not data["store"]:
+            return Response(analysis)
+
+        # Stored matches show up in the dashboard and bulk report export
+        with stage("store"):
+            files = {
+                doc: ContentFile(data[f"{doc}_bytes"], name=data.get(f"{doc}_filename") or f"{doc}{data[f'{doc}_ext']}")
+                for doc in DOCUMENTS if f"{doc}_bytes" in data
+            }
+            resume, jd = save_documents(
+                request.user, texts["resume"], texts["jd"], files.get("resume"), files.get("jd")
+            )
+            log = record_match(
+                request.user, analysis["score"], report_id=put_document(analysis, "report_context"),
+                resume=resume, job_description=jd,
+            )
+
+        return Response(
+            dict(analysis, resume_id=resume.id, job_description_id=jd.id, match_id=log.id),
+            status=status.HTTP_201_CREATED,
+        )
@@ -0,0 +1,201 @@
+# matcher/batch.py
+
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+import zipfile
+
+from skills.catalog import use_catalog
+
+from .instrumentation import collect_stages, stage, sum_stages
+from .pipeline import analyze_texts
+from .utils import SUPPORTED_EXTENSIONS, extract_text_from_bytes, extract_text_from_file, normalize_text
+
+CSV_FIELDS = [
+    "id", "target", "score", "confidence_level", "matched_skills", "missing_skills",
+    "resume_role", "jd_role", "role_fit_score", "requirement_match_score", "ats_overall",
+    "seconds", "error",
+]
+
+
+# ---------------------------------------------------------
+# SOURCES
+# ---------------------------------------------------------
+def iter_documents(source, csv_text_column=None):
+    """
+    Work items for every document under source: a directory (searched
+    recursively) or a ZIP of .pdf/.docx/.txt files. CSV files in either
+    contribute one document per row, taken from csv_text_column (default:
+    the last column). Ids are stable across runs, for checkpointing.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                doc_id = os.path.relpath(path, source)
+                ext = os.path.splitext(name)[1].lower()
+                if ext in SUPPORTED_EXTENSIONS:
+                    yield {"id": doc_id, "path": path}
+                elif ext == ".csv":
+                    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+                        yield from _csv_rows(f, doc_id, csv_text_column)
+
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in sorted(archive.infolist(), key=lambda i: i.filename):
+                ext = os.path.splitext(info.filename)[1].lower()
+                if info.is_dir():
+                    continue
+                if ext in SUPPORTED_EXTENSIONS:
+                    yield {"id": info.filename, "zip": source, "member": info.filename}
+                elif ext == ".csv":
+                    with archive.open(info) as raw:
+                        f = io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="")
+                        yield from _csv_rows(f, info.filename, csv_text_column)
+
+    else:
+        raise ValueError(f"{source} is neither a directory nor a ZIP file")
+
+
+def _csv_rows(f, name, text_column):
+    reader = csv.DictReader(f)
+    column = text_column or (reader.fieldnames or [""])[-1]
+    if column not in (reader.fieldnames or []):
+        raise ValueError(f"{name} has no column {column!r}")
+    for number, row in enumerate(reader, start=1):
+        yield {"id": f"{name}#{number}", "text": row[column] or ""}
+
+
+# ---------------------------------------------------------
+# WORKERS
+# ---------------------------------------------------------
+_worker = {}
+
+
+def init_worker(target_text, target_is_jd, feedback, catalog=None):
+    """Pool initializer: the text every document is matched against, and the skill catalog."""
+    if catalog is not None:
+        use_catalog(catalog)
+    _worker.update(target_text=target_text, target_is_jd=target_is_jd, feedback=feedback, zips={})
+
+
+def _read_text(item):
+    if "text" in item:
+        return normalize_text(item["text"])
+    if "path" in item:
+        return extract_text_from_file(item["path"])
+
+    archive = _worker["zips"].get(item["zip"])
+    if archive is None:
+        archive = _worker["zips"][item["zip"]] = zipfile.ZipFile(item["zip"])
+    ext = os.path.splitext(item["member"])[1].lower()
+    return extract_text_from_bytes(archive.read(item["member"]), ext)
+
+
+def score_document(item):
+    """Parses and scores one work item; returns (result row, {stage: seconds})."""
+    start = time.perf_counter()
+    row = {"id": item["id"]}
+    with collect_stages() as timings:
+        try:
+            with stage("parse"):
+                text = _read_text(item)
+            if _worker["target_is_jd"]:
+                context = analyze_texts(text, _worker["target_text"], feedback=_worker["feedback"])
+            else:
+                context = analyze_texts(_worker["target_text"], text, feedback=_worker["feedback"])
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        else:
+            row.update(
+                score=context["score"],
+                confidence_level=context["confidence_level"],
+                matched_skills=context["score_breakdown"]["matched_skills"],
+                missing_skills=sorted(context["missing_skills"]),
+                resume_role=context["resume_role"],
+                jd_role=context["jd_role"],
+                role_fit_score=context["role_fit_score"],
+                requirement_match_score=context["requirement_match_score"],
+                ats_overall=context["ats_scores"].get("overall"),
+            )
+            if _worker["feedback"]:
+                row["recruiter_feedback"] = context["recruiter_feedback"]
+    row["seconds"] = round(time.perf_counter() - start, 4)
+    return row, sum_stages(timings)
+
+
+# ---------------------------------------------------------
+# OUTPUT + CHECKPOINT
+# ---------------------------------------------------------
+def target_fingerprint(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+class ResultWriter:
+    """
+    Appends one JSONL line or CSV row per finished document and flushes
+    it, so the output file doubles as the checkpoint: checkpoint() lists
+    what an interrupted run already finished. A document retried after
+    an error gets a second row; its last row is its result.
+    """
+
+    def __init__(self, path, target):
+        self.path = path
+        self.target = target
+        self.is_csv = path.lower().endswith(".csv")
+
+    def checkpoint(self):
+        """(ids scored, ids whose last attempt ended in an error)."""
+        if not os.path.exists(self.path):
+            return set(), set()
+        self._drop_partial_line()
+
+        done, failed = set(), set()
+        with open(self.path, newline="", encoding="utf-8") as f:
+            rows = csv.DictReader(f) if self.is_csv else (json.loads(line) for line in f if line.strip())
+            for row in rows:
+                if row.get("target") != self.target:
+                    raise ValueError(
+                        f"{self.path} holds results for a different target document; "
+                        "use --restart or another --output"
+                    )
+                if row.get("error"):
+                    done.discard(row["id"])
+                    failed.add(row["id"])
+                else:
+                    failed.discard(row["id"])
+                    done.add(row["id"])
+        return done, failed
+
+    def _drop_partial_line(self):
+        """A crash mid-write can leave half a row at the end; cut it off."""
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def __enter__(self):
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._file, CSV_FIELDS, extrasaction="ignore")
+            if new:
+                self._csv.writeheader()
+        return self
+
+    def write(self, row):
+        row = dict(row, target=self.target)
+        if self.is_csv:
+            row["missing_skills"] = ";".join(row.get("missing_skills") or [])
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def __exit__(self, *exc):
+        self._file.close()
+        return False
@@ -0,0 +1,163 @@
+# matcher/bulk_export.py
+
+import atexit
+import logging
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .document_store import get_document
+from .report_cache import get_report_cache, report_key
+from .reports.render import REPORT_VERSIONS, render_report
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# WORKER POOL
+# ---------------------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process pool shared by all exports in this worker, or None to render inline."""
+    global _pool
+    workers = settings.REPORT_EXPORT_WORKERS
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def discard_pool(pool):
+    """
+    Drops a pool that lost a worker (BrokenProcessPool); a broken pool
+    rejects all further work, so the next get_pool() starts a new one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _submit(pool, fmt, context):
+    cache = get_report_cache()
+    key = report_key(context, fmt, REPORT_VERSIONS[fmt])
+
+    hit = cache.lookup(key, fmt)
+    if hit:
+        with open(hit[0], "rb") as f:
+            return key, _done(f.read())
+    if pool is None:
+        return key, _done(render_report(fmt, context))
+    return key, pool.submit(render_report, fmt, context)
+
+
+# ---------------------------------------------------------
+# STREAMING ZIP
+# ---------------------------------------------------------
+class _ZipSink:
+    """
+    Write-only file object for zipfile. Without seek() zipfile writes
+    data descriptors after each member, so the archive can be sent as
+    it is built.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_reports_zip(logs, fmt):
+    """
+    Yields a ZIP of one report per ResumeMatchLog, in order.
+    At most 2 x REPORT_EXPORT_WORKERS renders are in flight, so memory
+    stays bounded however many reports are requested; each member is
+    sent as soon as it (and everything before it) is ready.
+    """
+    pool = get_pool()
+    window = max(1, 2 * settings.REPORT_EXPORT_WORKERS)
+    cache = get_report_cache()
+
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    pending = deque()
+    failed = []
+
+    def submit(context):
+        nonlocal pool
+        try:
+            return (*_submit(pool, fmt, context), pool)
+        except BrokenProcessPool:
+            # A worker died during an earlier export: retry on a fresh pool
+            discard_pool(pool)
+            pool = get_pool()
+            return (*_submit(pool, fmt, context), pool)
+
+    def emit(log, key, future, source):
+        name = f"report_{log.id}_{log.created_at:%Y%m%d}.{fmt}"
+        try:
+            data = future.result()
+        except Exception as e:
+            logger.exception("Report export failed for match %s", log.id)
+            failed.append(name)
+            if isinstance(e, BrokenProcessPool):
+                discard_pool(source)
+            return
+        archive.writestr(name, data)
+        cache.get_or_render(key, fmt, lambda f: f.write(data))
+
+    try:
+        for log in logs:
+            context = get_document(log.report_id)
+            if not context:
+                failed.append(f"report_{log.id}: analysis no longer stored")
+                continue
+
+            pending.append((log, *submit(context)))
+            while len(pending) >= window or (pending and pending[0][2].done()):
+                emit(*pending.popleft())
+                yield sink.drain()
+
+        while pending:
+            emit(*pending.popleft())
+            yield sink.drain()
+
+        if failed:
+            archive.writestr("errors.txt", "\n".join(failed) + "\n")
+        archive.close()
+        yield sink.drain()
+    finally:
+        for _, _, future, _ in pending:
+            future.cancel()
@@ -0,0 +1,178 @@
+# matcher/chat_cache.py
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+# ---------------------------------------------------------
+# KEYS
+# ---------------------------------------------------------
+def normalize_question(question):
+    question = re.sub(r"\s+", " ", question.lower()).strip()
+    return question.rstrip("?!. ")
+
+
+def make_answer_key(document_context, question, prompt_version, max_tokens):
+    doc_hash = hashlib.sha256(document_context.encode("utf-8")).hexdigest()
+    raw = "\x00".join([
+        doc_hash,
+        normalize_question(question),
+        str(prompt_version),
+        str(max_tokens),
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------
+# ANSWER CACHE
+# ---------------------------------------------------------
+class Flight:
+    """One in-progress computation of a key; followers wait() for its result."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.value = None
+        self.error = None
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self):
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class AnswerCache:
+    """
+    In-process LRU cache with a TTL.
+    get_or_compute() is single-flight: concurrent callers with the
+    same key wait for the first caller's backend call instead of
+    making their own, and all get its result, cacheable or not.
+    """
+
+    def __init__(self, max_entries=512, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._in_flight = {}            # key -> Flight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key):
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def _store(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def claim(self, key):
+        """
+        (value, flight, leader): the cached value (flight is None), or the
+        in-flight computation of key. The leader must finish() its flight;
+        everyone else waits on it.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value, None, False
+
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                self.shared += 1
+                return None, flight, False
+
+            self.misses += 1
+            flight = self._in_flight[key] = Flight()
+            return None, flight, True
+
+    def finish(self, key, flight, value=None, cacheable=False, error=None):
+        """Hands the leader's result to its followers; only cacheable values are stored."""
+        with self._lock:
+            if flight.done:
+                return
+            if cacheable:
+                self._store(key, value)
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+            flight.value, flight.error = value, error
+            flight._done.set()
+
+    def get_or_compute(self, key, compute):
+        """
+        compute() returns (value, cacheable). Only cacheable values are
+        stored, so transient backend errors are never served from cache,
+        but callers already waiting get them rather than retrying.
+        """
+        value, flight, leader = self.claim(key)
+        if flight is None:
+            return value
+        if not leader:
+            return flight.wait()
+
+        try:
+            value, cacheable = compute()
+        except Exception as e:
+            self.finish(key, flight, error=e)
+            raise
+        self.finish(key, flight, value, cacheable)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_in_flight": self.shared,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+answer_cache = AnswerCache(
+    max_entries=getattr(settings, "CHATBOT_ANSWER_CACHE_SIZE", 512),
+    ttl=getattr(settings, "CHATBOT_ANSWER_CACHE_TTL", 3600),
+)
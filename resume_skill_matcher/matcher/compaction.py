@@ -0,0 +1,150 @@
+# matcher/compaction.py
+
+import json
+import re
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from chatbot.prompt_budget import trim_to_tokens
+from .models import ArchivedMessageBatch, ChatMessage, ChatSession
+
+
+# ---------------------------------------------------------
+# ROLLING SUMMARY
+# ---------------------------------------------------------
+FIRST_SENTENCE_RE = re.compile(r"^(.{1,200}?[.!?])(\s|$)", re.S)
+MARKDOWN_RE = re.compile(r"[#*_`>|]+")
+
+
+def _gist(text, limit=160):
+    """First sentence of a message with markdown noise removed."""
+    text = re.sub(r"\s+", " ", MARKDOWN_RE.sub(" ", text)).strip()
+    match = FIRST_SENTENCE_RE.match(text)
+    gist = match.group(1) if match else text
+    return gist if len(gist) <= limit else gist[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def summarize_turns(messages, previous_summary=""):
+    """
+    Extractive rolling summary: one short line per message appended to
+    the previous summary, then trimmed from the front so the newest
+    context survives within CHAT_SUMMARY_TOKENS. No LLM call needed.
+    """
+    lines = [previous_summary] if previous_summary else []
+    for m in messages:
+        who = "User asked" if m.sender == "user" else "Assistant answered"
+        lines.append(f"- {who}: {_gist(m.content)}")
+
+    return trim_to_tokens(
+        "\n".join(lines), settings.CHAT_SUMMARY_TOKENS, boundary="section", keep="tail"
+    )
+
+
+def conversation_memory(session, recent_turns=4):
+    """
+    Compact memory for the chatbot prompt: the rolling summary of
+    archived turns plus the last few messages still in the hot table.
+    """
+    recent = list(
+        ChatMessage.objects.filter(session=session)
+        .order_by("-timestamp", "-id")
+        .values_list("sender", "content")[:recent_turns]
+    )[::-1]
+
+    parts = []
+    if session.summary:
+        parts.append(f"Earlier in this conversation:\n{session.summary}")
+    if recent:
+        parts.append("\n".join(
+            f"{'User' if sender == 'user' else 'Assistant'}: {_gist(content, 300)}"
+            for sender, content in recent
+        ))
+    return "\n\n".join(parts)
+
+
+# ---------------------------------------------------------
+# ARCHIVAL
+# ---------------------------------------------------------
+def _encode(messages):
+    rows = [{
+        "id": m.id,
+        "sender": m.sender,
+        "content": m.content,
+        "timestamp": m.timestamp.isoformat(),
+    } for m in messages]
+    return zlib.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decode_batch(batch):
+    return json.loads(zlib.decompress(bytes(batch.data)))
+
+
+def compact_session(session, keep_recent=None, batch_size=200):
+    """
+    Folds everything except the newest keep_recent messages into the
+    session summary and moves those rows into compressed archive
+    batches. Returns the number of messages archived.
+    """
+    keep_recent = settings.CHAT_KEEP_RECENT if keep_recent is None else keep_recent
+    archived = 0
+
+    while True:
+        with transaction.atomic():
+            session = ChatSession.objects.select_for_update().get(pk=session.pk)
+            hot = ChatMessage.objects.filter(session=session).order_by("timestamp", "id")
+
+            excess = hot.count() - keep_recent
+            if excess <= 0:
+                return archived
+
+            old = list(hot[:min(excess, batch_size)])
+
+            ArchivedMessageBatch.objects.create(
+                session=session,
+                first_message_id=old[0].id,
+                last_message_id=old[-1].id,
+                message_count=len(old),
+                data=_encode(old),
+            )
+            ChatMessage.objects.filter(id__in=[m.id for m in old]).delete()
+
+            ChatSession.objects.filter(pk=session.pk).update(
+                summary=summarize_turns(old, session.summary),
+                summary_through_id=old[-1].id,
+                archived_count=F("archived_count") + len(old),
+            )
+            archived += len(old)
+
+
+def maybe_compact(session):
+    """Cheap check after each chat turn; compacts only past the threshold."""
+    if ChatMessage.objects.filter(session=session).count() > settings.CHAT_COMPACT_THRESHOLD:
+        return compact_session(session)
+    return 0
+
+
+def archived_messages_before(session, before_id, limit):
+    """
+    Lazily expands archive batches (newest first) for messages older
+    than before_id. Returns (messages oldest-first, has_more).
+    """
+    batches = ArchivedMessageBatch.objects.filter(session=session)
+    if before_id is not None:
+        batches = batches.filter(first_message_id__lt=before_id)
+
+    collected = []
+    batches = batches.order_by("-last_message_id")
+    for batch in batches.iterator():
+        rows = [
+            {"id": r["id"], "sender": r["sender"], "content": r["content"]}
+            for r in decode_batch(batch)
+            if before_id is None or r["id"] < before_id
+        ]
+        collected = rows + collected
+        if len(collected) > limit:
+            return collected[-limit:], True
+
+    return collected, False
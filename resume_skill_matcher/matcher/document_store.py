@@ -0,0 +1,152 @@
+# matcher/document_store.py
+
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+
+from django.db import IntegrityError
+
+from .models import StoredDocument
+
+
+# ---------------------------------------------------------
+# BLOB STORE
+# ---------------------------------------------------------
+_cache = OrderedDict()   # id -> decoded value, most recently used last
+_cache_lock = threading.Lock()
+CACHE_SIZE = 64
+
+
+def _remember(doc_id, value):
+    with _cache_lock:
+        _cache[doc_id] = value
+        _cache.move_to_end(doc_id)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def put_document(value, kind):
+    """
+    Stores any JSON-serializable value once per distinct content and
+    returns the StoredDocument id. Identical uploads share one row.
+    """
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+
+    doc = StoredDocument.objects.filter(sha256=digest).only("id").first()
+    if doc is None:
+        try:
+            doc = StoredDocument.objects.create(
+                sha256=digest,
+                kind=kind,
+                data=zlib.compress(raw, 6),
+                size=len(raw),
+            )
+        except IntegrityError:
+            # Another worker stored the same content first
+            doc = StoredDocument.objects.only("id").get(sha256=digest)
+
+    _remember(doc.id, value)
+    return doc.id
+
+
+def get_document(doc_id, default=None):
+    """Decoded value for an id, loaded from the DB only on first use in this process."""
+    if doc_id is None:
+        return default
+
+    with _cache_lock:
+        if doc_id in _cache:
+            _cache.move_to_end(doc_id)
+            return _cache[doc_id]
+
+    data = StoredDocument.objects.filter(id=doc_id).values_list("data", flat=True).first()
+    if data is None:
+        return default
+
+    value = json.loads(zlib.decompress(bytes(data)))
+    _remember(doc_id, value)
+    return value
+
+
+# ---------------------------------------------------------
+# SESSION REFERENCES
+# ---------------------------------------------------------
+def store_in_session(session, key, value, kind=None):
+    """Keeps only a small reference in the Django session: session[f"{key}_id"]."""
+    session[f"{key}_id"] = put_document(value, kind or key)
+    session.pop(key, None)   # drop any inline copy from older sessions
+    session.modified = True
+
+
+def append_to_session(session, key, value, kind=None):
+    """
+    Stores a list value as one more part of session[f"{key}_ids"]. Earlier
+    parts are referenced, never copied, so growing the list stays linear.
+    Returns the part ids.
+    """
+    ids = list(session.get(f"{key}_ids") or [])
+    ids.append(put_document(value, kind or key))
+    session[f"{key}_ids"] = ids
+    session.modified = True
+    return ids
+
+
+def load_parts(doc_ids):
+    """The stored list parts of doc_ids, concatenated in order."""
+    parts = []
+    for doc_id in doc_ids:
+        parts += get_document(doc_id, [])
+    return parts
+
+
+def load_from_session(session, key, default=None):
+    doc_id = session.get(f"{key}_id")
+    if doc_id is not None:
+        return get_document(doc_id, default)
+    # Sessions created before the store held the value inline
+    return session.get(key, default)
+
+
+# ---------------------------------------------------------
+# CLEANUP
+# ---------------------------------------------------------
+def referenced_document_ids(session_data=()):
+    """
+    Ids of every StoredDocument still in use: by matches, chats, rescoring
+    runs, and by the given decoded session dicts (*_id and *_ids keys).
+    """
+    from .models import ChatSession, ResumeMatchLog, SkillRescoreRun
+
+    ids = set(ResumeMatchLog.objects.exclude(report=None).values_list("report_id", flat=True))
+    ids.update(SkillRescoreRun.objects.values_list("catalog_id", flat=True))
+    for document_id, document_ids in ChatSession.objects.values_list("document_id", "document_ids"):
+        if document_id is not None:
+            ids.add(document_id)
+        ids.update(document_ids or ())
+
+    for data in session_data:
+        for key, value in data.items():
+            if key.endswith("_id") and isinstance(value, int):
+                ids.add(value)
+            elif key.endswith("_ids") and isinstance(value, list):
+                ids.update(v for v in value if isinstance(v, int))
+    return ids
+
+
+def prune_documents(referenced, older_than, dry_run=False):
+    """Deletes unreferenced documents created before older_than; returns how many."""
+    candidates = StoredDocument.objects.filter(created_at__lt=older_than).values_list("id", flat=True)
+    orphans = [doc_id for doc_id in candidates.iterator() if doc_id not in referenced]
+    if dry_run:
+        return len(orphans)
+    deleted = 0
+    for start in range(0, len(orphans), 500):
+        chunk = orphans[start:start + 500]
+        deleted += StoredDocument.objects.filter(id__in=chunk).delete()[0]
+        with _cache_lock:
+            for doc_id in chunk:
+                _cache.pop(doc_id, None)
+    return deleted
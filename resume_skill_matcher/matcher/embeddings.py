@@ -0,0 +1,263 @@
+# matcher/embeddings.py
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Frames are a 4-byte big-endian length followed by the body.
+# Request body: JSON {"texts": [...]}.
+# Response body: b"\0" + (count, dim) + float32 vectors, or b"\1" + error text.
+LENGTH = struct.Struct("!I")
+SHAPE = struct.Struct("!II")
+OK, ERROR = b"\0", b"\1"
+
+
+class EmbeddingServerError(Exception):
+    """The embedding server answered, but with an error."""
+
+
+def socket_path():
+    return settings.EMBEDDING_SOCKET or os.path.join(
+        tempfile.gettempdir(), "resume_matcher_embeddings.sock"
+    )
+
+
+def _send_frame(sock, body):
+    sock.sendall(LENGTH.pack(len(body)) + body)
+
+
+def _recv_exact(sock, size):
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("embedding socket closed mid-frame")
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv_frame(sock):
+    header = sock.recv(LENGTH.size, socket.MSG_WAITALL)
+    if not header:
+        return None
+    if len(header) < LENGTH.size:
+        header += _recv_exact(sock, LENGTH.size - len(header))
+    return _recv_exact(sock, LENGTH.unpack(header)[0])
+
+
+# ---------------------------------------------------------
+# CLIENT
+# ---------------------------------------------------------
+_local_model = None
+_local_lock = threading.Lock()
+
+
+def _get_local_model():
+    global _local_model
+    with _local_lock:
+        if _local_model is None:
+            from sentence_transformers import SentenceTransformer
+
+            logger.info("Embedding server unavailable; loading %s in-process", settings.EMBEDDING_MODEL)
+            _local_model = SentenceTransformer(settings.EMBEDDING_MODEL)
+        return _local_model
+
+
+def encode_remote(texts, path=None, timeout=None):
+    """float32 array (len(texts), dim) from the embedding server."""
+    import numpy as np
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(settings.EMBEDDING_TIMEOUT if timeout is None else timeout)
+        sock.connect(path or socket_path())
+        _send_frame(sock, json.dumps({"texts": list(texts)}).encode("utf-8"))
+        body = _recv_frame(sock)
+
+    if body is None:
+        raise ConnectionError("embedding server closed the connection")
+    if body[:1] == ERROR:
+        raise EmbeddingServerError(body[1:].decode("utf-8", "replace"))
+
+    count, dim = SHAPE.unpack_from(body, 1)
+    return np.frombuffer(body, dtype=np.float32, offset=1 + SHAPE.size).reshape(count, dim)
+
+
+def encode(texts):
+    """
+    Sentence embeddings for texts from the shared embedding server. Only
+    when no server is running (socket missing or refused) is a model
+    loaded in this process. A running server that times out or fails
+    raises instead: falling back then would load a model into every web
+    worker under load, which is what the server exists to prevent.
+    """
+    try:
+        return encode_remote(texts)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return _get_local_model().encode(list(texts))
+    except (OSError, EmbeddingServerError) as e:
+        logger.warning("Embedding server call failed: %s", e)
+        raise
+
+
+# ---------------------------------------------------------
+# SERVER
+# ---------------------------------------------------------
+class _Pending:
+    def __init__(self, texts):
+        self.texts = texts
+        self.done = threading.Event()
+        self.vectors = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Collects encode requests from concurrent connections into one
+    model.encode call: a batch closes when it reaches max_batch texts or
+    max_wait seconds after its first request arrived.
+    """
+
+    def __init__(self, model, max_batch=64, max_wait=0.005):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.texts = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def encode(self, texts):
+        pending = _Pending(texts)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.vectors
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+            size += len(item.texts)
+        return batch
+
+    def _run(self):
+        import numpy as np
+
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect(first)
+            texts = [t for pending in batch for t in pending.texts]
+            try:
+                vectors = np.asarray(self.model.encode(texts, batch_size=self.max_batch), dtype=np.float32)
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+                    pending.done.set()
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            start = 0
+            for pending in batch:
+                pending.vectors = vectors[start:start + len(pending.texts)]
+                start += len(pending.texts)
+                pending.done.set()
+
+
+class _EncodeHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        while True:
+            try:
+                body = _recv_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            if body is None:
+                return
+
+            try:
+                texts = json.loads(body)["texts"]
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                    raise ValueError("texts must be a list of strings")
+                if texts:
+                    vectors = self.server.batcher.encode(texts)
+                    reply = OK + SHAPE.pack(*vectors.shape) + vectors.tobytes()
+                else:
+                    reply = OK + SHAPE.pack(0, 0)
+            except Exception as e:
+                reply = ERROR + str(e).encode("utf-8")
+
+            try:
+                _send_frame(self.request, reply)
+            except OSError:
+                return
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    """
+    One loaded model for every worker process on the host. Each
+    connection gets a thread; all threads share the MicroBatcher.
+    """
+
+    daemon_threads = True
+    # Every worker may connect at once; the default backlog of 5 makes
+    # non-blocking connects fail with EAGAIN under load
+    request_queue_size = 128
+
+    def __init__(self, path, model, max_batch=64, max_wait=0.005):
+        _remove_stale_socket(path)
+        self.batcher = MicroBatcher(model, max_batch, max_wait)
+        super().__init__(path, _EncodeHandler)
+        os.chmod(path, 0o660)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+
+def _remove_stale_socket(path):
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.remove(path)
+            return
+    raise OSError(f"Another embedding server is already listening on {path}")
@@ -0,0 +1,179 @@
+# matcher/instrumentation.py
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+# ---------------------------------------------------------
+# HISTOGRAMS
+# ---------------------------------------------------------
+# Seconds, Prometheus convention
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, safe across threads."""
+
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}   # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        """Prometheus text exposition lines."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.snapshot().items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGE_SECONDS = Histogram(
+    "resume_matcher_stage_duration_seconds",
+    "Time spent in each instrumented stage of a view.",
+    ("view", "stage"),
+)
+REQUEST_SECONDS = Histogram(
+    "resume_matcher_request_duration_seconds",
+    "Total view time, including middleware inside ServerTimingMiddleware.",
+    ("view", "status"),
+)
+
+
+def render_metrics():
+    return "\n".join(STAGE_SECONDS.render() + REQUEST_SECONDS.render()) + "\n"
+
+
+# ---------------------------------------------------------
+# STAGES
+# ---------------------------------------------------------
+_timings = ContextVar("server_timings", default=None)
+_NOOP = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.append((self.name, time.perf_counter() - self.start))
+        return False
+
+
+def stage(name):
+    """
+    Times a block as one stage of the current request:
+
+        with stage("parse"):
+            text = extract_text_from_file(path)
+
+    Outside an instrumented request (instrumentation off, management
+    commands, tests) this is a shared no-op context manager.
+    """
+    timings = _timings.get()
+    if timings is None:
+        return _NOOP
+    return _Stage(timings, name)
+
+
+@contextmanager
+def collect_stages():
+    """Records stage() timings inside the block as a list of (name, seconds)."""
+    timings = []
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def sum_stages(timings):
+    """{stage: total seconds}; repeated stages (e.g. one per file) are summed."""
+    totals = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return totals
+
+
+# ---------------------------------------------------------
+# MIDDLEWARE
+# ---------------------------------------------------------
+TOKEN_RE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class ServerTimingMiddleware:
+    """
+    Collects stage() timings for each request, reports them in a
+    Server-Timing header (milliseconds) and adds them to the histograms.
+    Does nothing when INSTRUMENTATION_ENABLED is off.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "INSTRUMENTATION_ENABLED", True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with collect_stages() as timings:
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name) if match else "unmatched"
+
+        per_stage = sum_stages(timings)
+        for name, seconds in per_stage.items():
+            STAGE_SECONDS.observe((view, name), seconds)
+        REQUEST_SECONDS.observe((view, str(response.status_code)), total)
+
+        entries = [f"{TOKEN_RE.sub('_', name)};dur={seconds * 1000:.1f}" for name, seconds in per_stage.items()]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        response["Server-Timing"] = ", ".join(entries)
+        return response
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from matcher.analytics import rebuild_rollups
+from matcher.models import MatchRollupDaily, MatchRollupUser
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily and per-user match rollups from the match logs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        matches = rebuild_rollups(chunk_size=options["chunk_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rollups rebuilt → Matches: {matches}, "
+                f"Days: {MatchRollupDaily.objects.count()}, Users: {MatchRollupUser.objects.count()}"
+            )
+        )
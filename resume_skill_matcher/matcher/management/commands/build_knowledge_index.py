@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chatbot.knowledge_index import DATA_DIR, build_index
+
+
+class Command(BaseCommand):
+    help = "Build the BM25 guideline index over chatbot/chatbot-data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--data-dir", type=str, default=DATA_DIR)
+        parser.add_argument("--output", type=str, default=str(settings.KNOWLEDGE_INDEX_PATH))
+
+    def handle(self, *args, **options):
+        count = build_index(options["output"], options["data_dir"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Knowledge index built → {count} snippets written to {options['output']}"
+            )
+        )
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from matcher.compaction import compact_session
+from matcher.models import ChatSession
+
+
+class Command(BaseCommand):
+    help = "Summarize and archive old messages of long chat sessions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-recent", type=int, default=settings.CHAT_KEEP_RECENT)
+        parser.add_argument("--min-messages", type=int, default=settings.CHAT_COMPACT_THRESHOLD)
+
+    def handle(self, *args, **options):
+        keep_recent = options["keep_recent"]
+        min_messages = max(options["min_messages"], keep_recent)
+
+        sessions = (
+            ChatSession.objects
+            .annotate(hot=Count("messages"))
+            .filter(hot__gt=min_messages)
+            .only("id")
+        )
+
+        session_count = 0
+        archived = 0
+        for session in sessions.iterator():
+            archived += compact_session(session, keep_recent=keep_recent)
+            session_count += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compaction complete → Sessions: {session_count}, Messages archived: {archived}"
+            )
+        )
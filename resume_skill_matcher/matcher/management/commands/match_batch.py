@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from matcher.batch import ResultWriter, init_worker, iter_documents, score_document, target_fingerprint
+from matcher.utils import extract_text_from_file
+from skills.catalog import load_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Score a directory or ZIP of resumes against one JD (or, with --resume, "
+        "a batch of JDs against one resume) in a process pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", type=str, help="directory or .zip of .pdf/.docx/.txt/.csv files")
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--jd", type=str, help="job description the source resumes are scored against")
+        target.add_argument("--resume", type=str, help="resume the source job descriptions are scored against")
+        parser.add_argument("--output", type=str, default="match_results.jsonl",
+                            help=".jsonl or .csv; also the checkpoint for resuming")
+        parser.add_argument("--restart", action="store_true", help="discard earlier results in --output")
+        parser.add_argument("--retry-errors", action="store_true",
+                            help="when resuming, score documents that failed earlier again")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunksize", type=int, default=4)
+        parser.add_argument("--csv-text-column", type=str, help="column holding the document text in CSV files")
+        parser.add_argument("--feedback", action="store_true", help="also request Gemini feedback per document")
+        parser.add_argument("--progress", type=int, default=100, help="print progress every N documents")
+
+    def handle(self, *args, **options):
+        target_path = options["jd"] or options["resume"]
+        if not os.path.isfile(target_path):
+            raise CommandError(f"File not found: {target_path}")
+        if not os.path.exists(options["source"]):
+            raise CommandError(f"Source not found: {options['source']}")
+
+        target_text = extract_text_from_file(target_path)
+        writer = ResultWriter(options["output"], target_fingerprint(target_text))
+        if options["restart"] and os.path.exists(options["output"]):
+            os.remove(options["output"])
+
+        try:
+            done, failed = writer.checkpoint()
+            if not options["retry_errors"]:
+                done |= failed
+            items = [
+                item for item in iter_documents(options["source"], options["csv_text_column"])
+                if item["id"] not in done
+            ]
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if done:
+            self.stdout.write(f"Resuming: {len(done)} already scored, {len(items)} to go")
+        if failed:
+            self.stdout.write(
+                f"{len(failed)} failed earlier; "
+                + ("scoring them again" if options["retry_errors"] else "--retry-errors scores them again")
+            )
+
+        # Workers get the catalog up front instead of each reading it from the DB
+        initargs = (target_text, bool(options["jd"]), options["feedback"], load_catalog())
+        stage_totals = {}
+        finished = errors = 0
+        start = time.perf_counter()
+
+        with writer, multiprocessing.Pool(max(1, options["workers"]), init_worker, initargs) as pool:
+            try:
+                for row, stages in pool.imap_unordered(score_document, items, chunksize=max(1, options["chunksize"])):
+                    writer.write(row)
+                    finished += 1
+                    errors += "error" in row
+                    for name, seconds in stages.items():
+                        stage_totals[name] = stage_totals.get(name, 0.0) + seconds
+
+                    if options["progress"] and finished % options["progress"] == 0:
+                        elapsed = time.perf_counter() - start
+                        self.stdout.write(f"{finished}/{len(items)} scored ({finished / elapsed:.1f} files/s)")
+            except KeyboardInterrupt:
+                pool.terminate()
+                raise CommandError(
+                    f"Interrupted after {finished} documents; run the same command again to resume"
+                )
+
+        elapsed = time.perf_counter() - start
+        if stage_totals:
+            self.stdout.write("Per-stage time, summed across workers:")
+        for name, seconds in sorted(stage_totals.items(), key=lambda kv: -kv[1]):
+            self.stdout.write(
+                f"  {name:<10} {seconds:8.2f}s total  {seconds / max(finished, 1) * 1000:8.1f} ms/doc"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Batch complete → Scored: {finished}, Errors: {errors}, Skipped: {len(done)}, "
+                f"Rate: {finished / elapsed if elapsed else 0:.1f} files/s, Output: {options['output']}"
+            )
+        )
@@ -0,0 +1,55 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from matcher.pipeline import analyze_files
+from matcher.profiling import profile_call
+from matcher.reports.render import REPORT_VERSIONS, render_report
+
+
+class Command(BaseCommand):
+    help = "Profile the full resume/JD analysis: per-function hot spots and peak memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("resume", type=str)
+        parser.add_argument("jd", type=str)
+        parser.add_argument("--repeat", type=int, default=1)
+        parser.add_argument("--warmup", type=int, default=1, help="unprofiled runs first, so lazy imports are excluded")
+        parser.add_argument("--reports", nargs="*", default=["pdf", "docx"], choices=sorted(REPORT_VERSIONS))
+        parser.add_argument("--feedback", action="store_true", help="include the Gemini recruiter feedback call")
+        parser.add_argument("--sort", type=str, default="cumulative", choices=["cumulative", "tottime", "ncalls"])
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument("--frames", type=int, default=1, help="traceback depth for allocation sites")
+        parser.add_argument("--output", type=str, help="also write the raw cProfile stats here")
+
+    def handle(self, *args, **options):
+        for path in (options["resume"], options["jd"]):
+            if not os.path.isfile(path):
+                raise CommandError(f"File not found: {path}")
+
+        def run():
+            for _ in range(options["repeat"]):
+                context, _, _ = analyze_files(options["resume"], options["jd"], feedback=options["feedback"])
+                for fmt in options["reports"]:
+                    render_report(fmt, context)
+            return context
+
+        for _ in range(options["warmup"]):
+            run()
+
+        profile = profile_call(run, frames=options["frames"])
+
+        self.stdout.write(profile.hot_spots(options["sort"], options["top"]))
+        self.stdout.write("Top allocation sites still held after the run:")
+        self.stdout.write(profile.allocations_text(options["top"]))
+        if options["output"]:
+            profile.dump(options["output"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Profile complete → Runs: {options['repeat']}, "
+                f"Time: {profile.seconds * 1000:.1f} ms, "
+                f"Peak memory: {profile.peak_bytes / 1024 / 1024:.1f} MiB, "
+                f"Score: {profile.result['score']}"
+            )
+        )
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from matcher.document_store import prune_documents, referenced_document_ids
+
+DB_SESSION_ENGINES = ("django.contrib.sessions.backends.db", "django.contrib.sessions.backends.cached_db")
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stored documents (uploaded chunks, report contexts, ...) that no match, "
+        "chat, rescoring run or unexpired session references any more"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-hours", type=float, default=24,
+            help="keep documents younger than this, which a request may be about to reference",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="only count what would be deleted")
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DB_SESSION_ENGINES:
+            raise CommandError(
+                f"{settings.SESSION_ENGINE} sessions can't be listed, so the documents they reference are unknown"
+            )
+
+        live = Session.objects.filter(expire_date__gt=timezone.now())
+        referenced = referenced_document_ids(session.get_decoded() for session in live.iterator())
+        older_than = timezone.now() - timedelta(hours=options["min_age_hours"])
+
+        deleted = prune_documents(referenced, older_than, dry_run=options["dry_run"])
+        if options["dry_run"]:
+            self.stdout.write(f"{deleted} unreferenced documents would be deleted")
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Prune complete → Referenced: {len(referenced)}, Deleted: {deleted}")
+        )
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from matcher.rescoring import (
+    affected_documents,
+    baseline_catalog,
+    catalog_diff,
+    record_run,
+    rescore_matches,
+    update_index,
+)
+from skills.catalog import load_catalog, use_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-score stored matches after skills or aliases change: diff the skill catalog "
+        "against the last run and re-analyse only the documents containing changed aliases"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="report what would be re-scored, change nothing (not even the index)")
+        parser.add_argument("--rebuild-index", action="store_true",
+                            help="re-tokenize every stored document first (ignored with --dry-run)")
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        start = time.perf_counter()
+
+        dry_run = options["dry_run"]
+        if not dry_run:
+            indexed = update_index(batch_size, rebuild=options["rebuild_index"])
+            if indexed:
+                self.stdout.write(f"Indexed {indexed} documents")
+
+        catalog = load_catalog()
+        aliases = catalog_diff(baseline_catalog(), catalog)
+        affected = affected_documents(aliases, batch_size, read_only=dry_run)
+        documents = sum(len(ids) for ids in affected.values())
+        self.stdout.write(
+            f"{len(aliases)} aliases changed → {len(affected['resume'])} resumes, "
+            f"{len(affected['jd'])} job descriptions affected"
+        )
+        if dry_run:
+            for alias in aliases[:50]:
+                self.stdout.write(f"  {alias}")
+            return
+
+        # Score with exactly the catalog that was diffed, not a cached copy
+        use_catalog(catalog)
+        matches, changed = rescore_matches(affected["resume"], affected["jd"], batch_size)
+        record_run(catalog, len(aliases), documents, matches)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rescore complete → Aliases: {len(aliases)}, Documents: {documents}, "
+                f"Matches: {matches}, Scores changed: {changed}, "
+                f"Time: {time.perf_counter() - start:.1f}s"
+            )
+        )
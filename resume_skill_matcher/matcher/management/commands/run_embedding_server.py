@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from matcher.embeddings import EmbeddingServer, socket_path
+
+
+class Command(BaseCommand):
+    help = "Serve sentence embeddings to all workers over a Unix socket"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--socket", type=str, default=socket_path())
+        parser.add_argument("--model", type=str, default=settings.EMBEDDING_MODEL)
+        parser.add_argument("--max-batch", type=int, default=settings.EMBEDDING_MAX_BATCH)
+        parser.add_argument("--max-wait-ms", type=float, default=settings.EMBEDDING_MAX_WAIT_MS)
+
+    def handle(self, *args, **options):
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(options["model"])
+        model.encode(["warm up"])
+
+        server = EmbeddingServer(
+            options["socket"],
+            model,
+            max_batch=options["max_batch"],
+            max_wait=options["max_wait_ms"] / 1000,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Embedding server ({options['model']}) listening on {options['socket']}")
+        )
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matcher', '0008_storeddocument'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(fields=['user', '-pinned', '-created_at', '-id'], name='chatsession_sidebar_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('matcher', '0011_chat_compaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchRollupDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('semantic_count', models.PositiveIntegerField(default=0)),
+                ('semantic_sum', models.FloatField(default=0)),
+                ('score_hist', models.JSONField(default=list)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MatchRollupUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('semantic_count', models.PositiveIntegerField(default=0)),
+                ('semantic_sum', models.FloatField(default=0)),
+                ('score_hist', models.JSONField(default=list)),
+                ('last_match_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='match_rollup', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matcher', '0014_resume_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumematchlog',
+            name='job_description',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='matcher.jobdescription'),
+        ),
+        migrations.AddField(
+            model_name='resumematchlog',
+            name='resume',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='matcher.resume'),
+        ),
+        migrations.CreateModel(
+            name='SkillRescoreRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('changed_aliases', models.PositiveIntegerField(default=0)),
+                ('documents', models.PositiveIntegerField(default=0)),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('catalog', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='matcher.storeddocument')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SkillIndexPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('kind', models.CharField(choices=[('resume', 'Resume'), ('jd', 'Job description')], max_length=8)),
+                ('document_id', models.BigIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'kind'], name='skillindex_token_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='skillindexposting',
+            constraint=models.UniqueConstraint(fields=('kind', 'document_id', 'token'), name='skillindex_doc_token_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matcher', '0015_skill_rescoring'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='document_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
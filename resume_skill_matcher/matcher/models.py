@@ -7,6 +7,13 @@ class Resume(models.Model):
     resume_file = models.FileField(upload_to="resumes/")
     extracted_text = models.TextField(blank=True, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # sha256 of the file, set by ZIP imports to skip duplicate resumes
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "content_hash"], name="resume_user_hash_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} Resume"
@@ -16,6 +23,17 @@ class ResumeMatchLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     score = models.FloatField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # report_context of the analysis, used for bulk report export
+    report = models.ForeignKey(
+        "StoredDocument", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    # Documents the match was scored from, so catalog changes can re-score it
+    resume = models.ForeignKey(
+        Resume, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    job_description = models.ForeignKey(
+        "JobDescription", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
 
 class JobDescription(models.Model):
     title = models.CharField(max_length=255)
@@ -34,13 +52,69 @@ class MatchAnalytics(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
 
+class MatchRollupDaily(models.Model):
+    """
+    Per-day totals of recorded matches, kept current by
+    matcher.analytics.record_match. score_hist is a fixed-bin histogram
+    (one bin per score point) so days merge by adding bins.
+    """
+    day = models.DateField(unique=True)
+    count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    semantic_count = models.PositiveIntegerField(default=0)
+    semantic_sum = models.FloatField(default=0)
+    score_hist = models.JSONField(default=list)
+
+
+class MatchRollupUser(models.Model):
+    """Same totals as MatchRollupDaily, per user over all time."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="match_rollup")
+    count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    semantic_count = models.PositiveIntegerField(default=0)
+    semantic_sum = models.FloatField(default=0)
+    score_hist = models.JSONField(default=list)
+    last_match_at = models.DateTimeField(null=True, blank=True)
+
+
+class StoredDocument(models.Model):
+    """
+    Content-addressed, zlib-compressed JSON blob (uploaded document
+    chunks, report contexts, ...). Sessions and chats keep only the id.
+    See matcher/document_store.py.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    kind = models.CharField(max_length=32)
+    data = models.BinaryField()
+    size = models.PositiveIntegerField(help_text="Uncompressed size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.sha256[:12]}"
+
+
 class ChatSession(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     title = models.CharField(max_length=255, default="New Conversation")
     created_at = models.DateTimeField(auto_now_add=True)
     document_text  = models.TextField(null=True, blank=True)
+    document = models.ForeignKey(
+        StoredDocument, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    # StoredDocument ids of the uploaded chunks, one per upload (document is
+    # the single combined copy older chats point at)
+    document_ids = models.JSONField(default=list, blank=True)
     pinned = models.BooleanField(default=False) 
+    # Rolling memory of turns that were compacted into ArchivedMessageBatch
+    summary = models.TextField(blank=True, default="")
+    summary_through_id = models.BigIntegerField(null=True, blank=True)
+    archived_count = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            # Sidebar order: pinned chats first, newest first (keyset pagination)
+            models.Index(fields=["user", "-pinned", "-created_at", "-id"], name="chatsession_sidebar_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
@@ -53,4 +127,58 @@ class ChatMessage(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # Keyset pages and incremental polling within one conversation
+            models.Index(fields=["session", "timestamp", "id"], name="chatmessage_session_ts_idx"),
+        ]
+
 
+
+class ArchivedMessageBatch(models.Model):
+    """
+    A run of old ChatMessage rows moved out of the hot table,
+    stored as zlib-compressed JSON. See matcher/compaction.py.
+    """
+    session = models.ForeignKey(ChatSession, related_name='archived_batches', on_delete=models.CASCADE)
+    first_message_id = models.BigIntegerField()
+    last_message_id = models.BigIntegerField()
+    message_count = models.PositiveIntegerField()
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['first_message_id']
+        indexes = [
+            models.Index(fields=["session", "last_message_id"], name="archivedbatch_session_idx"),
+        ]
+
+
+class SkillIndexPosting(models.Model):
+    """
+    One entry of the token -> document inverted index over
+    Resume/JobDescription.extracted_text, used to find the documents a
+    skill catalog change can affect. See matcher/rescoring.py.
+    """
+    token = models.CharField(max_length=64)
+    kind = models.CharField(max_length=8, choices=[("resume", "Resume"), ("jd", "Job description")])
+    document_id = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "document_id", "token"], name="skillindex_doc_token_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["token", "kind"], name="skillindex_token_idx"),
+        ]
+
+
+class SkillRescoreRun(models.Model):
+    """A finished rescore_skills run; the latest one's catalog is the baseline for the next diff."""
+    catalog = models.ForeignKey(StoredDocument, on_delete=models.PROTECT, related_name="+")
+    changed_aliases = models.PositiveIntegerField(default=0)
+    documents = models.PositiveIntegerField(default=0)
+    matches = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
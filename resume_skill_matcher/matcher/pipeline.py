@@ -0,0 +1,156 @@
+# matcher/pipeline.py
+
+from django.conf import settings
+
+from .instrumentation import stage
+from .models import JobDescription, Resume
+from .utils import (
+    ats_scorecard,
+    calculate_match_score,
+    detect_job_role,
+    detect_seniority,
+    extract_requirements,
+    extract_skills,
+    extract_text_from_file,
+    recruiter_resume_feedback,
+    requirement_match_score,
+    role_fit_score,
+)
+
+DEFAULT_FEEDBACK = (
+    "Resume is relevant but can improve keyword alignment, impact statements, "
+    "and clarity for better recruiter appeal."
+)
+
+
+def save_documents(user, resume_text, jd_text, resume_file=None, jd_file=None):
+    """
+    Resume and JobDescription rows for one analysis. Uploaded files are
+    written to storage here, after parsing, and only when
+    STORE_UPLOADED_FILES is on; otherwise just the text is kept.
+    """
+    keep_files = settings.STORE_UPLOADED_FILES
+    resume = Resume(user=user, extracted_text=resume_text)
+    jd = JobDescription(extracted_text=jd_text)
+    if keep_files and resume_file is not None:
+        resume.resume_file = resume_file
+    if keep_files and jd_file is not None:
+        jd.jd_file = jd_file
+    resume.save()
+    jd.save()
+    return resume, jd
+
+
+def analyze_files(resume_path, jd_path, feedback=True):
+    """analyze_texts() for a resume and a JD on disk; returns (report_context, resume_text, jd_text)."""
+    with stage("parse"):
+        resume_text = extract_text_from_file(resume_path)
+        jd_text = extract_text_from_file(jd_path)
+    return analyze_texts(resume_text, jd_text, feedback=feedback), resume_text, jd_text
+
+
+def analyze_texts(resume_text, jd_text, feedback=True):
+    """
+    The full resume/JD analysis behind the upload page, as the
+    report_context dict the result page and reports render. With
+    feedback=False the Gemini call is skipped and DEFAULT_FEEDBACK used.
+    """
+    with stage("skills"):
+        resume_skills = extract_skills(resume_text)
+        jd_skills = extract_skills(jd_text)
+
+    with stage("scoring"):
+        # ---------- SKILL MATCH ----------
+        matched_skills = list(set(resume_skills) & set(jd_skills))
+        missing_skills = list(set(jd_skills) - set(resume_skills))
+        score = calculate_match_score(resume_skills, jd_skills)
+
+        score_breakdown = {
+            "total_jd_skills": len(jd_skills),
+            "matched_skills": len(matched_skills),
+            "missing_skills": len(missing_skills),
+        }
+
+        confidence_level = (
+            "High" if score >= 75 else
+            "Medium" if score >= 50 else
+            "Low"
+        )
+
+        # ---------- ROLE & LEVEL ----------
+        jd_role = detect_job_role(jd_text)
+        resume_role = detect_job_role(resume_text)
+
+        jd_level = detect_seniority(jd_text)
+        resume_level = detect_seniority(resume_text)
+
+        role_score = role_fit_score(jd_role, resume_role)
+
+        # ---------- REQUIREMENTS ----------
+        requirements = extract_requirements(jd_text)
+        req_match_score = requirement_match_score(resume_text, requirements)
+
+        # ---------- SECTION SCORES ----------
+        section_scores = {
+            "technical": min(100, score + 10),
+            "experience": score,
+            "ats": min(100, score + 20),
+        }
+
+        # ---------- WARNINGS ----------
+        warnings = []
+
+        if jd_role != resume_role:
+            warnings.append({
+                "level": "critical",
+                "message": f"Resume role does not match JD role ({resume_role} vs {jd_role})."
+            })
+
+        if jd_level != resume_level:
+            warnings.append({
+                "level": "moderate",
+                "message": f"Expected {jd_level} level but resume appears {resume_level}."
+            })
+
+        if req_match_score < 50:
+            warnings.append({
+                "level": "warning",
+                "message": "Less than 50% of job requirements are covered."
+            })
+
+        if not warnings:
+            warnings.append({
+                "level": "success",
+                "message": "Resume aligns well with the job description."
+            })
+
+        # ---------- ATS SCORE ----------
+        ats_scores, ats_insights = ats_scorecard(
+            resume_text, jd_text, resume_skills, jd_skills
+        )
+
+    # ---------- AI FEEDBACK ----------
+    recruiter_feedback = None
+    if feedback:
+        with stage("gemini"):
+            recruiter_feedback = recruiter_resume_feedback(resume_text, jd_text)
+
+    return {
+        "score": score,
+        "confidence_level": confidence_level,
+        "skills": resume_skills,
+        "missing_skills": missing_skills,
+        "score_breakdown": score_breakdown,
+        "section_scores": section_scores,
+        "jd_role": jd_role,
+        "resume_role": resume_role,
+        "role_fit_score": role_score,
+        "jd_level": jd_level,
+        "resume_level": resume_level,
+        "requirements": requirements,
+        "requirement_match_score": req_match_score,
+        "warnings": warnings,
+        "ats_scores": ats_scores,
+        "ats_insights": ats_insights,
+        "recruiter_feedback": recruiter_feedback or DEFAULT_FEEDBACK,
+    }
@@ -0,0 +1,186 @@
+# matcher/profiling.py
+
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# PROFILING
+# ---------------------------------------------------------
+# tracemalloc is process-wide, so only one profile runs at a time
+_busy = threading.Lock()
+
+
+class ProfileResult:
+    def __init__(self, result, profiler, allocations, peak_bytes, seconds):
+        self.result = result
+        self.profiler = profiler
+        self.allocations = allocations
+        self.peak_bytes = peak_bytes
+        self.seconds = seconds
+
+    def stats(self, stream=None):
+        return pstats.Stats(self.profiler, stream=stream)
+
+    def hot_spots(self, sort="cumulative", limit=25):
+        """pstats table of the top `limit` functions."""
+        out = io.StringIO()
+        self.stats(out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def top_allocations(self, limit=15):
+        """Allocation sites still holding memory when the call returned."""
+        return self.allocations[:limit]
+
+    def allocations_text(self, limit=15):
+        lines = [f"Peak traced memory: {self.peak_bytes / 1024 / 1024:.1f} MiB"]
+        for stat in self.top_allocations(limit):
+            frame = stat.traceback[0]
+            lines.append(
+                f"{stat.size_diff / 1024:10.1f} KiB {stat.count_diff:7d} blocks  {frame.filename}:{frame.lineno}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, path):
+        self.profiler.dump_stats(path)
+
+
+def profile_call(fn, *args, frames=1, **kwargs):
+    """
+    Runs fn(*args, **kwargs) under cProfile and tracemalloc and returns a
+    ProfileResult. The call's exception, if any, propagates after tracing
+    is stopped.
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(frames)
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        result = profiler.runcall(fn, *args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        after = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+
+    # Only what the call allocated and kept, not the tracer's own frames
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    allocations = [
+        stat for stat in after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+        if stat.size_diff > 0
+    ]
+    return ProfileResult(result, profiler, allocations, peak, seconds)
+
+
+# ---------------------------------------------------------
+# STORAGE
+# ---------------------------------------------------------
+NAME_RE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def profile_dir():
+    return settings.PROFILING_DIR or os.path.join(tempfile.gettempdir(), "resume_matcher_profiles")
+
+
+def save_profile(profile, label, directory=None, keep=None):
+    """
+    Writes <stamp>-<label>.prof (load with pstats or snakeviz) and a .txt
+    summary of hot spots and allocation sites. Returns the file stem.
+    """
+    directory = directory or profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"{now % 1:.3f}"[1:]
+    stem = f"{stamp}-{os.getpid()}-{NAME_RE.sub('_', label)[:60]}"
+    base = os.path.join(directory, stem)
+
+    profile.dump(base + ".prof")
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(f"{label}\nWall time: {profile.seconds * 1000:.1f} ms\n\n")
+        f.write(profile.allocations_text())
+        f.write("\n\n")
+        f.write(profile.hot_spots())
+
+    _prune(directory, settings.PROFILING_KEEP if keep is None else keep)
+    return stem
+
+
+def _prune(directory, keep):
+    """Keeps the newest `keep` profiles."""
+    stems = sorted({
+        name.rsplit(".", 1)[0] for name in os.listdir(directory)
+        if name.endswith((".prof", ".txt"))
+    })
+    for stem in stems[:max(0, len(stems) - keep)]:
+        for ext in (".prof", ".txt"):
+            try:
+                os.remove(os.path.join(directory, stem + ext))
+            except FileNotFoundError:
+                pass
+
+
+# ---------------------------------------------------------
+# MIDDLEWARE
+# ---------------------------------------------------------
+class ProfilingMiddleware:
+    """
+    Profiles single requests on demand: a staff user sending
+    "X-Profile: 1" (or ?__profile=1), or any request carrying
+    "X-Profile-Token: <PROFILING_TOKEN>". The response names the saved
+    profile in X-Profile-Id. Every other request passes straight through.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "PROFILING_ENABLED", True)
+
+    def wants_profile(self, request):
+        token = settings.PROFILING_TOKEN
+        supplied = request.headers.get("X-Profile-Token")
+        if token and supplied:
+            return hmac.compare_digest(supplied.encode(), token.encode())
+
+        asked = request.headers.get("X-Profile") == "1" or request.GET.get("__profile") == "1"
+        user = getattr(request, "user", None)
+        return asked and user is not None and user.is_staff
+
+    def __call__(self, request):
+        if not self.enabled or not self.wants_profile(request):
+            return self.get_response(request)
+
+        if not _busy.acquire(blocking=False):
+            response = self.get_response(request)
+            response["X-Profile-Id"] = "busy"
+            return response
+
+        try:
+            profile = profile_call(self.get_response, request)
+        finally:
+            _busy.release()
+
+        response = profile.result
+        # Streaming bodies are produced after this returns and are not
+        # included in the profile
+        try:
+            response["X-Profile-Id"] = save_profile(profile, f"{request.method} {request.path}")
+        except OSError as e:
+            logger.warning("Could not save request profile: %s", e)
+        return response
@@ -0,0 +1,120 @@
+# matcher/rate_limit.py
+
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: limits are per process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# tokens (may go negative = callers already queued), last refill time
+STATE = struct.Struct("<dd")
+
+
+class RateLimited(Exception):
+    """The call would have to wait longer than the caller can afford."""
+
+    def __init__(self, provider, wait):
+        self.provider = provider
+        self.wait = wait
+        super().__init__(f"{provider} rate limit: next slot in {wait:.1f}s")
+
+
+# ---------------------------------------------------------
+# TOKEN BUCKET
+# ---------------------------------------------------------
+class TokenBucket:
+    """
+    Token bucket shared by every process on the host through a small
+    state file guarded by flock.
+
+    A caller that finds the bucket empty reserves a future token by
+    driving the balance negative; the deficit is the wait queue. If
+    its turn would come after max_wait it is rejected up front and
+    takes no token, so a call that can't finish in time is never made.
+    """
+
+    def __init__(self, name, per_minute, burst, state_dir):
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.burst = float(burst)
+        self.path = os.path.join(state_dir, f"{name}.bucket")
+        self._local_lock = threading.Lock()
+        os.makedirs(state_dir, exist_ok=True)
+
+    def _reserve(self, max_wait):
+        with self._local_lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+
+                now = time.time()
+                raw = os.pread(fd, STATE.size, 0)
+                tokens, updated = STATE.unpack(raw) if len(raw) == STATE.size else (self.burst, now)
+
+                tokens = min(self.burst, tokens + (now - updated) * self.rate)
+                wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+                if wait > max_wait:
+                    os.pwrite(fd, STATE.pack(tokens, now), 0)
+                    raise RateLimited(self.name, wait)
+
+                os.pwrite(fd, STATE.pack(tokens - 1, now), 0)
+                return wait
+            finally:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def acquire(self, max_wait=0.0):
+        """Blocks until this caller's token is due. Raises RateLimited instead of waiting past max_wait."""
+        wait = self._reserve(max_wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+# ---------------------------------------------------------
+# PROVIDER BUCKETS
+# ---------------------------------------------------------
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(provider):
+    with _buckets_lock:
+        bucket = _buckets.get(provider)
+        if bucket is None:
+            limits = settings.LLM_RATE_LIMITS[provider]
+            state_dir = getattr(settings, "LLM_RATE_LIMIT_DIR", None) or os.path.join(
+                tempfile.gettempdir(), "resume_matcher_ratelimit"
+            )
+            bucket = TokenBucket(provider, limits["per_minute"], limits["burst"], state_dir)
+            _buckets[provider] = bucket
+        return bucket
+
+
+def acquire_llm_slot(provider, max_wait=None):
+    """
+    Waits for the provider's shared budget. max_wait defaults to the
+    provider's configured queue time; pass less when the caller's own
+    deadline is closer.
+    """
+    if max_wait is None:
+        max_wait = settings.LLM_RATE_LIMITS[provider].get("max_wait", 0)
+
+    try:
+        return get_bucket(provider).acquire(max_wait)
+    except RateLimited as e:
+        logger.warning("Rejected %s call: %s", provider, e)
+        raise
@@ -0,0 +1,137 @@
+# matcher/report_cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+
+# ---------------------------------------------------------
+# KEYS
+# ---------------------------------------------------------
+def report_key(context, fmt, version):
+    """Stable hash of everything that determines the rendered bytes."""
+    raw = json.dumps(
+        {"context": context, "format": fmt, "version": version},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------
+# DISK CACHE
+# ---------------------------------------------------------
+class ReportCache:
+    """
+    Rendered reports on disk, one file per key.
+    A file's mtime is when it was rendered (used for Last-Modified) and
+    its atime is bumped on every hit, so eviction drops the least
+    recently downloaded reports once the directory passes max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._evict_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key, ext):
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def lookup(self, key, ext):
+        """(path, rendered_at) for a cached report, or None."""
+        path = self.path_for(key, ext)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        os.utime(path, (time.time(), st.st_mtime))
+        return path, st.st_mtime
+
+    def get_or_render(self, key, ext, render):
+        """
+        Returns (path, rendered_at). On a miss render(fileobj) writes the
+        report into a temp file which is then moved into place, so readers
+        never see a half-written report.
+        """
+        hit = self.lookup(key, ext)
+        if hit:
+            return hit
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                render(f)
+            path = self.path_for(key, ext)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        rendered_at = os.stat(path).st_mtime
+        self.evict()
+        return path, rendered_at
+
+    def open_or_render(self, key, ext, render):
+        """
+        (open binary file, rendered_at). The report is opened here rather
+        than by the caller: once open it survives another worker's
+        eviction, and one evicted before it could be opened is rendered
+        again.
+        """
+        for _ in range(2):
+            path, rendered_at = self.get_or_render(key, ext, render)
+            try:
+                return open(path, "rb"), rendered_at
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(f"Report {key}.{ext} was evicted while it was being served")
+
+    def evict(self):
+        with self._evict_lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".part"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_atime, st.st_size, entry.path))
+                total += st.st_size
+
+            entries.sort()
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            return removed
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_report_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            directory = settings.REPORT_CACHE_DIR or os.path.join(
+                tempfile.gettempdir(), "resume_matcher_reports"
+            )
+            _cache = ReportCache(directory, settings.REPORT_CACHE_MAX_BYTES)
+        return _cache
@@ -4,15 +4,10 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
-import matplotlib.pyplot as plt
-import tempfile
-import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from functools import lru_cache
+from io import BytesIO
 
 
-TEMP_IMAGES = []  # Track images to delete later
-
 
 def set_cell_bg(cell, color_hex):
     tc = cell._tc
@@ -59,25 +54,36 @@ def add_bullets(doc, items):
         doc.add_paragraph(item, style="List Bullet")
 
 
-def add_chart_image(doc, title, data_dict):
-    add_heading(doc, title, level=3)
+@lru_cache(maxsize=64)
+def _bar_chart_png(labels, values):
+    # Object-oriented Agg API: no pyplot global state, safe across threads.
+    # matplotlib is only imported once a DOCX report is actually requested.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(6, 3))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.bar(labels, values)
+    ax.set_ylim(0, 100)
+    fig.tight_layout()
 
-    labels = list(data_dict.keys())
-    values = list(data_dict.values())
+    buf = BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
 
-    plt.figure(figsize=(6, 3))
-    plt.bar(labels, values)
-    plt.ylim(0, 100)
-    plt.tight_layout()
 
-    fd, path = tempfile.mkstemp(suffix=".png")
-    os.close(fd)  # 🔑 CRITICAL FOR WINDOWS
+def chart_png(data_dict):
+    """PNG bytes for a 0-100 bar chart, cached by its labels and values."""
+    return _bar_chart_png(
+        tuple(str(k) for k in data_dict),
+        tuple(float(v) for v in data_dict.values()),
+    )
 
-    plt.savefig(path)
-    plt.close()
 
-    doc.add_picture(path, width=Inches(5))
-    TEMP_IMAGES.append(path)  # delete later
+def add_chart_image(doc, title, data_dict):
+    add_heading(doc, title, level=3)
+    doc.add_picture(BytesIO(chart_png(data_dict)), width=Inches(5))
 
 
 def generate_docx_report(response, context):
@@ -110,18 +116,13 @@ def generate_docx_report(response, context):
         if line.strip():
             doc.add_paragraph(line)
 
-    # Save DOCX first
     doc.save(response)
 
-    # 🔥 NOW SAFE TO DELETE TEMP FILES
-    for img in TEMP_IMAGES:
-        try:
-            os.remove(img)
-        except Exception:
-            pass
-
 
 def skill_gap_score(resume_text, jd_text):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
     tfidf = TfidfVectorizer(stop_words="english")
     vectors = tfidf.fit_transform([resume_text, jd_text])
     similarity = cosine_similarity(vectors[0], vectors[1])[0][0]
@@ -0,0 +1,33 @@
+from io import BytesIO
+
+
+# Bump a format's version when its layout in pdf_report.py / docx_report.py
+# changes, so cached reports are re-rendered
+REPORT_VERSIONS = {
+    "pdf": 1,
+    "docx": 1,
+}
+
+
+def write_report(fmt, out, context):
+    """
+    Renders one report into a file-like object. The generator modules
+    (reportlab, python-docx, matplotlib) are imported on first use.
+    """
+    if fmt == "pdf":
+        from .pdf_report import generate_pdf_report as generate
+    elif fmt == "docx":
+        from .docx_report import generate_docx_report as generate
+    else:
+        raise ValueError(f"Unsupported report format: {fmt}")
+    generate(out, context)
+
+
+def render_report(fmt, context):
+    """
+    Report bytes for one context. Kept free of Django imports so it can
+    run in a worker process.
+    """
+    buf = BytesIO()
+    write_report(fmt, buf, context)
+    return buf.getvalue()
@@ -0,0 +1,227 @@
+# matcher/rescoring.py
+
+import logging
+import re
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from skills.catalog import alias_pattern, builtin_catalog
+
+from .analytics import record_rescores
+from .document_store import get_document, put_document
+from .models import JobDescription, Resume, ResumeMatchLog, SkillIndexPosting, SkillRescoreRun
+from .pipeline import analyze_texts
+
+KINDS = {"resume": Resume, "jd": JobDescription}
+TOKEN_RE = re.compile(r"\w+")
+TOKEN_MAX = SkillIndexPosting._meta.get_field("token").max_length
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# INVERTED INDEX
+# ---------------------------------------------------------
+def tokenize(text):
+    """
+    Distinct word tokens of text. Any text a skill alias matches (as
+    \\b<alias>\\b) contains every token of the alias, so the index can
+    narrow a multi-word alias down to the documents holding all of them.
+    """
+    return {token[:TOKEN_MAX] for token in TOKEN_RE.findall((text or "").lower())}
+
+
+def index_documents(kind, documents):
+    """(Re)indexes documents of one kind: Resume or JobDescription rows."""
+    documents = [doc for doc in documents if doc.pk is not None]
+    with transaction.atomic():
+        SkillIndexPosting.objects.filter(kind=kind, document_id__in=[doc.pk for doc in documents]).delete()
+        SkillIndexPosting.objects.bulk_create(
+            [
+                SkillIndexPosting(kind=kind, document_id=doc.pk, token=token)
+                for doc in documents
+                for token in tokenize(doc.extracted_text)
+            ],
+            batch_size=2000,
+        )
+
+
+def update_index(batch_size=200, rebuild=False):
+    """
+    Indexes every stored document that has no postings yet (all of them
+    with rebuild=True) and drops postings of deleted documents. Stored
+    texts are never edited, so this keeps the index current.
+    Returns the number of documents indexed.
+    """
+    indexed = 0
+    for kind, model in KINDS.items():
+        postings = SkillIndexPosting.objects.filter(kind=kind)
+        if rebuild:
+            postings.delete()
+        else:
+            postings.exclude(document_id__in=model.objects.values("pk")).delete()
+
+        pending = _with_text(model) if rebuild else _unindexed(kind, model)
+        batch = []
+        for doc in pending.only("pk", "extracted_text").iterator(chunk_size=batch_size):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                index_documents(kind, batch)
+                indexed += len(batch)
+                batch = []
+        index_documents(kind, batch)
+        indexed += len(batch)
+    return indexed
+
+
+def _with_text(model):
+    return model.objects.exclude(extracted_text__isnull=True).exclude(extracted_text="")
+
+
+def _unindexed(kind, model):
+    """Documents with text but no postings yet."""
+    return _with_text(model).filter(
+        ~Exists(SkillIndexPosting.objects.filter(kind=kind, document_id=OuterRef("pk")))
+    )
+
+
+def documents_with_alias(alias, batch_size=200, read_only=False):
+    """
+    {kind: ids} of stored documents whose text contains alias. With
+    read_only=True the index may be stale (a dry run doesn't update it):
+    index hits are confirmed against the documents and unindexed
+    documents are scanned.
+    """
+    tokens = tokenize(alias)
+    pattern = alias_pattern(alias)
+    found = {}
+    for kind, model in KINDS.items():
+        if tokens:
+            candidates = (
+                SkillIndexPosting.objects.filter(kind=kind, token__in=tokens)
+                .values("document_id")
+                .annotate(n=Count("token"))
+                .filter(n=len(tokens))
+                .values_list("document_id", flat=True)
+            )
+            candidates = sorted(candidates)
+        else:
+            # An alias without word characters can't be looked up; scan everything
+            candidates = sorted(model.objects.values_list("pk", flat=True))
+
+        if tokens == {alias} and TOKEN_RE.fullmatch(alias) and not read_only:
+            # A one-word alias matches exactly the documents holding its token
+            found[kind] = set(candidates)
+            continue
+
+        # Otherwise the index only guarantees the tokens occur somewhere; confirm the phrase
+        ids = set()
+        for start in range(0, len(candidates), batch_size):
+            chunk = model.objects.filter(pk__in=candidates[start:start + batch_size])
+            for pk, text in chunk.values_list("pk", "extracted_text"):
+                if text and pattern.search(text.lower()):
+                    ids.add(pk)
+        if read_only:
+            for pk, text in _unindexed(kind, model).values_list("pk", "extracted_text").iterator(chunk_size=batch_size):
+                if pattern.search(text.lower()):
+                    ids.add(pk)
+        found[kind] = ids
+    return found
+
+
+# ---------------------------------------------------------
+# CATALOG DIFF
+# ---------------------------------------------------------
+def baseline_catalog():
+    """
+    Catalog the stored analyses were last brought up to date with. Before
+    the first run that is MASTER_SKILLS, which was all the matcher used.
+    """
+    run = SkillRescoreRun.objects.first()
+    if run is None:
+        return builtin_catalog()
+    catalog = get_document(run.catalog_id)
+    if catalog is None:
+        # Diffing against MASTER_SKILLS re-scores more than needed, never less
+        logger.warning("Catalog of rescore run %s could not be loaded; diffing against MASTER_SKILLS", run.pk)
+        return builtin_catalog()
+    return catalog
+
+
+def catalog_diff(old, new):
+    """Aliases added, removed, or moved to another skill between two catalogs."""
+    def pairs(catalog):
+        return {(skill, alias) for skill, aliases in catalog.items() for alias in aliases}
+
+    return sorted({alias for _, alias in pairs(old) ^ pairs(new)})
+
+
+def affected_documents(aliases, batch_size=200, read_only=False):
+    affected = {kind: set() for kind in KINDS}
+    for alias in aliases:
+        for kind, ids in documents_with_alias(alias, batch_size, read_only).items():
+            affected[kind] |= ids
+    return affected
+
+
+# ---------------------------------------------------------
+# RESCORING
+# ---------------------------------------------------------
+def rescore_matches(resume_ids, jd_ids, batch_size=200):
+    """
+    Re-runs the analysis (without Gemini; earlier feedback is kept) for
+    every match scored from one of the given documents, saving scores,
+    reports and rollups one transaction per batch_size matches.
+    Returns (matches re-scored, matches whose score changed).
+    """
+    matches = (
+        ResumeMatchLog.objects
+        .filter(Q(resume_id__in=resume_ids) | Q(job_description_id__in=jd_ids))
+        .exclude(resume=None)
+        .exclude(job_description=None)
+        .select_related("resume", "job_description")
+        .order_by("pk")
+    )
+    done = changed = 0
+    last_pk = 0
+    while True:
+        # Keyset pages, so long-running batches don't hold one big cursor
+        batch = list(matches.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        changed += _rescore_batch(batch)
+        done += len(batch)
+    return done, changed
+
+
+def _rescore_batch(logs):
+    changes = []
+    for log in logs:
+        context = analyze_texts(
+            log.resume.extracted_text or "", log.job_description.extracted_text or "", feedback=False
+        )
+        previous = get_document(log.report_id) or {}
+        if previous.get("recruiter_feedback"):
+            context["recruiter_feedback"] = previous["recruiter_feedback"]
+
+        old_score = log.score
+        log.score = context["score"]
+        log.report_id = put_document(context, "report_context")
+        if log.score != old_score:
+            changes.append((log, old_score))
+
+    with transaction.atomic():
+        ResumeMatchLog.objects.bulk_update(logs, ["score", "report"])
+        record_rescores(changes)
+    return len(changes)
+
+
+def record_run(catalog, changed_aliases, documents, matches):
+    return SkillRescoreRun.objects.create(
+        catalog_id=put_document(catalog, "skill_catalog"),
+        changed_aliases=changed_aliases,
+        documents=documents,
+        matches=matches,
+    )
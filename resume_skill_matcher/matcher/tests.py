@@ -1,3 +1,1906 @@
-from django.test import TestCase
+import asyncio
+import importlib.util
+import json
+import os
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import LiveServerTestCase, TestCase, override_settings
+
+from .chat_cache import AnswerCache, answer_cache, make_answer_key
+from .models import ChatMessage, ChatSession
+
+
+class FakeInferenceClient:
+    """Stand-in for huggingface_hub.AsyncInferenceClient."""
+
+    def __init__(self, tokens, delay=0):
+        self.tokens = tokens
+        self.delay = delay
+        self.calls = []
+
+    async def text_generation(self, prompt, stream=False, **kwargs):
+        self.calls.append({"prompt": prompt, "stream": stream, **kwargs})
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if stream:
+            return self._stream()
+        return "".join(self.tokens)
+
+    async def _stream(self):
+        for token in self.tokens:
+            yield token
+
+
+@unittest.skipUnless(importlib.util.find_spec("fastapi"), "fastapi not installed")
+class ChatStreamEndpointTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.environ.setdefault("HF_TOKEN", "test-token")
+        from fastapi.testclient import TestClient
+        from chatbot import app as chatbot_app
+
+        cls.chatbot_app = chatbot_app
+        cls.http = TestClient(chatbot_app.app)
+
+    def test_stream_relays_tokens_in_order(self):
+        fake = FakeInferenceClient(["Hello", " ", "world"])
+        payload = {"prompt": "Q", "system_prompt": "S", "max_tokens": 5}
+
+        with mock.patch.object(self.chatbot_app, "client", fake):
+            response = self.http.post("/chat/stream", json=payload)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "Hello world")
+        self.assertTrue(fake.calls[0]["stream"])
+        self.assertEqual(fake.calls[0]["prompt"], "S\n\nQ")
+        self.assertEqual(fake.calls[0]["max_new_tokens"], 5)
+
+    def test_stream_latency_covers_the_whole_generation(self):
+        class SlowStream(FakeInferenceClient):
+            async def _stream(self):
+                for token in self.tokens:
+                    await asyncio.sleep(0.1)
+                    yield token
+
+        latency = self.chatbot_app.METRICS["latency"]
+        count = latency.count
+        with mock.patch.object(self.chatbot_app, "client", SlowStream(["a", "b", "c"])):
+            response = self.http.post("/chat/stream", json={"prompt": "Q", "system_prompt": "S"})
+
+        self.assertEqual(response.text, "abc")
+        self.assertEqual(latency.count - count, 1)
+        self.assertGreaterEqual(latency.recent[-1], 300)
+
+    def test_plain_chat_still_returns_full_answer(self):
+        fake = FakeInferenceClient(["Hello", " ", "world"])
+        payload = {"prompt": "Q", "system_prompt": "S"}
+
+        with mock.patch.object(self.chatbot_app, "client", fake):
+            response = self.http.post("/chat", json=payload)
+
+        self.assertEqual(response.json(), {"answer": "Hello world"})
+        self.assertIn("X-Queue-Wait-Ms", response.headers)
+
+    def test_identical_prompts_share_one_generation(self):
+        fake = FakeInferenceClient(["same answer"], delay=0.05)
+        request = self.chatbot_app.ChatRequest(prompt="Q", system_prompt="S")
+
+        async def fire():
+            return await asyncio.gather(
+                *(self.chatbot_app.chat(request, mock.Mock()) for _ in range(3))
+            )
+
+        waits_before = self.chatbot_app.METRICS["queue_wait"].count
+        with mock.patch.object(self.chatbot_app, "client", fake):
+            answers = asyncio.run(fire())
+
+        self.assertEqual([a.answer for a in answers], ["same answer"] * 3)
+        self.assertEqual(len(fake.calls), 1)
+        # Followers record their wait too, not only the leader
+        self.assertEqual(self.chatbot_app.METRICS["queue_wait"].count - waits_before, 3)
+
+    def test_stream_slot_is_released_when_the_body_never_starts(self):
+        from starlette.requests import ClientDisconnect
+
+        fake = FakeInferenceClient(["never", " sent"])
+        request = self.chatbot_app.ChatRequest(prompt="Q", system_prompt="S")
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def gone(message):
+            raise OSError("client went away")
+
+        async def fire():
+            gate = self.chatbot_app.GenerationGate(limit=1, max_queue=1)
+            with mock.patch.object(self.chatbot_app, "gate", gate):
+                response = await self.chatbot_app.chat_stream(request, mock.Mock())
+                with self.assertRaises(ClientDisconnect):
+                    await response(scope, receive, gone)
+
+                # A normal stream releases once, not twice
+                response = await self.chatbot_app.chat_stream(request, mock.Mock())
+                sent = []
+
+                async def send(message):
+                    sent.append(message)
+
+                await response(scope, receive, send)
+            return gate, sent
+
+        with mock.patch.object(self.chatbot_app, "client", fake):
+            gate, sent = asyncio.run(fire())
+
+        self.assertEqual(gate.active, 0)
+        self.assertEqual(gate.semaphore._value, 1)
+        self.assertEqual(b"".join(m.get("body", b"") for m in sent), b"never sent")
+
+    def test_requests_are_shed_when_queue_is_full(self):
+        from fastapi import HTTPException
+
+        fake = FakeInferenceClient(["slow"], delay=0.05)
+
+        async def fire():
+            gate = self.chatbot_app.GenerationGate(limit=1, max_queue=1)
+            with mock.patch.object(self.chatbot_app, "gate", gate):
+                return await asyncio.gather(
+                    *(
+                        self.chatbot_app.chat(
+                            self.chatbot_app.ChatRequest(prompt=f"Q{i}", system_prompt="S"),
+                            mock.Mock(),
+                        )
+                        for i in range(3)
+                    ),
+                    return_exceptions=True,
+                )
+
+        with mock.patch.object(self.chatbot_app, "client", fake):
+            results = asyncio.run(fire())
+
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        self.assertEqual(len(rejected), 1)
+        self.assertEqual(rejected[0].status_code, 429)
+
+
+class FakeStreamingResponse:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=None, decode_unicode=False):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+@override_settings(CHATBOT_STREAM_URL="http://chatbot.test/chat/stream")
+class ChatbotStreamProxyTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("streamer", password="pw")
+        self.client.force_login(self.user)
+        answer_cache.clear()
+
+        patcher = mock.patch("matcher.views.acquire_llm_slot", return_value=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_proxy_relays_chunks_and_saves_answer(self):
+        upstream = FakeStreamingResponse(["### Skills", "\n- Python"])
+
+        with mock.patch("matcher.views.requests.post", return_value=upstream) as post:
+            response = self.client.post(
+                "/chatbot/api/stream/",
+                data=json.dumps({"question": "Summarize my skills"}),
+                content_type="application/json",
+            )
+            body = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(body, "### Skills\n- Python")
+        self.assertTrue(post.call_args.kwargs["stream"])
+        self.assertTrue(upstream.closed)
+
+        session = ChatSession.objects.get(id=int(response["X-Chat-Session-Id"]))
+        self.assertEqual(
+            list(session.messages.values_list("sender", "content")),
+            [("user", "Summarize my skills"), ("bot", "### Skills\n- Python")],
+        )
+
+    def test_proxy_reports_unreachable_server(self):
+        with mock.patch("matcher.views.requests.post", side_effect=ConnectionError):
+            response = self.client.post(
+                "/chatbot/api/stream/",
+                data=json.dumps({"question": "Hi"}),
+                content_type="application/json",
+            )
+            body = b"".join(response.streaming_content).decode()
+
+        self.assertIn("couldn't reach the AI server", body)
+        self.assertEqual(ChatMessage.objects.filter(sender="bot").count(), 1)
+
+    def test_repeated_question_is_served_from_cache(self):
+        upstream = FakeStreamingResponse(["cached answer"])
+
+        with mock.patch("matcher.views.requests.post", return_value=upstream) as post:
+            for question in ["What's my experience?", "what's my   experience"]:
+                response = self.client.post(
+                    "/chatbot/api/stream/",
+                    data=json.dumps({"question": question}),
+                    content_type="application/json",
+                )
+                body = b"".join(response.streaming_content).decode()
+                self.assertEqual(body, "cached answer")
+
+        self.assertEqual(post.call_count, 1)
+
+    def test_concurrent_identical_questions_share_one_upstream_call(self):
+        import threading
+        from .views import CHATBOT_STOPPED_MESSAGE
+
+        def ask():
+            return self.client.post(
+                "/chatbot/api/stream/",
+                data=json.dumps({"question": "Summarize my skills"}),
+                content_type="application/json",
+            )
+
+        shared = answer_cache.stats()["shared_in_flight"]
+        with mock.patch("matcher.views.requests.post", return_value=FakeStreamingResponse(["x"])) as post:
+            leader = ask()
+            # The leader's client goes away before its body starts; the follower
+            # waiting on it must get an answer rather than hang or ask again
+            threading.Timer(0.2, leader.close).start()
+            follower = ask()
+            body = b"".join(follower.streaming_content).decode()
+
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(body, CHATBOT_STOPPED_MESSAGE)
+        self.assertEqual(answer_cache.stats()["shared_in_flight"], shared + 1)
+        self.assertEqual(answer_cache.stats()["entries"], 0)
+
+    def test_follow_up_questions_bypass_the_cache(self):
+        upstream = [FakeStreamingResponse(["first"]), FakeStreamingResponse(["second"])]
+        session_id = None
+
+        with mock.patch("matcher.views.requests.post", side_effect=upstream) as post:
+            for _ in range(2):
+                response = self.client.post(
+                    "/chatbot/api/stream/",
+                    data=json.dumps({"question": "What next?", "session_id": session_id}),
+                    content_type="application/json",
+                )
+                body = b"".join(response.streaming_content).decode()
+                session_id = int(response["X-Chat-Session-Id"])
+
+        self.assertEqual(body, "second")
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(answer_cache.stats()["entries"], 1)
+
+    def test_failed_stream_is_not_cached_or_saved_as_an_answer(self):
+        def failing_upstream(*args, **kwargs):
+            return FakeStreamingResponse(["Partial answer", "\n\n[stream error: model overloaded]"])
+
+        with mock.patch("matcher.views.requests.post", side_effect=failing_upstream) as post:
+            for _ in range(2):
+                response = self.client.post(
+                    "/chatbot/api/stream/",
+                    data=json.dumps({"question": "Summarize my skills"}),
+                    content_type="application/json",
+                )
+                body = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(post.call_count, 2)
+        self.assertTrue(body.endswith("Sorry, the AI server stopped responding."))
+        saved = ChatMessage.objects.filter(sender="bot").values_list("content", flat=True)
+        self.assertEqual(
+            list(saved), ["Partial answer\n\nSorry, the AI server stopped responding."] * 2
+        )
+
+
+class AnswerCacheTests(TestCase):
+
+    def test_key_ignores_case_spacing_and_trailing_punctuation(self):
+        self.assertEqual(
+            make_answer_key("doc", "Summarize my skills?", 1, 800),
+            make_answer_key("doc", "  summarize   my skills", 1, 800),
+        )
+        self.assertNotEqual(
+            make_answer_key("doc", "q", 1, 800),
+            make_answer_key("doc", "q", 2, 800),
+        )
+
+    def test_lru_eviction_and_ttl(self):
+        cache = AnswerCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+        cache.ttl = -1
+        cache.set("d", 4)
+        self.assertIsNone(cache.get("d"))
+
+    def test_concurrent_misses_share_one_backend_call(self):
+        import threading
+
+        cache = AnswerCache()
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(1)
+            return "answer", True
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, ["answer"] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+
+    def test_waiters_share_an_uncacheable_result(self):
+        import threading
+        import time
+
+        cache = AnswerCache()
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return "Sorry, I couldn't reach the AI server.", False
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        deadline = time.monotonic() + 5
+        while cache.stats()["shared_in_flight"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, ["Sorry, I couldn't reach the AI server."] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(cache.get("k"))
+
+        # Nothing was cached: the next caller asks the backend again
+        cache.get_or_compute("k", compute)
+        self.assertEqual(len(calls), 2)
+
+class DocumentRetrievalTests(TestCase):
+
+    def setUp(self):
+        from chatbot.vector_store import chunk_document
+
+        filler = "Volunteered at the local library on weekends. " * 40
+        self.chunks = (
+            chunk_document("Jane Doe. Education: B.Tech in Computer Science. " + filler, "resume.pdf")
+            + chunk_document(filler + "Experience: Data engineer at Acme building Spark pipelines.", "cv.docx")
+        )
+
+    def test_selects_relevant_chunk_within_budget(self):
+        from chatbot.vector_store import select_context
+
+        context = select_context(self.chunks, "What Spark experience do I have?", char_budget=900)
+
+        self.assertIn("Spark pipelines", context)
+        self.assertIn("--- Document: cv.docx ---", context)
+        self.assertNotIn("B.Tech", context)
+        self.assertLessEqual(len(context), 900 + 100)
+
+    def test_question_without_keyword_overlap_gets_opening_chunks(self):
+        from chatbot.vector_store import select_context
+
+        context = select_context(self.chunks, "Summarize it", char_budget=900)
+
+        self.assertTrue(context.startswith("--- Document: resume.pdf ---\nJane Doe."))
+
+
+    def test_index_cache_is_safe_across_threads(self):
+        import threading
+        from chatbot import vector_store
+
+        errors = []
+
+        def work(n):
+            try:
+                for i in range(60):
+                    chunks = [{"source": "cv.pdf", "text": f"python developer {n} {i % 40}"}]
+                    vector_store.get_index(chunks).search("python", k=1)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(vector_store._INDEX_CACHE), vector_store._INDEX_CACHE_SIZE)
+
+class KnowledgeIndexTests(TestCase):
+
+    def test_build_and_search_roundtrip(self):
+        import tempfile
+        from chatbot.knowledge_index import KnowledgeIndex, build_index
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            with open(os.path.join(data_dir, "ats_rules.txt"), "w", encoding="utf-8") as f:
+                f.write(
+                    "Use standard headings like Experience and Education.\n\n"
+                    "Avoid tables and text boxes; ATS parsers often drop them.\n"
+                )
+            with open(os.path.join(data_dir, "role_expectations.txt"), "w", encoding="utf-8") as f:
+                f.write("Data scientists should show statistics and machine learning.\n")
+
+            path = os.path.join(data_dir, "kb.bm25")
+            self.assertEqual(build_index(path, data_dir), 3)
+
+            hits = KnowledgeIndex(path).search("Are tables okay in my resume?", k=2)
+
+        self.assertEqual(hits[0]["source"], "ats_rules.txt")
+        self.assertIn("Avoid tables", hits[0]["text"])
+        self.assertEqual(len(hits), 1)
+
+    def test_concurrent_builds_stage_separately(self):
+        import tempfile
+        import threading
+        from chatbot.knowledge_index import KnowledgeIndex, build_index
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            with open(os.path.join(data_dir, "ats_rules.txt"), "w", encoding="utf-8") as f:
+                f.write("Avoid tables and text boxes; ATS parsers often drop them.\n" * 200)
+
+            path = os.path.join(data_dir, "kb.bm25")
+            builds = [threading.Thread(target=build_index, args=(path, data_dir)) for _ in range(4)]
+            for build in builds:
+                build.start()
+            for build in builds:
+                build.join()
+
+            self.assertEqual(sorted(os.listdir(data_dir)), ["ats_rules.txt", "kb.bm25"])
+            self.assertEqual(KnowledgeIndex(path).search("tables", k=1)[0]["source"], "ats_rules.txt")
+
+
+class PromptBudgetTests(TestCase):
+
+    def test_trim_keeps_whole_sentences(self):
+        from chatbot.prompt_budget import estimate_tokens, trim_to_tokens
+
+        text = "Built ETL jobs in Spark. Led a team of five. Migrated services to AWS."
+        trimmed = trim_to_tokens(text, 12)
+
+        self.assertEqual(trimmed, "Built ETL jobs in Spark. Led a team of five.")
+        self.assertLessEqual(estimate_tokens(trimmed), 12)
+        self.assertEqual(trim_to_tokens(text, 8, keep="tail"), "Migrated services to AWS.")
+
+    def test_fixed_segments_are_kept_and_rest_share_the_budget(self):
+        from chatbot.prompt_budget import Segment, estimate_tokens, fit_segments
+
+        document = "Python developer with Django experience. " * 50
+        parts = fit_segments([
+            Segment("system", "You are a career assistant.", fixed=True),
+            Segment("question", "What are my skills?"),
+            Segment("document", document),
+        ], total_tokens=60)
+
+        self.assertEqual(parts["system"], "You are a career assistant.")
+        self.assertEqual(parts["question"], "What are my skills?")
+        self.assertTrue(document.startswith(parts["document"]))
+        self.assertLessEqual(sum(estimate_tokens(t) for t in parts.values()), 60)
+
+
+class TokenBucketTests(TestCase):
+
+    def setUp(self):
+        import tempfile
+
+        self.state_dir = tempfile.mkdtemp()
+
+    def test_calls_beyond_burst_are_rejected_when_they_cannot_wait(self):
+        from .rate_limit import RateLimited, TokenBucket
+
+        bucket = TokenBucket("gemini", per_minute=60, burst=2, state_dir=self.state_dir)
+        bucket.acquire()
+        bucket.acquire()
+
+        with self.assertRaises(RateLimited) as ctx:
+            bucket.acquire(max_wait=0.5)
+        self.assertGreater(ctx.exception.wait, 0.5)
+
+    def test_budget_is_shared_through_the_state_file(self):
+        from .rate_limit import RateLimited, TokenBucket
+
+        # Two instances stand in for two gunicorn workers
+        worker_a = TokenBucket("hf", per_minute=600, burst=1, state_dir=self.state_dir)
+        worker_b = TokenBucket("hf", per_minute=600, burst=1, state_dir=self.state_dir)
+
+        self.assertEqual(worker_a.acquire(), 0.0)
+        with self.assertRaises(RateLimited):
+            worker_b.acquire(max_wait=0)
+        self.assertGreater(worker_b.acquire(max_wait=1), 0.0)
+
+
+class DocumentStoreTests(TestCase):
+
+    def test_session_keeps_only_a_small_reference(self):
+        from django.contrib.sessions.backends.db import SessionStore
+        from .document_store import load_from_session, store_in_session
+        from .models import StoredDocument
+
+        session = SessionStore()
+        chunks = [{"source": "cv.pdf", "text": "Python developer. " * 500}]
+        store_in_session(session, "extra_chunks", chunks)
+        store_in_session(session, "extra_chunks", chunks)
+        session.save()
+
+        self.assertEqual(StoredDocument.objects.count(), 1)
+        self.assertLess(len(session.encode(session._session)), 300)
+        self.assertEqual(load_from_session(SessionStore(session.session_key), "extra_chunks"), chunks)
+
+    def upload(self, *names):
+        from types import SimpleNamespace
+
+        def load(path):
+            return [SimpleNamespace(page_content=f"Experience at {os.path.basename(path)}. " * 3)]
+
+        with mock.patch("matcher.views.save_file", side_effect=lambda f: f.name), \
+                mock.patch("matcher.views.load_document", side_effect=load):
+            files = [SimpleUploadedFile(name, b"x") for name in names]
+            return self.client.post("/api/upload/", {"files": files})
+
+    def test_each_upload_is_stored_once_as_its_own_part(self):
+        from .document_store import get_document, load_parts
+        from .models import StoredDocument
+        from .views import _document_context
+
+        self.client.force_login(User.objects.create_user("uploader", password="pw"))
+        for name in ("one.txt", "two.txt", "three.txt"):
+            self.assertEqual(self.upload(name).status_code, 200)
+
+        ids = self.client.session["extra_chunks_ids"]
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(StoredDocument.objects.count(), 3)
+        self.assertEqual({c["source"] for c in get_document(ids[-1])}, {"three.txt"})
+        self.assertEqual([c["source"] for c in load_parts(ids)][0], "one.txt")
+
+        request = mock.Mock(session=self.client.session)
+        context = _document_context(request, "Where did I work? one two three")
+        for name in ("one.txt", "two.txt", "three.txt"):
+            self.assertIn(name, context)
+
+    def test_legacy_session_documents_survive_the_first_upload(self):
+        from .views import _document_context
+
+        self.client.force_login(User.objects.create_user("returning", password="pw"))
+        session = self.client.session
+        session["extra_context"] = "Older upload: worked at Initech."
+        session.save()
+
+        self.upload("new.txt")
+
+        session = self.client.session
+        self.assertNotIn("extra_context", session)
+        self.assertEqual(len(session["extra_chunks_ids"]), 2)
+        context = _document_context(mock.Mock(session=session), "Where did I work?")
+        self.assertIn("Initech", context)
+        self.assertIn("new.txt", context)
+
+    def test_prune_deletes_only_unreferenced_documents(self):
+        import io
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .document_store import put_document
+        from .models import StoredDocument
+
+        user = User.objects.create_user("pruner", password="pw")
+        self.client.force_login(user)
+        self.upload("cv.txt")
+        in_session = self.client.session["extra_chunks_ids"][0]
+        in_chat = put_document([{"source": "old.txt", "text": "old"}], "extra_chunks")
+        ChatSession.objects.create(user=user, document_ids=[in_chat])
+        orphan = put_document([{"source": "gone.txt", "text": "gone"}], "extra_chunks")
+        fresh_orphan = put_document({"score": 1}, "report_context")
+        StoredDocument.objects.exclude(id=fresh_orphan).update(created_at=timezone.now() - timedelta(days=2))
+
+        call_command("prune_documents", stdout=io.StringIO())
+
+        remaining = set(StoredDocument.objects.values_list("id", flat=True))
+        self.assertEqual(remaining, {in_session, in_chat, fresh_orphan})
+        self.assertNotIn(orphan, remaining)
+
+    def test_legacy_inline_values_are_still_read(self):
+        from .document_store import load_from_session
+
+        self.assertEqual(load_from_session({"report_context": {"score": 80}}, "report_context"), {"score": 80})
+
+
+class ChatHistoryPaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("historian", password="pw")
+        self.client.force_login(self.user)
+
+        self.sessions = [
+            ChatSession.objects.create(user=self.user, title=f"chat {i}") for i in range(5)
+        ]
+        self.sessions[1].pinned = True
+        self.sessions[1].save()
+        ChatMessage.objects.create(session=self.sessions[4], sender="user", content="first")
+        ChatMessage.objects.create(session=self.sessions[4], sender="bot", content="latest " * 30)
+
+    def test_pages_follow_pinned_then_newest_order(self):
+        titles = []
+        cursor = None
+        while True:
+            url = "/api/history/?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            page = self.client.get(url).json()
+            titles += [s["title"] for s in page["sessions"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(titles, ["chat 1", "chat 4", "chat 3", "chat 2", "chat 0"])
+
+    def test_limit_below_one_is_rejected(self):
+        session = self.sessions[4]
+        for limit in ("0", "-5", "two"):
+            self.assertEqual(self.client.get(f"/api/history/?limit={limit}").status_code, 400)
+            self.assertEqual(
+                self.client.get(f"/api/history/{session.id}/?limit={limit}").status_code, 400
+            )
+
+    def test_counts_and_previews_come_from_one_query(self):
+        from django.test import RequestFactory
+        from .views import get_chat_history
+
+        request = RequestFactory().get("/api/history/")
+        request.user = self.user
+
+        with self.assertNumQueries(1):
+            response = get_chat_history(request)
+
+        newest = json.loads(response.content)["sessions"][1]
+
+        self.assertEqual(newest["message_count"], 2)
+        self.assertEqual(newest["last_message"], ("latest " * 30)[:80])
+
+
+class SessionMessagesTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("reader", password="pw")
+        self.client.force_login(self.user)
+        self.session = ChatSession.objects.create(user=self.user, title="long chat")
+        self.messages = [
+            ChatMessage.objects.create(session=self.session, sender="user", content=f"m{i}")
+            for i in range(7)
+        ]
+        self.url = f"/api/history/{self.session.id}/"
+
+    def contents(self, response):
+        return [m["content"] for m in response.json()["messages"]]
+
+    def test_newest_page_then_older_pages(self):
+        first = self.client.get(self.url + "?limit=3")
+        self.assertEqual(self.contents(first), ["m4", "m5", "m6"])
+        self.assertTrue(first.json()["has_more"])
+
+        older = self.client.get(self.url + f"?limit=3&before_id={self.messages[4].id}")
+        self.assertEqual(self.contents(older), ["m1", "m2", "m3"])
+
+    def test_after_id_returns_only_new_messages(self):
+        response = self.client.get(self.url + f"?after_id={self.messages[5].id}")
+        self.assertEqual(self.contents(response), ["m6"])
+
+    def test_unchanged_conversation_returns_304(self):
+        first = self.client.get(self.url)
+        etag = first["ETag"]
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+
+        ChatMessage.objects.create(session=self.session, sender="bot", content="new")
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+
+
+class ChatCompactionTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("talker", password="pw")
+        self.client.force_login(self.user)
+        self.session = ChatSession.objects.create(user=self.user, title="long chat")
+        for i in range(10):
+            ChatMessage.objects.create(session=self.session, sender="user", content=f"Question {i}? More detail.")
+            ChatMessage.objects.create(session=self.session, sender="bot", content=f"### Answer {i}. Extra text.")
+
+    def test_old_messages_move_to_archive_and_summary(self):
+        from .compaction import compact_session
+
+        archived = compact_session(self.session, keep_recent=6, batch_size=5)
+        self.session.refresh_from_db()
+
+        self.assertEqual(archived, 14)
+        self.assertEqual(self.session.messages.count(), 6)
+        self.assertEqual(self.session.archived_count, 14)
+        self.assertEqual(self.session.archived_batches.count(), 3)
+        self.assertIn("User asked: Question 6?", self.session.summary)
+        self.assertIn("Assistant answered: Answer 6.", self.session.summary)
+
+    def test_message_api_expands_archive_on_demand(self):
+        from .compaction import compact_session
+
+        compact_session(self.session, keep_recent=6, batch_size=5)
+        url = f"/api/history/{self.session.id}/"
+
+        contents = []
+        page = self.client.get(url + "?limit=8").json()
+        while True:
+            contents = [m["content"] for m in page["messages"]] + contents
+            if not page["has_more"]:
+                break
+            page = self.client.get(url + f"?limit=8&before_id={page['messages'][0]['id']}").json()
+
+        self.assertEqual(len(contents), 20)
+        self.assertEqual(contents[0], "Question 0? More detail.")
+        self.assertEqual(contents[-1], "### Answer 9. Extra text.")
+
+    def test_memory_combines_summary_and_recent_turns(self):
+        from .compaction import compact_session, conversation_memory
+
+        compact_session(self.session, keep_recent=2)
+        self.session.refresh_from_db()
+        memory = conversation_memory(self.session)
+
+        self.assertTrue(memory.startswith("Earlier in this conversation:"))
+        self.assertIn("User: Question 9?", memory)
+
+
+class MatchRollupTests(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create_user("alice", password="pw")
+        self.bob = User.objects.create_user("bob", password="pw")
+
+    def _record(self):
+        from .analytics import record_match
+
+        for score in (20, 40, 60, 80):
+            record_match(self.alice, score)
+        record_match(self.bob, 90, semantic_score=70)
+
+    def test_record_match_updates_rollups(self):
+        from .analytics import hist_quantile
+        from .models import MatchRollupDaily, MatchRollupUser
+
+        self._record()
+
+        daily = MatchRollupDaily.objects.get()
+        self.assertEqual(daily.count, 5)
+        self.assertEqual(daily.score_sum, 290)
+        self.assertEqual(daily.semantic_count, 1)
+        self.assertEqual(hist_quantile(daily.score_hist, 0.5), 60)
+
+        alice = MatchRollupUser.objects.get(user=self.alice)
+        self.assertEqual((alice.count, alice.score_sum, alice.semantic_count), (4, 200, 0))
+
+    def test_backfill_matches_incremental_rollups(self):
+        from django.core.management import call_command
+        from .models import MatchRollupDaily, MatchRollupUser
+
+        self._record()
+        fields = ("count", "score_sum", "semantic_count", "semantic_sum", "score_hist")
+        before = list(MatchRollupUser.objects.order_by("user_id").values("user_id", *fields))
+        before_daily = list(MatchRollupDaily.objects.values("day", *fields))
+
+        call_command("backfill_match_rollups", stdout=open(os.devnull, "w"))
+
+        self.assertEqual(list(MatchRollupUser.objects.order_by("user_id").values("user_id", *fields)), before)
+        self.assertEqual(list(MatchRollupDaily.objects.values("day", *fields)), before_daily)
+
+    def test_dashboard_reads_only_rollups(self):
+        from .analytics import dashboard_stats
+
+        self._record()
+        with self.assertNumQueries(4):
+            stats = dashboard_stats(self.alice)
+
+        self.assertEqual(stats["total_matches"], 5)
+        self.assertEqual(stats["avg_score"], 58)
+        self.assertEqual(stats["avg_semantic"], 70)
+        self.assertEqual(stats["distribution"], [0, 0, 1, 0, 1, 0, 1, 0, 1, 1])
+        self.assertEqual(stats["my_percentile"], 40.0)
+        self.assertEqual(len(stats["trend"]), 1)
+
+        self.client.force_login(self.alice)
+        response = self.client.get("/result/")
+        self.assertContains(response, "Match Analytics")
+
+
+class ReportCacheTests(TestCase):
+
+    def setUp(self):
+        import tempfile
+        from . import report_cache
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = report_cache.ReportCache(self.tmp.name, max_bytes=10_000)
+        patcher = mock.patch.object(report_cache, "_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user("recruiter", password="pw")
+        self.client.force_login(self.user)
+        session = self.client.session
+        session["report_context"] = {"score": 80, "skills": ["python"]}
+        session.save()
+
+    def test_repeat_download_is_served_from_cache(self):
+        render = mock.Mock(side_effect=lambda f, ctx: f.write(b"%PDF report"))
+        with mock.patch.dict("matcher.views.REPORT_FORMATS", {"pdf": (render, 1, "application/pdf")}):
+            first = self.client.get("/download-report/?format=pdf")
+            second = self.client.get("/download-report/?format=pdf")
+            revalidated = self.client.get("/download-report/?format=pdf", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(b"".join(second.streaming_content), b"%PDF report")
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertIn("Last-Modified", first)
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_key_changes_with_context_format_and_version(self):
+        from .report_cache import report_key
+
+        ctx = {"score": 80, "skills": ["python"]}
+        key = report_key(ctx, "pdf", 1)
+        self.assertEqual(key, report_key({"skills": ["python"], "score": 80}, "pdf", 1))
+        self.assertNotEqual(key, report_key(ctx, "docx", 1))
+        self.assertNotEqual(key, report_key(ctx, "pdf", 2))
+        self.assertNotEqual(key, report_key(dict(ctx, score=81), "pdf", 1))
+
+    def test_eviction_drops_least_recently_used(self):
+        blob = b"x" * 4000
+        self.cache.get_or_render("a", "pdf", lambda f: f.write(blob))
+        self.cache.get_or_render("b", "pdf", lambda f: f.write(blob))
+        os.utime(self.cache.path_for("a", "pdf"), (1, 1))
+        self.cache.lookup("b", "pdf")
+        self.cache.get_or_render("c", "pdf", lambda f: f.write(blob))
+
+        self.assertIsNone(self.cache.lookup("a", "pdf"))
+        self.assertIsNotNone(self.cache.lookup("b", "pdf"))
+        self.assertIsNotNone(self.cache.lookup("c", "pdf"))
+
+
+    def test_report_evicted_before_it_is_opened_is_rendered_again(self):
+        render = mock.Mock(side_effect=lambda f, ctx: f.write(b"%PDF report"))
+        get_or_render = self.cache.get_or_render
+
+        def evicted_by_another_worker(*args):
+            path, rendered_at = get_or_render(*args)
+            if render.call_count == 1:
+                os.remove(path)
+            return path, rendered_at
+
+        with mock.patch.dict("matcher.views.REPORT_FORMATS", {"pdf": (render, 1, "application/pdf")}), \
+                mock.patch.object(self.cache, "get_or_render", side_effect=evicted_by_another_worker):
+            response = self.client.get("/download-report/?format=pdf")
+            body = b"".join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, b"%PDF report")
+        self.assertEqual(render.call_count, 2)
+
+class DocxChartTests(unittest.TestCase):
+
+    def test_charts_render_in_memory_and_are_cached(self):
+        import io
+        import tempfile
+        from .reports import docx_report
+
+        docx_report._bar_chart_png.cache_clear()
+        context = {
+            "score": 72, "confidence_level": "Medium",
+            "skills": ["python"], "missing_skills": ["docker"],
+            "ats_scores": {"keyword_match": 60, "overall": 70},
+            "section_scores": {"technical": 82, "experience": 72, "ats": 92},
+            "warnings": [{"message": "Resume aligns well with the job description."}],
+            "recruiter_feedback": "Solid.",
+        }
+
+        with mock.patch.object(tempfile, "mkstemp", side_effect=AssertionError("temp file used")):
+            for _ in range(2):
+                out = io.BytesIO()
+                docx_report.generate_docx_report(out, context)
+                self.assertTrue(out.getvalue().startswith(b"PK"))
+
+        info = docx_report._bar_chart_png.cache_info()
+        self.assertEqual((info.misses, info.hits), (2, 2))
+        self.assertTrue(docx_report.chart_png({"a": 50}).startswith(b"\x89PNG"))
+
+    def test_report_module_does_not_import_matplotlib(self):
+        import subprocess
+        import sys
+
+        code = (
+            "import sys; import matcher.reports.docx_report; "
+            "sys.exit(1 if 'matplotlib' in sys.modules else 0)"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(__file__)))
+        self.assertEqual(result.returncode, 0)
+
+
+class BulkReportExportTests(TestCase):
+
+    def setUp(self):
+        import tempfile
+        from . import report_cache
+        from .analytics import record_match
+        from .document_store import put_document
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(report_cache, "_cache", report_cache.ReportCache(tmp.name, 10**8))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user("shortlister", password="pw")
+        other = User.objects.create_user("someone-else", password="pw")
+        self.client.force_login(self.user)
+
+        self.logs = [
+            record_match(self.user, score, report_id=put_document(
+                {"score": score, "confidence_level": "High", "skills": ["python"],
+                 "missing_skills": [], "ats_scores": {"overall": score},
+                 "section_scores": {"technical": score}, "warnings": [],
+                 "recruiter_feedback": "Good."},
+                "report_context",
+            ))
+            for score in (70, 80, 90)
+        ]
+        self.foreign = record_match(other, 50, report_id=self.logs[0].report_id)
+
+    def _export(self, query):
+        import io
+        import zipfile
+
+        response = self.client.get("/reports/export/" + query)
+        self.assertEqual(response.status_code, 200)
+        return zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+    @override_settings(REPORT_EXPORT_WORKERS=0)
+    def test_zip_contains_one_report_per_owned_match(self):
+        ids = ",".join(str(log.id) for log in self.logs + [self.foreign])
+        archive = self._export(f"?format=pdf&ids={ids}")
+
+        names = archive.namelist()
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(n.endswith(".pdf") for n in names))
+        self.assertTrue(archive.read(names[0]).startswith(b"%PDF"))
+        self.assertIsNone(archive.testzip())
+
+    @override_settings(REPORT_EXPORT_WORKERS=0)
+    def test_missing_analysis_is_listed_in_errors(self):
+        from . import bulk_export
+
+        stored = bulk_export.get_document
+        missing = self.logs[1].report_id
+        with mock.patch.object(bulk_export, "get_document", side_effect=lambda i: None if i == missing else stored(i)):
+            archive = self._export(f"?format=pdf&ids={self.logs[1].id},{self.logs[2].id}")
+
+        self.assertIn("errors.txt", archive.namelist())
+        self.assertIn(f"report_{self.logs[1].id}", archive.read("errors.txt").decode())
+
+    @override_settings(REPORT_EXPORT_WORKERS=2)
+    def test_process_pool_renders_docx(self):
+        archive = self._export("?format=docx")
+        self.assertEqual(len(archive.namelist()), 3)
+        self.assertTrue(all(archive.read(n).startswith(b"PK") for n in archive.namelist()))
+
+    @override_settings(REPORT_EXPORT_WORKERS=1)
+    def test_export_recovers_from_a_crashed_worker(self):
+        from concurrent.futures.process import BrokenProcessPool
+        from . import bulk_export
+
+        broken = bulk_export.get_pool()
+        self.addCleanup(lambda: bulk_export.discard_pool(bulk_export.get_pool()))
+        with self.assertRaises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+
+        archive = self._export("?format=docx")
+        self.assertEqual(len(archive.namelist()), 3)
+        self.assertIsNot(bulk_export.get_pool(), broken)
+
+
+@unittest.skipUnless(os.name == "posix", "peak memory is read from /proc or resource")
+class StartupBudgetTests(unittest.TestCase):
+
+    def test_manage_check_stays_within_budget(self):
+        from benchmarks import startup
+
+        result = startup.measure(["check"])
+
+        self.assertEqual(startup.heavy_modules_loaded(result), [])
+        self.assertLess(result["import_ms"], startup.IMPORT_BUDGET_MS)
+        self.assertLess(result["rss_mb"], startup.RSS_BUDGET_MB)
+
+
+class FakeEncoder:
+    """Stand-in for SentenceTransformer: vector = [len(text), 1, 0]."""
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        import numpy as np
+
+        self.calls.append(list(texts))
+        if self.delay:
+            import time
+            time.sleep(self.delay)
+        return np.array([[len(t), 1.0, 0.0] for t in texts])
+
+
+@unittest.skipUnless(hasattr(__import__("socket"), "AF_UNIX"), "needs Unix sockets")
+class EmbeddingServerTests(unittest.TestCase):
+
+    def setUp(self):
+        import tempfile
+        import threading
+        from .embeddings import EmbeddingServer
+
+        tmp = tempfile.mkdtemp()
+        self.path = os.path.join(tmp, "embed.sock")
+        self.model = FakeEncoder(delay=0.02)
+        self.server = EmbeddingServer(self.path, self.model, max_batch=64, max_wait=0.05)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        def stop():
+            self.server.shutdown()
+            self.server.server_close()
+            os.rmdir(tmp)
+        self.addCleanup(stop)
+
+    def test_round_trip(self):
+        from .embeddings import encode_remote
+
+        vectors = encode_remote(["abc", "hello"], path=self.path)
+        self.assertEqual(vectors.tolist(), [[3, 1, 0], [5, 1, 0]])
+        self.assertEqual(encode_remote([], path=self.path).shape, (0, 0))
+
+    def test_concurrent_callers_share_batches(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from .embeddings import encode_remote
+
+        texts = [f"text number {i}" for i in range(16)]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda t: encode_remote([t], path=self.path), texts))
+
+        self.assertEqual([r[0][0] for r in results], [len(t) for t in texts])
+        self.assertLess(self.server.batcher.batches, len(texts))
+        self.assertEqual(self.server.batcher.texts, len(texts))
+
+    def test_encode_falls_back_to_local_model(self):
+        from . import embeddings
+
+        local = FakeEncoder()
+        with override_settings(EMBEDDING_SOCKET=self.path + ".missing"), \
+                mock.patch.object(embeddings, "_get_local_model", return_value=local):
+            vectors = embeddings.encode(["abcd"])
+
+        self.assertEqual(vectors.tolist(), [[4, 1, 0]])
+        self.assertEqual(local.calls, [["abcd"]])
+        self.assertEqual(self.model.calls, [])
+
+    def test_encode_does_not_load_a_local_model_when_the_server_is_slow(self):
+        from . import embeddings
+
+        with override_settings(EMBEDDING_SOCKET=self.path, EMBEDDING_TIMEOUT=0.001), \
+                mock.patch.object(embeddings, "_get_local_model") as local:
+            with self.assertRaises(TimeoutError):
+                embeddings.encode(["slow"])
+
+        local.assert_not_called()
+
+    def test_encode_prefers_server(self):
+        from . import embeddings
+
+        with override_settings(EMBEDDING_SOCKET=self.path), \
+                mock.patch.object(embeddings, "_get_local_model") as local:
+            vectors = embeddings.encode(["ab"])
+
+        self.assertEqual(vectors.tolist(), [[2, 1, 0]])
+        local.assert_not_called()
+
+
+class BenchmarkSuiteTests(TestCase):
+
+    def setUp(self):
+        import tempfile
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+    def test_corpus_is_deterministic_and_extractable(self):
+        from benchmarks.corpus import generate_corpus
+        from .utils import extract_requirements, extract_skills, extract_text_from_file
+
+        first = generate_corpus(os.path.join(self.tmp, "a"), pairs=2, resume_words=80, jd_words=40, formats=["txt"])
+        second = generate_corpus(os.path.join(self.tmp, "b"), pairs=2, resume_words=80, jd_words=40, formats=["txt"])
+
+        for a, b in zip(first, second):
+            with open(a["resume"]) as fa, open(b["resume"]) as fb:
+                self.assertEqual(fa.read(), fb.read())
+
+        resume = extract_text_from_file(first[0]["resume"])
+        jd = extract_text_from_file(first[0]["jd"])
+        self.assertTrue(extract_skills(resume + " python"))
+        self.assertTrue(extract_requirements(jd))
+
+    def test_harness_times_every_case_and_flags_regressions(self):
+        from benchmarks.corpus import generate_corpus
+        from benchmarks.run import check_regressions, run_benchmarks
+
+        corpus = generate_corpus(os.path.join(self.tmp, "corpus"), pairs=1, resume_words=60, jd_words=30, formats=["txt"])
+        results = run_benchmarks(corpus, os.path.join(self.tmp, "media"), repeat=1)
+
+        self.assertIn("upload_pipeline[txt]", results)
+        self.assertIn("report[pdf]", results)
+        self.assertTrue(all(r["calls"] >= 1 for r in results.values()))
+
+        slow = {"ats_scorecard": {"median_ms": 10.0}}
+        self.assertEqual(check_regressions({"ats_scorecard": {"median_ms": 1.0}}, baseline=slow), [])
+        problems = check_regressions(
+            {"ats_scorecard": {"median_ms": 20.0}}, thresholds={"ats_scorecard": {"median_ms": 5}}, baseline=slow
+        )
+        self.assertEqual(len(problems), 2)
+
+    def test_only_selects_bracketed_names_literally(self):
+        from benchmarks.corpus import generate_corpus
+        from benchmarks.run import run_benchmarks, selected
+
+        self.assertTrue(selected("upload_pipeline[txt]", ["upload_pipeline[txt]"]))
+        self.assertTrue(selected("report[pdf]", ["report*"]))
+        self.assertFalse(selected("report[pdf]", ["report[docx]"]))
+
+        corpus = generate_corpus(os.path.join(self.tmp, "corpus"), pairs=1, resume_words=60, jd_words=30, formats=["txt"])
+        media = os.path.join(self.tmp, "media")
+        results = run_benchmarks(corpus, media, repeat=1, only=["upload_pipeline[txt]", "ats_scorecard"])
+        self.assertEqual(sorted(results), ["ats_scorecard", "upload_pipeline[txt]"])
+        with self.assertRaises(ValueError):
+            run_benchmarks(corpus, media, repeat=1, only=["upload_pipeline[csv]"])
+
+
+class InstrumentationTests(TestCase):
+
+    def setUp(self):
+        import tempfile
+        from . import instrumentation, report_cache
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(report_cache, "_cache", report_cache.ReportCache(tmp.name, max_bytes=10_000))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        instrumentation.STAGE_SECONDS.clear()
+        instrumentation.REQUEST_SECONDS.clear()
+
+        self.user = User.objects.create_user("recruiter", password="pw")
+        self.client.force_login(self.user)
+        session = self.client.session
+        session["report_context"] = {"score": 80, "skills": ["python"]}
+        session.save()
+
+    def download(self):
+        render = mock.Mock(side_effect=lambda f, ctx: f.write(b"%PDF report"))
+        with mock.patch.dict("matcher.views.REPORT_FORMATS", {"pdf": (render, 1, "application/pdf")}):
+            return self.client.get("/download-report/?format=pdf")
+
+    def test_server_timing_lists_view_stages(self):
+        response = self.download()
+
+        entries = [e.split(";")[0] for e in response["Server-Timing"].split(", ")]
+        self.assertEqual(entries, ["session", "cache", "render", "total"])
+
+    @override_settings(METRICS_TOKEN="scrape-me")
+    def test_metrics_exposes_stage_histograms_behind_token(self):
+        self.download()
+
+        self.assertEqual(self.client.get("/metrics/").status_code, 403)
+        response = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer scrape-me")
+        body = response.content.decode()
+
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('resume_matcher_stage_duration_seconds_count{view="download_report",stage="render"} 1', body)
+        self.assertIn('resume_matcher_request_duration_seconds_bucket{view="download_report",status="200",le="+Inf"} 1', body)
+
+    def test_disabled_instrumentation_is_a_no_op(self):
+        from .instrumentation import STAGE_SECONDS, ServerTimingMiddleware, stage
+
+        with override_settings(INSTRUMENTATION_ENABLED=False):
+            middleware = ServerTimingMiddleware(lambda request: stage("work"))
+        self.assertIs(middleware(None), stage("other"))
+        self.assertEqual(STAGE_SECONDS.snapshot(), {})
+
+
+class ProfilingTests(TestCase):
+
+    def setUp(self):
+        import tempfile
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.user = User.objects.create_user("recruiter", password="pw")
+        self.client.force_login(self.user)
+
+    def test_staff_opt_in_saves_profile_and_allocations(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        with override_settings(PROFILING_DIR=self.tmp):
+            plain = self.client.get("/api/history/")
+            profiled = self.client.get("/api/history/", HTTP_X_PROFILE="1")
+
+        self.assertNotIn("X-Profile-Id", plain)
+        stem = profiled["X-Profile-Id"]
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, stem + ".prof")))
+        with open(os.path.join(self.tmp, stem + ".txt")) as f:
+            summary = f.read()
+        self.assertIn("Peak traced memory", summary)
+        self.assertIn("get_chat_history", summary)
+
+    def test_non_staff_needs_the_token(self):
+        with override_settings(PROFILING_DIR=self.tmp, PROFILING_TOKEN="secret"):
+            refused = self.client.get("/api/history/", HTTP_X_PROFILE="1")
+            wrong = self.client.get("/api/history/", HTTP_X_PROFILE_TOKEN="guess")
+            allowed = self.client.get("/api/history/", HTTP_X_PROFILE_TOKEN="secret")
+
+        self.assertNotIn("X-Profile-Id", refused)
+        self.assertNotIn("X-Profile-Id", wrong)
+        self.assertIn("X-Profile-Id", allowed)
+
+    def test_old_profiles_are_pruned(self):
+        from .profiling import profile_call, save_profile
+
+        profile = profile_call(sum, range(10))
+        for i in range(4):
+            save_profile(profile, f"run{i}", directory=self.tmp, keep=2)
+
+        self.assertEqual(len(os.listdir(self.tmp)), 4)
+        self.assertEqual(profile.result, 45)
+
+    def test_profile_pipeline_command_reports_hot_spots(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from benchmarks.corpus import generate_corpus
+
+        doc = generate_corpus(self.tmp, pairs=1, resume_words=60, jd_words=30, formats=["txt"])[0]
+        out = StringIO()
+        call_command("profile_pipeline", doc["resume"], doc["jd"], "--reports", "--top", "5", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("analyze_files", output)
+        self.assertIn("Peak memory", output)
+
+
+class LoadTestKitTests(LiveServerTestCase):
+
+    def setUp(self):
+        import tempfile
+        import threading
+        from benchmarks.stubs import Backend, StubServer
+
+        self.stub = StubServer(("127.0.0.1", 0), gemini=Backend(latency_ms=5), chat=Backend(latency_ms=5))
+        threading.Thread(target=self.stub.serve_forever, daemon=True).start()
+        self.addCleanup(self.stub.server_close)
+        self.addCleanup(self.stub.shutdown)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+        stub_settings = override_settings(
+            GEMINI_BASE_URL=self.stub.url,
+            CHATBOT_API_URL=self.stub.url + "/chat",
+            CHATBOT_STREAM_URL=self.stub.url + "/chat/stream",
+            MEDIA_ROOT=os.path.join(self.tmp, "media"),
+        )
+        stub_settings.enable()
+        self.addCleanup(stub_settings.disable)
+        for patcher in (
+            mock.patch.dict(os.environ, {"GEMINI_API_KEY": "stub"}),
+            mock.patch("matcher.views.acquire_llm_slot"),
+            mock.patch("matcher.utils.acquire_llm_slot"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        answer_cache.clear()
+
+    def test_open_loop_driver_reports_percentiles_and_errors(self):
+        from benchmarks.loadtest import FlowError, run_load
+
+        def flaky(user):
+            user.append(1)
+            if len(user) % 4 == 0:
+                raise FlowError("HTTP 500")
+
+        users = [[] for _ in range(3)]
+        results, elapsed = run_load(users, {"ok": lambda u: None, "flaky": flaky},
+                                    {"ok": 1, "flaky": 1}, rps=100, duration=0.3, seed=1)
+
+        self.assertEqual(sum(r["requests"] for r in results.values()), 30)
+        self.assertEqual(results["ok"]["errors"], 0)
+        self.assertEqual(results["flaky"]["errors"], results["flaky"]["error_reasons"].get("HTTP 500", 0))
+        for stats in results.values():
+            self.assertLessEqual(stats["p50_ms"], stats["p95_ms"])
+            self.assertLessEqual(stats["p95_ms"], stats["p99_ms"])
+
+    def test_flows_run_against_the_app_and_llm_stubs(self):
+        from benchmarks.corpus import generate_corpus
+        from benchmarks.loadtest import FlowError, VirtualUser, prepare_users
+
+        User.objects.create_user("load0", email="load0@example.com", password="pw")
+        corpus = generate_corpus(os.path.join(self.tmp, "corpus"), pairs=1, resume_words=60, jd_words=30, formats=["txt"])
+
+        user = prepare_users(self.live_server_url, ["load0@example.com"], corpus, password="pw")[0]
+        user.chat()
+        user.chat_stream()
+        user.report("pdf")
+
+        self.assertEqual(self.stub.backends["gemini"].stats()["requests"], 1)
+        self.assertEqual(self.stub.backends["chat"].stats()["requests"], 2)
+
+        self.stub.backends["chat"].error_rate = 1.0
+        with self.assertRaisesMessage(FlowError, "fallback answer"):
+            user.chat()
+        with self.assertRaises(FlowError):
+            VirtualUser(self.live_server_url, "load0@example.com", "wrong").login()
+
+
+class MatchBatchTests(TestCase):
+
+    def setUp(self):
+        import tempfile
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.jd = self.write("jd.txt", "Backend developer with python, django and sql. Must have experience with docker.")
+        self.resumes = os.path.join(self.tmp, "resumes")
+        os.makedirs(self.resumes)
+        for i, skills in enumerate(["python django", "java spring", "python sql docker"]):
+            self.write(f"resumes/r{i}.txt", f"Backend developer skilled in {skills}.")
+        self.write("resumes/broken.pdf", "not really a pdf")
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def run_batch(self, *args):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command("match_batch", *args, "--workers", "2", "--chunksize", "1", stdout=out)
+        return out.getvalue()
+
+    def read_jsonl(self, path):
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_scores_directory_and_resumes_after_interruption(self):
+        output = os.path.join(self.tmp, "out.jsonl")
+        report = self.run_batch(self.resumes, "--jd", self.jd, "--output", output)
+
+        rows = {row["id"]: row for row in self.read_jsonl(output)}
+        self.assertEqual(set(rows), {"r0.txt", "r1.txt", "r2.txt", "broken.pdf"})
+        self.assertIn("error", rows["broken.pdf"])
+        self.assertGreater(rows["r2.txt"]["score"], rows["r1.txt"]["score"])
+        self.assertIn("files/s", report)
+        self.assertIn("scoring", report)
+
+        # Simulate a crash: two complete rows and half of a third
+        with open(output) as f:
+            lines = f.readlines()
+        with open(output, "w") as f:
+            f.writelines(lines[:2] + [lines[2][:10]])
+
+        report = self.run_batch(self.resumes, "--jd", self.jd, "--output", output)
+        self.assertIn("Resuming: 2 already scored, 2 to go", report)
+        self.assertEqual(sorted(r["id"] for r in self.read_jsonl(output)), sorted(rows))
+
+    def test_failed_documents_are_retried_on_request(self):
+        from .batch import ResultWriter
+
+        output = os.path.join(self.tmp, "out.jsonl")
+        self.run_batch(self.resumes, "--jd", self.jd, "--output", output)
+
+        # r0.txt failed transiently the first time
+        rows = self.read_jsonl(output)
+        with open(output, "w") as f:
+            for row in rows:
+                if row["id"] == "r0.txt":
+                    row = {"id": "r0.txt", "error": "TimeoutError: ", "target": row["target"]}
+                f.write(json.dumps(row) + "\n")
+
+        report = self.run_batch(self.resumes, "--jd", self.jd, "--output", output)
+        self.assertIn("Resuming: 4 already scored, 0 to go", report)
+        self.assertIn("2 failed earlier; --retry-errors", report)
+
+        report = self.run_batch(self.resumes, "--jd", self.jd, "--output", output, "--retry-errors")
+        self.assertIn("Resuming: 2 already scored, 2 to go", report)
+
+        done, failed = ResultWriter(output, rows[0]["target"]).checkpoint()
+        self.assertEqual(failed, {"broken.pdf"})
+        self.assertEqual(done, {"r0.txt", "r1.txt", "r2.txt"})
+        self.assertIn("score", [r for r in self.read_jsonl(output) if r["id"] == "r0.txt"][-1])
+
+    def test_zip_with_csv_rows_against_a_resume(self):
+        import csv
+        import zipfile
+        from django.core.management.base import CommandError
+
+        archive = os.path.join(self.tmp, "jds.zip")
+        with zipfile.ZipFile(archive, "w") as z:
+            z.write(self.jd, "jds/backend.txt")
+            z.writestr("jds/listing.csv", "id,Job Title,Job Description\n1,Dev,Python and sql developer\n2,QA,Manual testing\n")
+
+        resume = os.path.join(self.resumes, "r2.txt")
+        output = os.path.join(self.tmp, "out.csv")
+        self.run_batch(archive, "--resume", resume, "--output", output)
+
+        with open(output, newline="") as f:
+            rows = {row["id"]: row for row in csv.DictReader(f)}
+        self.assertEqual(set(rows), {"jds/backend.txt", "jds/listing.csv#1", "jds/listing.csv#2"})
+        self.assertGreater(float(rows["jds/listing.csv#1"]["score"]), float(rows["jds/listing.csv#2"]["score"]))
+
+        with self.assertRaisesMessage(CommandError, "different target"):
+            self.run_batch(archive, "--resume", self.jd, "--output", output)
+
+
+class ZipResumeImportTests(TestCase):
+
+    def setUp(self):
+        import tempfile
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name, ZIP_UPLOAD_BATCH_SIZE=2)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = User.objects.create_user("recruiter", password="pw")
+        self.client.force_login(self.user)
+
+    def make_zip(self, members, stored=False):
+        import io
+        import zipfile
+
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED) as z:
+            for name, data in members.items():
+                z.writestr(name, data)
+        buf.seek(0)
+        buf.name = "pack.zip"
+        return buf
+
+    def upload(self, archive):
+        return self.client.post("/api/resumes/upload-zip/", {"archive": archive})
+
+    def docx_bytes(self, text):
+        import io
+        from docx import Document
+
+        doc = Document()
+        doc.add_paragraph(text)
+        buf = io.BytesIO()
+        doc.save(buf)
+        return buf.getvalue()
+
+    @override_settings(ZIP_UPLOAD_WORKERS=2)
+    def test_imports_dedupes_and_reports_failures(self):
+        from .models import Resume
+
+        members = {
+            "pack/alice.txt": "Python developer with Django",
+            "pack/bob.txt": "Java developer with Spring",
+            "pack/copy-of-alice.txt": "Python developer with Django",
+            "pack/carol.docx": self.docx_bytes("Data analyst skilled in SQL"),
+            "pack/dave.txt": "Go developer",
+            "pack/broken.pdf": "not a pdf",
+            "pack/photo.png": "png",
+            "__MACOSX/pack/._alice.txt": "resource fork",
+        }
+        data = self.upload(self.make_zip(members)).json()
+
+        self.assertEqual(data["imported"], 4)
+        self.assertEqual(data["duplicates"], ["pack/copy-of-alice.txt"])
+        self.assertEqual(data["skipped"], ["pack/photo.png"])
+        self.assertEqual([e["file"] for e in data["errors"]], ["pack/broken.pdf"])
+
+        texts = set(Resume.objects.filter(user=self.user).values_list("extracted_text", flat=True))
+        self.assertIn("data analyst skilled in sql", texts)
+        self.assertEqual(Resume.objects.filter(user=self.user).count(), 4)
+
+        # Same pack again: everything is already imported
+        again = self.upload(self.make_zip(members)).json()
+        self.assertEqual(again["imported"], 0)
+        self.assertEqual(len(again["duplicates"]), 5)
+
+    @override_settings(ZIP_UPLOAD_WORKERS=1)
+    def test_import_recovers_from_a_crashed_worker(self):
+        from concurrent.futures.process import BrokenProcessPool
+        from . import zip_ingest
+
+        broken = zip_ingest.get_pool()
+        self.addCleanup(lambda: zip_ingest.discard_pool(zip_ingest.get_pool()))
+        with self.assertRaises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+
+        data = self.upload(self.make_zip({"a.txt": "Python developer", "b.txt": "Java developer"})).json()
+        self.assertEqual(data["imported"], 2)
+        self.assertIsNot(zip_ingest.get_pool(), broken)
+
+    @override_settings(ZIP_UPLOAD_WORKERS=0)
+    def test_copies_of_an_unreadable_member_are_errors_not_duplicates(self):
+        data = self.upload(self.make_zip({"a/cv.pdf": "not a pdf", "b/cv.pdf": "not a pdf"})).json()
+
+        self.assertEqual(data["imported"], 0)
+        self.assertEqual(data["duplicates"], [])
+        self.assertEqual([e["file"] for e in data["errors"]], ["a/cv.pdf", "b/cv.pdf"])
+
+    @override_settings(ZIP_UPLOAD_WORKERS=0, STORE_UPLOADED_FILES=False)
+    def test_batches_hold_no_raw_documents(self):
+        from . import zip_ingest
+
+        save_batch = zip_ingest._save_batch
+        held = []
+
+        def spy(user, batch, summary):
+            held.extend(type(value) for row in batch for value in row)
+            return save_batch(user, batch, summary)
+
+        with mock.patch.object(zip_ingest, "_save_batch", side_effect=spy):
+            data = self.upload(self.make_zip({f"r{i}.txt": f"resume {i}" for i in range(3)})).json()
+
+        self.assertEqual(data["imported"], 3)
+        self.assertTrue(held)
+        self.assertNotIn(bytes, held)
+
+    @override_settings(ZIP_UPLOAD_WORKERS=0)
+    def test_files_follow_store_setting_and_are_removed_on_rollback(self):
+        from django.conf import settings as django_settings
+        from django.db import DatabaseError
+        from .models import Resume
+
+        def stored_files():
+            return [name for _, _, files in os.walk(django_settings.MEDIA_ROOT) for name in files]
+
+        with override_settings(STORE_UPLOADED_FILES=False):
+            data = self.upload(self.make_zip({"a.txt": "Python developer"})).json()
+        self.assertEqual(data["imported"], 1)
+        self.assertEqual(Resume.objects.get().resume_file.name, "")
+        self.assertEqual(stored_files(), [])
+
+        with mock.patch.object(Resume.objects, "bulk_create", side_effect=DatabaseError("disk full")):
+            with self.assertRaises(DatabaseError):
+                self.upload(self.make_zip({"b.txt": "Java developer", "c.txt": "Go developer"}))
+        self.assertEqual(stored_files(), [])
+
+        self.upload(self.make_zip({"b.txt": "Java developer"}))
+        self.assertEqual(stored_files(), ["b.txt"])
+
+    @override_settings(ZIP_UPLOAD_WORKERS=0, ZIP_UPLOAD_MAX_MEMBERS=2, ZIP_UPLOAD_MAX_RATIO=50)
+    def test_limits_reject_before_anything_is_saved(self):
+        from .models import Resume
+
+        too_many = self.make_zip({f"r{i}.txt": f"resume {i}" for i in range(3)})
+        bomb = self.make_zip({"bomb.txt": "0" * 1_000_000})
+        stored = self.make_zip({"big.txt": "0" * 1_000_000}, stored=True)
+
+        self.assertIn("limit is 2", self.upload(too_many).json()["error"])
+        self.assertIn("compression ratio", self.upload(bomb).json()["error"])
+        self.assertEqual(self.upload(stored).json()["imported"], 1)
+
+        with override_settings(ZIP_UPLOAD_MAX_TOTAL_BYTES=1000):
+            self.assertEqual(self.upload(self.make_zip({"a.txt": "x" * 2000})).status_code, 400)
+        self.assertEqual(self.upload(SimpleUploadedFile("pack.zip", b"not a zip")).status_code, 400)
+        self.assertEqual(Resume.objects.count(), 1)
+
+
+@mock.patch("matcher.pipeline.recruiter_resume_feedback", return_value="Looks good.")
+class MatchAPITests(TestCase):
+
+    RESUME = "Python developer with Django and SQL experience"
+    JD = "Hiring a backend developer: Python, Django, SQL, Java and NLP"
+
+    def setUp(self):
+        import tempfile
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.media_root = tmp.name
+
+        self.user = User.objects.create_user("api-user", password="pw")
+        self.client.force_login(self.user)
+
+    def post(self, payload):
+        return self.client.post("/api/match/", payload, content_type="application/json")
+
+    def stored_files(self):
+        return [name for _, _, files in os.walk(self.media_root) for name in files]
+
+    def test_text_input_returns_analysis_without_storing(self, feedback):
+        from .models import JobDescription, Resume, ResumeMatchLog
+
+        response = self.post({"resume_text": self.RESUME, "jd_text": self.JD})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIn("python", data["skills"])
+        self.assertEqual(sorted(data["missing_skills"]), ["java", "nlp"])
+        self.assertEqual(data["score_breakdown"]["missing_skills"], len(data["missing_skills"]))
+        feedback.assert_not_called()
+        self.assertFalse(Resume.objects.exists() or JobDescription.objects.exists() or ResumeMatchLog.objects.exists())
+
+    def test_base64_file_is_parsed_in_memory(self, feedback):
+        import base64
+        import io
+        from docx import Document
+
+        doc = Document()
+        doc.add_paragraph(self.RESUME)
+        buf = io.BytesIO()
+        doc.save(buf)
+
+        # No filename: the type is sniffed from the ZIP signature
+        response = self.post({
+            "resume_file": base64.b64encode(buf.getvalue()).decode(),
+            "jd_text": self.JD,
+            "feedback": True,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("django", response.json()["skills"])
+        self.assertEqual(response.json()["recruiter_feedback"], "Looks good.")
+        self.assertEqual(self.stored_files(), [])
+
+    def test_text_input_matches_file_input(self, feedback):
+        import base64
+
+        # Mixed case on purpose: extraction lowercases documents
+        resume = "Python developer with Django and SQL experience. Built REST APIs."
+        jd = "Hiring a Backend Developer: Python, Django, SQL, Java and NLP. Must know REST APIs."
+
+        as_text = self.post({"resume_text": resume, "jd_text": jd})
+        as_files = self.post({
+            "resume_file": base64.b64encode(resume.encode()).decode(), "resume_filename": "cv.txt",
+            "jd_file": base64.b64encode(jd.encode()).decode(), "jd_filename": "jd.txt",
+        })
+
+        self.assertEqual(as_text.status_code, 200)
+        self.assertEqual(as_files.status_code, 200)
+        self.assertEqual(as_text.json(), as_files.json())
+
+    def test_validation_errors(self, feedback):
+        import base64
+
+        self.assertIn("resume", self.post({"jd_text": self.JD}).json())
+        both = self.post({"resume_text": self.RESUME, "resume_file": "eA==", "jd_text": self.JD})
+        self.assertIn("resume", both.json())
+        self.assertIn("jd_file", self.post({"resume_text": self.RESUME, "jd_file": "not base64!"}).json())
+
+        png = {"resume_text": self.RESUME, "jd_file": "eA==", "jd_filename": "jd.png"}
+        self.assertIn("jd_filename", self.post(png).json())
+
+        broken = {"resume_text": self.RESUME, "jd_file": base64.b64encode(b"junk").decode(), "jd_filename": "jd.pdf"}
+        self.assertEqual(self.post(broken).status_code, 400)
+
+        with override_settings(MATCH_API_MAX_DOCUMENT_BYTES=10):
+            big = {"resume_text": self.RESUME, "jd_file": base64.b64encode(b"x" * 100).decode()}
+            self.assertEqual(self.post(big).status_code, 400)
+
+        self.client.logout()
+        self.assertEqual(self.post({"resume_text": self.RESUME, "jd_text": self.JD}).status_code, 403)
+
+    def test_store_saves_documents_and_logs_the_match(self, feedback):
+        import base64
+        from .models import ResumeMatchLog
+
+        response = self.post({
+            "resume_text": self.RESUME,
+            "jd_file": base64.b64encode(self.JD.encode()).decode(),
+            "jd_filename": "backend.txt",
+            "store": True,
+        })
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        log = ResumeMatchLog.objects.get(pk=data["match_id"])
+        self.assertEqual(log.user, self.user)
+        self.assertEqual(log.score, data["score"])
+        self.assertIsNotNone(log.report_id)
+        self.assertEqual(self.stored_files(), ["backend.txt"])
+
+        with override_settings(STORE_UPLOADED_FILES=False):
+            response = self.post({
+                "resume_text": self.RESUME,
+                "jd_file": base64.b64encode(self.JD.encode()).decode(),
+                "store": True,
+            })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.stored_files()), 1)
+
+    @override_settings(STORE_UPLOADED_FILES=False)
+    def test_upload_page_parses_without_writing_files(self, feedback):
+        from .models import JobDescription, Resume
+
+        response = self.client.post("/", {
+            "resume_file": SimpleUploadedFile("resume.txt", self.RESUME.encode()),
+            "jd_file": SimpleUploadedFile("jd.txt", self.JD.encode()),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        resume = Resume.objects.get(user=self.user)
+        self.assertFalse(resume.resume_file)
+        self.assertIn("django", resume.extracted_text)
+        self.assertFalse(JobDescription.objects.get().jd_file)
+        self.assertEqual(self.stored_files(), [])
+
+
+class SkillRescoringTests(TestCase):
+
+    def setUp(self):
+        from skills.catalog import invalidate_catalog
+
+        invalidate_catalog()
+        self.addCleanup(invalidate_catalog)
+        self.user = User.objects.create_user("rescorer", password="pw")
+
+    def match(self, resume_text, jd_text):
+        from .analytics import record_match
+        from .document_store import put_document
+        from .models import JobDescription, Resume
+        from .pipeline import analyze_texts
+
+        resume = Resume.objects.create(user=self.user, extracted_text=resume_text)
+        jd = JobDescription.objects.create(extracted_text=jd_text)
+        context = analyze_texts(resume_text, jd_text, feedback=False)
+        context["recruiter_feedback"] = "Earlier feedback."
+        return record_match(
+            self.user, context["score"], report_id=put_document(context, "report_context"),
+            resume=resume, job_description=jd,
+        )
+
+    def rescore(self, *args):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command("rescore_skills", *args, stdout=out)
+        return out.getvalue()
+
+    def test_catalog_reads_skill_rows(self):
+        from skills.catalog import invalidate_catalog
+        from skills.models import Skill
+        from .utils import extract_skills
+
+        self.assertNotIn("kubernetes", extract_skills("Kubernetes and Python"))
+        Skill.objects.create(canonical_name="kubernetes", aliases=["k8s"])
+        invalidate_catalog()
+        self.assertEqual(sorted(extract_skills("K8S and Python")), ["kubernetes", "python"])
+
+    def test_index_confirms_multi_word_aliases(self):
+        from .models import Resume
+        from .rescoring import documents_with_alias, update_index
+
+        phrase = Resume.objects.create(user=self.user, extracted_text="built machine learning models")
+        Resume.objects.create(user=self.user, extracted_text="learning to fix a machine")
+        one_word = Resume.objects.create(user=self.user, extracted_text="python, kubernetes")
+
+        self.assertEqual(update_index(), 3)
+        self.assertEqual(update_index(), 0)
+        self.assertEqual(documents_with_alias("machine learning")["resume"], {phrase.pk})
+        self.assertEqual(documents_with_alias("kubernetes")["resume"], {one_word.pk})
+        self.assertEqual(documents_with_alias("c++")["resume"], set())
+
+    def test_only_matches_with_changed_aliases_are_rescored(self):
+        from skills.models import Skill
+        from .models import MatchRollupUser, ResumeMatchLog, SkillRescoreRun
+        from .document_store import get_document
+
+        both = self.match("python and kubernetes engineer", "python, kubernetes")
+        python_only = ResumeMatchLog.objects.get(pk=self.match("python developer", "python").pk)
+        java = self.match("java developer", "java and spring")
+        python_only.job_description = both.job_description
+        python_only.save()
+        self.assertEqual((both.score, python_only.score), (100, 100))
+
+        Skill.objects.create(canonical_name="kubernetes", aliases=["k8s"])
+
+        self.assertIn("2 aliases changed", self.rescore("--dry-run"))
+        self.assertFalse(SkillRescoreRun.objects.exists())
+
+        out = self.rescore("--batch-size", "1")
+        self.assertIn("Matches: 2, Scores changed: 1", out)
+
+        both.refresh_from_db()
+        python_only.refresh_from_db()
+        java_report = java.report_id
+        java.refresh_from_db()
+        self.assertEqual((both.score, python_only.score), (100, 50))
+        self.assertEqual(java.report_id, java_report)
+
+        report = get_document(python_only.report_id)
+        self.assertEqual(report["missing_skills"], ["kubernetes"])
+        self.assertEqual(report["recruiter_feedback"], "Earlier feedback.")
+
+        rollup = MatchRollupUser.objects.get(user=self.user)
+        self.assertEqual(rollup.score_sum, 250)
+        self.assertEqual((rollup.score_hist[100], rollup.score_hist[50]), (2, 1))
+
+        # Nothing changed since the last run
+        self.assertIn("Aliases: 0, Documents: 0, Matches: 0", self.rescore())
+
+    def test_dry_run_leaves_the_index_alone(self):
+        from skills.models import Skill
+        from .models import SkillIndexPosting
+
+        self.match("python and kubernetes engineer", "python, kubernetes")
+        self.match("k8s operator", "java")
+        Skill.objects.create(canonical_name="kubernetes", aliases=["k8s"])
+
+        out = self.rescore("--dry-run", "--rebuild-index")
+        self.assertIn("2 resumes, 1 job descriptions affected", out)
+        self.assertFalse(SkillIndexPosting.objects.exists())
+        self.assertIn("2 resumes, 1 job descriptions affected", self.rescore())
+
+    def test_unreadable_baseline_falls_back_to_master_skills(self):
+        from skills.catalog import builtin_catalog
+        from .rescoring import baseline_catalog
+
+        self.rescore()
+        with mock.patch("matcher.rescoring.get_document", return_value=None), \
+                self.assertLogs("matcher.rescoring", "WARNING"):
+            self.assertEqual(baseline_catalog(), builtin_catalog())
@@ -1,16 +1,21 @@
 from django.urls import path
-from .views import upload_resume_and_jd,result,download_report,resume_chatbot_api,resume_chatbot_page,chatbot_upload_extra_file,get_chat_history,get_session_messages,rename_chat,delete_chat
+from .views import upload_resume_and_jd,result,download_report,resume_chatbot_api,resume_chatbot_stream_api,resume_chatbot_page,chatbot_upload_extra_file,get_chat_history,get_session_messages,rename_chat,delete_chat,chat_cache_stats,export_reports,metrics,upload_resume_archive
 
 urlpatterns = [
     path("", upload_resume_and_jd, name="upload_resume"),
     path("result/", result, name="result"),
     path("download-report/", download_report, name="download_report"),
+    path("reports/export/", export_reports, name="export_reports"),
     path('chatbot/', resume_chatbot_page, name='resume_chatbot_page'),
     path('chatbot/api/',resume_chatbot_api, name='resume_chatbot_api'),
+    path('chatbot/api/stream/',resume_chatbot_stream_api, name='resume_chatbot_stream_api'),
     path('api/upload/', chatbot_upload_extra_file, name='chatbot_upload_extra'),
+    path("api/resumes/upload-zip/", upload_resume_archive, name="upload_resume_archive"),
     path('api/history/', get_chat_history, name='chat_history'),
     path('api/history/<int:session_id>/', get_session_messages, name='session_messages'),
     path("api/chat/<int:session_id>/rename/", rename_chat),
     path("api/chat/<int:session_id>/delete/", delete_chat),
+    path("api/chat/cache-stats/", chat_cache_stats, name="chat_cache_stats"),
+    path("metrics/", metrics, name="metrics"),
 
 ]
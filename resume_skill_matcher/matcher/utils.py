@@ -1,21 +1,18 @@
 # matcher/utils.py
 
-import pdfplumber
+import io
 import re
-import docx
 import os
-from dotenv import load_dotenv
-from skills.master_skills import MASTER_SKILLS
-from google import genai
+from skills.catalog import skill_patterns
+from django.conf import settings
+from chatbot.knowledge_index import guideline_context
+from chatbot.prompt_budget import Segment, fit_segments, trim_to_tokens
+from .rate_limit import RateLimited, acquire_llm_slot
 import time
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-# ---------------------------------------------------------
-# ENV SETUP
-# ---------------------------------------------------------
-load_dotenv()
-print("Gemini key loaded:", bool(os.environ.get("GEMINI_API_KEY")))
-print("Gemini SDK path:", genai.__file__)
+
+# pdfplumber, python-docx and google-genai are imported where they are
+# used: they cost seconds at import and most processes never need them.
+# The .env file is loaded once by settings.
 
 # ---------------------------------------------------------
 # ROLE KEYWORDS
@@ -58,33 +55,78 @@ ROLE_KEYWORDS = {
 # ---------------------------------------------------------
 # TEXT EXTRACTION
 # ---------------------------------------------------------
-def extract_text_from_pdf(file_path):
+def extract_text_from_pdf(file):
+    import pdfplumber
+
     text = ""
-    with pdfplumber.open(file_path) as pdf:
+    with pdfplumber.open(file) as pdf:
         for page in pdf.pages:
             page_text = page.extract_text()
             if page_text:
                 text += page_text + "\n"
+            # Drop the page's cached layout objects now rather than at close
+            page.close()
     return re.sub(r"\s+", " ", text.lower())
 
 
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+def normalize_text(text):
+    """Extracted documents are lowercase; pasted text must match them."""
+    return text.lower()
+
+
 def extract_text_from_file(file_path):
     ext = os.path.splitext(file_path)[1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file format: {ext}")
+
+    with open(file_path, "rb") as f:
+        return extract_text_from_stream(f, ext)
+
 
+def extract_text_from_stream(f, ext):
+    """Same as extract_text_from_file for a seekable binary file object."""
     if ext == ".pdf":
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(f)
 
     elif ext == ".docx":
-        doc = docx.Document(file_path)
-        return " ".join(p.text for p in doc.paragraphs).lower()
+        import docx
+
+        doc = docx.Document(f)
+        return normalize_text(" ".join(p.text for p in doc.paragraphs))
 
     elif ext == ".txt":
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read().lower()
+        wrapper = io.TextIOWrapper(f, encoding="utf-8", errors="ignore")
+        try:
+            return normalize_text(wrapper.read())
+        finally:
+            wrapper.detach()
 
     else:
         raise ValueError(f"Unsupported file format: {ext}")
 
+
+def extract_text_from_upload(uploaded):
+    """
+    Text of a Django UploadedFile, read from its in-memory buffer or
+    temporary file; nothing is written to MEDIA_ROOT.
+    """
+    ext = os.path.splitext(uploaded.name)[1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file format: {ext}")
+    uploaded.seek(0)
+    try:
+        return extract_text_from_stream(uploaded.file, ext)
+    finally:
+        uploaded.seek(0)
+
+
+def extract_text_from_bytes(data, ext):
+    """Text of an in-memory document, e.g. a ZIP member; picklable for process pools."""
+    return extract_text_from_stream(io.BytesIO(data), ext)
+
 # ---------------------------------------------------------
 # SKILL EXTRACTION
 # ---------------------------------------------------------
@@ -92,10 +134,9 @@ def extract_skills(text):
     found = set()
     text = text.lower()
 
-    for skill, aliases in MASTER_SKILLS.items():
-        for alias in aliases:
-            if re.search(r"\b" + re.escape(alias) + r"\b", text):
-                found.add(skill)
+    for skill, patterns in skill_patterns():
+        if any(pattern.search(text) for pattern in patterns):
+            found.add(skill)
 
     return list(found)
 
@@ -230,14 +271,13 @@ def ats_scorecard(resume_text, jd_text, resume_skills, jd_skills):
 # ---------------------------------------------------------
 # AI RECRUITER FEEDBACK (FINAL FIX)
 # ---------------------------------------------------------
-def recruiter_resume_feedback(resume_text, jd_text):
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        return "AI feedback unavailable: API key not configured."
+RECRUITER_FEEDBACK_BUSY_MESSAGE = (
+    "AI insights are currently busy. "
+    "Your resume analysis is complete. "
+    "Please retry AI feedback after a short break."
+)
 
-    client = genai.Client(api_key=api_key)
-
-    prompt = f"""
+RECRUITER_FEEDBACK_INSTRUCTIONS = """
     You are a senior technical recruiter.
     Review the resume against the job description.
     Provide actionable ATS-friendly improvement suggestions.
@@ -263,14 +303,50 @@ def recruiter_resume_feedback(resume_text, jd_text):
     - sentence
 
     Keep the response under 120 words.
+"""
+
+
+def recruiter_resume_feedback(resume_text, jd_text):
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        return "AI feedback unavailable: API key not configured."
+
+    from google import genai
+
+    # GEMINI_BASE_URL points the client at a stand-in (benchmarks/stubs.py)
+    http_options = {"base_url": settings.GEMINI_BASE_URL} if settings.GEMINI_BASE_URL else None
+    client = genai.Client(api_key=api_key, http_options=http_options)
+
+    # Most relevant ATS / resume guidelines for this JD (empty if none indexed)
+    guidelines = guideline_context(settings.KNOWLEDGE_INDEX_PATH, jd_text[:1200], k=settings.KNOWLEDGE_TOP_K)
+
+    # JD and resume share what the instructions leave, cut at sentence ends
+    parts = fit_segments([
+        Segment("instructions", RECRUITER_FEEDBACK_INSTRUCTIONS, fixed=True),
+        Segment("guidelines", guidelines, max_tokens=150),
+        Segment("jd", jd_text, max_tokens=400),
+        Segment("resume", resume_text, max_tokens=400),
+    ], total_tokens=settings.FEEDBACK_PROMPT_TOKEN_BUDGET, site="recruiter_feedback")
 
+    guideline_block = f"""
+    Base your suggestions on these guidelines where relevant:
+    {parts["guidelines"]}
+    """ if parts["guidelines"] else ""
+
+    prompt = f"""{RECRUITER_FEEDBACK_INSTRUCTIONS}{guideline_block}
     JOB DESCRIPTION:
-    {jd_text[:1200]}
+    {parts["jd"]}
 
     RESUME:
-    {resume_text[:1200]}
+    {parts["resume"]}
     """
 
+    # Shared Gemini quota across workers: skip calls that would be rejected anyway
+    try:
+        acquire_llm_slot("gemini")
+    except RateLimited:
+        return RECRUITER_FEEDBACK_BUSY_MESSAGE
+
     try:
         response = client.models.generate_content(
             model="gemini-1.5-flash",
@@ -280,15 +356,16 @@ def recruiter_resume_feedback(resume_text, jd_text):
 
     except Exception as e:
         print("Gemini error:", e)
-        return (
-            "AI insights are currently busy. "
-            "Your resume analysis is complete. "
-            "Please retry AI feedback after a short break."
-        )
+        return RECRUITER_FEEDBACK_BUSY_MESSAGE
 
 # utils.py
 
 def build_system_prompt(feature, resume_text, jd_text=None):
+    # Whole documents can be far larger than the model context
+    resume_text = trim_to_tokens(resume_text or "", settings.SYSTEM_PROMPT_DOC_TOKENS)
+    if jd_text:
+        jd_text = trim_to_tokens(jd_text, settings.SYSTEM_PROMPT_DOC_TOKENS)
+
     if feature == "analysis":
         return f"""
 You are a professional resume analyst.
@@ -1,35 +1,55 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
-from django.db.models import Avg
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.conf import settings
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Left
 from django.http import JsonResponse
 import json  
+import base64
+import hashlib
+import hmac
+import binascii
+from datetime import datetime
+from functools import partial
 import requests
+from urllib.parse import quote
 
-from .models import Resume, JobDescription, MatchAnalytics , ChatMessage , ChatSession
+from .models import MatchAnalytics , ChatMessage , ChatSession, ResumeMatchLog
 from .forms import ResumeJDCombinedForm
+from .chat_cache import answer_cache, make_answer_key
+from .rate_limit import RateLimited, acquire_llm_slot
+from .document_store import (
+    append_to_session,
+    get_document,
+    load_from_session,
+    load_parts,
+    store_in_session,
+)
+from .compaction import archived_messages_before, conversation_memory, maybe_compact
+from .analytics import dashboard_stats, record_match
+from .instrumentation import render_metrics, stage
+from .pipeline import analyze_texts, save_documents
 from .utils import (
-    extract_text_from_file,
-    extract_skills,     
-    calculate_match_score,
-    ats_scorecard,
-    detect_job_role,
-    detect_seniority,
-    extract_requirements,
-    requirement_match_score,
-    role_fit_score,
-    recruiter_resume_feedback,
+    extract_text_from_upload,
     build_system_prompt,
     
 )
 import logging
 logger = logging.getLogger(__name__)
-from .reports.pdf_report import generate_pdf_report
-from .reports.docx_report import generate_docx_report
+from .reports.render import REPORT_VERSIONS, write_report
+from .report_cache import get_report_cache, report_key
+from .bulk_export import stream_reports_zip
+from .zip_ingest import ArchiveRejected, ingest_archive
 from chatbot.context_builder import build_resume_context
 from chatbot.document_loader import load_document
 from chatbot.chatbot_engine import get_chatbot
 from chatbot.file_utils import save_file
+from chatbot.vector_store import chunk_document, select_context
+from chatbot.knowledge_index import guideline_context
+from chatbot.prompt_budget import Segment, fit_segments, prompt_size_stats
 
 
 @login_required
@@ -40,169 +60,53 @@ def upload_resume_and_jd(request):
 
         if form.is_valid():
 
-            # ---------- RESUME ----------
-            resume = Resume.objects.create(
-                user=request.user,
-                resume_file=form.cleaned_data["resume_file"]
-            )
-
-            resume_text = extract_text_from_file(resume.resume_file.path)
-            resume.extracted_text = resume_text
-            resume.save()
-
-            resume_skills = extract_skills(resume_text)
-            
-
-            # ---------- JOB DESCRIPTION ----------
-            jd = JobDescription.objects.create(
-                jd_file=form.cleaned_data["jd_file"]
-            )
+            # ---------- PARSE (straight from the upload, no disk round trip) ----------
+            resume_upload = form.cleaned_data["resume_file"]
+            jd_upload = form.cleaned_data["jd_file"]
+            try:
+                with stage("parse"):
+                    resume_text = extract_text_from_upload(resume_upload)
+                    jd_text = extract_text_from_upload(jd_upload)
+            except ValueError as e:
+                form.add_error(None, str(e))
+                return render(request, "upload_resume.html", {"form": form})
 
-            jd_text = extract_text_from_file(jd.jd_file.path)
-            jd.extracted_text = jd_text
-            jd.save()
-
-            jd_skills = extract_skills(jd_text)
-
-            # ---------- SKILL MATCH ----------
-            matched_skills = list(set(resume_skills) & set(jd_skills))
-            missing_skills = list(set(jd_skills) - set(resume_skills))
-            score = calculate_match_score(resume_skills, jd_skills)
-
-            score_breakdown = {
-                "total_jd_skills": len(jd_skills),
-                "matched_skills": len(matched_skills),
-                "missing_skills": len(missing_skills),
-            }
-
-            confidence_level = (
-                "High" if score >= 75 else
-                "Medium" if score >= 50 else
-                "Low"
-            )
-
-            # ---------- ROLE & LEVEL ----------
-            jd_role = detect_job_role(jd_text)
-            resume_role = detect_job_role(resume_text)
-
-            jd_level = detect_seniority(jd_text)
-            resume_level = detect_seniority(resume_text)
-
-            role_score = role_fit_score(jd_role, resume_role)
-
-            # ---------- REQUIREMENTS ----------
-            requirements = extract_requirements(jd_text)
-            req_match_score = requirement_match_score(resume_text, requirements)
-
-            # ---------- SECTION SCORES ----------
-            section_scores = {
-                "technical": min(100, score + 10),
-                "experience": score,
-                "ats": min(100, score + 20),
-            }
-
-            # ---------- WARNINGS ----------
-            warnings = []
-
-            if jd_role != resume_role:
-                warnings.append({
-                    "level": "critical",
-                    "message": f"Resume role does not match JD role ({resume_role} vs {jd_role})."
-                })
-
-            if jd_level != resume_level:
-                warnings.append({
-                    "level": "moderate",
-                    "message": f"Expected {jd_level} level but resume appears {resume_level}."
-                })
+            # ---------- ANALYSIS ----------
+            report_context = analyze_texts(resume_text, jd_text)
 
-            if req_match_score < 50:
-                warnings.append({
-                    "level": "warning",
-                    "message": "Less than 50% of job requirements are covered."
-                })
+            # ---------- STORE (after parsing; files optional) ----------
+            with stage("store"):
+                resume, jd = save_documents(request.user, resume_text, jd_text, resume_upload, jd_upload)
 
-            if not warnings:
-                warnings.append({
-                    "level": "success",
-                    "message": "Resume aligns well with the job description."
+            # ---------- SAVE SESSION ----------
+            # Large values go to the document store; the session keeps ids only
+            with stage("session"):
+                request.session["score"] = report_context["score"]
+                request.session.pop("skills", None)
+                request.session.pop("missing_skills", None)
+
+                # ---------- SAVE SESSION FOR CHATBOT ----------
+                store_in_session(request.session, "resume_analysis", {
+                    "skills": report_context["skills"],  # This is a list of strings
+                    "experience": resume_text[:3000], # Give it more text to read
+                    "education": "Included in resume",
+                    "ats_score": report_context["ats_scores"].get('overall', 0),
+                    "role": report_context["resume_role"]
                 })
-
-            # ---------- ATS SCORE ----------
-            ats_scores, ats_insights = ats_scorecard(
-                resume_text, jd_text, resume_skills, jd_skills
-            )
-
-            # ---------- AI FEEDBACK ----------
-            recruiter_feedback = recruiter_resume_feedback(resume_text, jd_text)
-            if not recruiter_feedback:
-                recruiter_feedback = (
-                    "Resume is relevant but can improve keyword alignment, impact statements, "
-                    "and clarity for better recruiter appeal."
+                # This line is crucial for the Greeting to work!
+                request.session["user_display_name"] = request.user.get_full_name() or request.user.username
+
+                #--------REPORT CALL---------
+                store_in_session(request.session, "report_context", report_context)
+                record_match(
+                    request.user, report_context["score"], report_id=request.session["report_context_id"],
+                    resume=resume, job_description=jd,
                 )
 
-            # ---------- SAVE SESSION ----------
-            request.session["score"] = score
-            request.session["skills"] = resume_skills
-            request.session["missing_skills"] = missing_skills
-
-            # ---------- SAVE SESSION FOR CHATBOT ----------
-            request.session["resume_analysis"] = {
-                "skills": resume_skills,  # This is a list of strings
-                "experience": resume_text[:3000], # Give it more text to read
-                "education": "Included in resume",
-                "ats_score": ats_scores.get('overall', 0),
-                "role": resume_role
-            }
-            # This line is crucial for the Greeting to work!
-            request.session["user_display_name"] = request.user.get_full_name() or request.user.username
-            
-
-            #--------REPORT CALL---------
-
-            report_context = {
-                "score": score,
-                "confidence_level": confidence_level,
-                "skills": resume_skills,
-                "missing_skills": missing_skills,
-                "score_breakdown": score_breakdown,
-                "section_scores": section_scores,
-                "jd_role": jd_role,
-                "resume_role": resume_role,
-                "role_fit_score": role_score,
-                "jd_level": jd_level,
-                "resume_level": resume_level,
-                "requirements": requirements,
-                "requirement_match_score": req_match_score,
-                "warnings": warnings,
-                "ats_scores": ats_scores,
-                "ats_insights": ats_insights,
-                "recruiter_feedback": recruiter_feedback,
-                
-            }
-            request.session["report_context"] = report_context
-
-
             # ---------- RENDER RESULT ----------
-            return render(request, "result.html", {
-                "score": score,
-                "confidence_level": confidence_level,
-                "skills": resume_skills,
-                "missing_skills": missing_skills,
-                "score_breakdown": score_breakdown,
-                "section_scores": section_scores,
-                "jd_role": jd_role,
-                "resume_role": resume_role,
-                "role_fit_score": role_score,
-                "jd_level": jd_level,
-                "resume_level": resume_level,
-                "requirements": requirements,
-                "requirement_match_score": req_match_score,
-                "warnings": warnings,
-                "ats_scores": ats_scores,
-                "ats_insights": ats_insights,
-                "recruiter_feedback": recruiter_feedback,
-            })
+            with stage("render"):
+                response = render(request, "result.html", report_context)
+            return response
 
     else:
         form = ResumeJDCombinedForm()
@@ -211,38 +115,114 @@ def upload_resume_and_jd(request):
 
 
 
+REPORT_FORMATS = {
+    "pdf": (partial(write_report, "pdf"), REPORT_VERSIONS["pdf"], "application/pdf"),
+    "docx": (
+        partial(write_report, "docx"),
+        REPORT_VERSIONS["docx"],
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ),
+}
+
+
 @login_required
 def download_report(request):
     format = request.GET.get("format", "pdf")
-    context = request.session.get("report_context")
+    with stage("session"):
+        context = load_from_session(request.session, "report_context")
 
     if not context:
         return HttpResponse("No report data found.", status=400)
+    if format not in REPORT_FORMATS:
+        return HttpResponse("Unsupported report format.", status=400)
+
+    render_report, version, content_type = REPORT_FORMATS[format]
+    cache = get_report_cache()
+    key = report_key(context, format, version)
+    etag = f'"{key}"'
+
+    # Same context + format + version always renders the same report,
+    # so a matching ETag needs neither a render nor a disk read
+    with stage("cache"):
+        hit = cache.lookup(key, format)
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(hit[1]) if hit else None
+    )
+    if not_modified is not None:
+        return not_modified
 
-    if format == "pdf":
-        response = HttpResponse(content_type="application/pdf")
-        response["Content-Disposition"] = 'attachment; filename="resume_report.pdf"'
-        generate_pdf_report(response, context)
-        return response
+    with stage("render"):
+        report, rendered_at = cache.open_or_render(key, format, lambda f: render_report(f, context))
 
-    elif format == "docx":
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        )
-        response["Content-Disposition"] = 'attachment; filename="resume_report.docx"'
-        generate_docx_report(response, context)
-        return response
+    response = FileResponse(
+        report,
+        as_attachment=True,
+        filename=f"resume_report.{format}",
+        content_type=content_type,
+    )
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(rendered_at)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @login_required
-def result(request):
-    avg_score = MatchAnalytics.objects.aggregate(avg=Avg("score"))["avg"]
-    avg_semantic = MatchAnalytics.objects.aggregate(avg=Avg("semantic_score"))["avg"]
+def export_reports(request):
+    """
+    ZIP of reports for several stored analyses: ?format=pdf|docx and
+    optionally ?ids=1,2,3 (match ids), otherwise the latest matches.
+    """
+    format = request.GET.get("format", "pdf")
+    if format not in REPORT_FORMATS:
+        return HttpResponse("Unsupported report format.", status=400)
+
+    logs = ResumeMatchLog.objects.filter(user=request.user, report__isnull=False)
+    ids = request.GET.get("ids")
+    if ids:
+        try:
+            logs = logs.filter(id__in=[int(i) for i in ids.split(",") if i.strip()])
+        except ValueError:
+            return HttpResponse("Invalid ids.", status=400)
+
+    logs = list(
+        logs.only("id", "created_at", "report_id")
+        .order_by("-created_at", "-id")[:settings.REPORT_EXPORT_MAX]
+    )
+    if not logs:
+        return HttpResponse("No stored reports found.", status=404)
 
-    return render(request, "analytics.html", {
-        "avg_score": round(avg_score or 0, 2),
-        "avg_semantic": round(avg_semantic or 0, 2),
-    })
+    response = StreamingHttpResponse(stream_reports_zip(logs, format), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="resume_reports_{format}.zip"'
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+@login_required
+def upload_resume_archive(request):
+    """
+    Imports a ZIP of resumes (multipart field "archive") as Resume rows;
+    returns counts plus the duplicate, skipped and failed member names.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Method not allowed"}, status=405)
+
+    archive = request.FILES.get("archive")
+    if archive is None:
+        return JsonResponse({"error": "No archive uploaded"}, status=400)
+
+    try:
+        with stage("ingest"):
+            summary = ingest_archive(request.user, archive)
+    except ArchiveRejected as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(summary)
+
+
+@login_required
+def result(request):
+    # Served from the rollup tables; cost doesn't grow with stored matches
+    return render(request, "analytics.html", dashboard_stats(request.user))
 
 @login_required
 def resume_chatbot_page(request):
@@ -250,14 +230,49 @@ def resume_chatbot_page(request):
     # We pull the data from the session that was set during the initial upload
     context = {
         "user_display_name": request.session.get("user_display_name", "Candidate"),
-        "resume_analysis": request.session.get("resume_analysis", {"role": "Professional"})
+        "resume_analysis": load_from_session(
+            request.session, "resume_analysis", {"role": "Professional"}
+        )
     }
     return render(request, "chatbot_interface.html", context)
 
 
-@login_required
-def resume_chatbot_api(request):
+# ---------------------------------------------------------
+# CHATBOT HELPERS
+# ---------------------------------------------------------
+# Bump whenever CHATBOT_SYSTEM_PROMPT changes so cached answers are not reused
+CHATBOT_SYSTEM_PROMPT_VERSION = 3
+CHATBOT_MAX_TOKENS = 800
+CHATBOT_BUSY_MESSAGE = "The assistant is handling a lot of questions right now. Please try again in a few seconds."
+CHATBOT_STOPPED_MESSAGE = "\n\nSorry, the AI server stopped responding."
+# Trailer chatbot/app.py (STREAM_ERROR_MARKER) sends when a stream fails midway
+CHATBOT_STREAM_ERROR_MARKER = "[stream error:"
+
+CHATBOT_SYSTEM_PROMPT = (
+    "You are a professional career assistant.\n\n"
+
+    "RULES:\n"
+    "1. Answer ONLY from the DOCUMENT CONTENT. Do NOT assume, infer, or add anything not written there.\n"
+    "2. If the answer is not in the document, reply exactly: "
+    "'The document does not contain this information.'\n"
+    "3. CAREER GUIDELINES, when present, are general advice you may use for suggestions. "
+    "Never present them as facts about the candidate.\n\n"
+
+    "STYLE:\n"
+    "- Markdown, ### section headings with an emoji, bullet points, bold key labels\n"
+    "- Concise, recruiter-ready, easy to scan; avoid long paragraphs\n"
+    "- Icons: ✅ strengths ❌ gaps ⚠️ warnings 📋 summaries 💼 experience 🎓 education "
+    "🔧 skills 📧 contact 🎯 goals 📍 location 📅 dates 💡 tips ⭐ highlights 🚀 projects\n\n"
+
+    "EXAMPLE:\n"
+    "### 💼 Work Experience\n"
+    "✅ **Current Role:** Senior Developer at ABC Corp\n"
+    "❌ **Gap:** No management certification mentioned"
+)
+
 
+def _parse_chat_request(request):
+    """Returns (user_query, session_id) or a JsonResponse on error."""
     if request.method != "POST":
         return JsonResponse({"error": "Method not allowed"}, status=405)
 
@@ -272,100 +287,134 @@ def resume_chatbot_api(request):
     if not user_query:
         return JsonResponse({"error": "Empty question"}, status=400)
 
-    # A️⃣ SESSION
+    return user_query, session_id
+
+
+def _get_or_create_chat_session(request, user_query, session_id):
+    # The chat remembers which uploaded documents it is about (by id)
+    document_ids = request.session.get("extra_chunks_ids") or []
+    document_id = request.session.get("extra_chunks_id")
+
     if not session_id:
-        session = ChatSession.objects.create(
+        return ChatSession.objects.create(
             user=request.user,
-            title=user_query[:30] + "..."
+            title=user_query[:30] + "...",
+            document_id=document_id,
+            document_ids=document_ids
         )
-        session_id = session.id
-    else:
-        session = ChatSession.objects.get(id=session_id, user=request.user)
 
-    # B️⃣ SAVE USER MSG
-    ChatMessage.objects.create(
-        session=session,
-        sender="user",
-        content=user_query
+    session = ChatSession.objects.get(id=session_id, user=request.user)
+    if document_ids and session.document_ids != document_ids:
+        session.document_ids = document_ids
+        session.save(update_fields=["document_ids"])
+    elif document_id and session.document_id != document_id:
+        session.document_id = document_id
+        session.save(update_fields=["document"])
+    return session
+
+
+def _document_context(request, user_query, session=None):
+    """
+    Only the uploaded chunks most relevant to the question are sent,
+    capped at CHATBOT_CONTEXT_CHAR_BUDGET characters.
+    A chat reopened later falls back to the documents it was started with.
+    """
+    document_ids = request.session.get("extra_chunks_ids")
+    if document_ids is None and session is not None and session.document_ids:
+        document_ids = session.document_ids
+
+    if document_ids is not None:
+        chunks = load_parts(document_ids)
+    else:
+        # Before per-upload parts, one combined copy of all chunks was stored
+        chunks = load_from_session(request.session, "extra_chunks")
+
+    if chunks is None and session is not None and session.document_id:
+        chunks = get_document(session.document_id)
+
+    if chunks is None:
+        # Sessions from before chunking kept one concatenated string.
+        extra_context = request.session.get("extra_context", "")
+        chunks = chunk_document(extra_context, "uploaded documents") if extra_context else []
+
+    return select_context(
+        chunks,
+        user_query,
+        char_budget=settings.CHATBOT_CONTEXT_CHAR_BUDGET,
+        top_k=settings.CHATBOT_CONTEXT_TOP_K,
     )
 
-    # C️⃣ DOCUMENT CONTEXT
-    extra_context = request.session.get("extra_context", "")
 
-    MAX_CHARS = 6000
-    if len(extra_context) > MAX_CHARS:
-        extra_context = extra_context[-MAX_CHARS:]
+def _guideline_context(user_query):
+    return guideline_context(
+        settings.KNOWLEDGE_INDEX_PATH, user_query, k=settings.KNOWLEDGE_TOP_K
+    )
 
-    system_prompt = (
-    "You are a professional career assistant.\n\n"
 
-    "IMPORTANT RULES:\n"
-    "1. Answer ONLY using the information present in the provided document.\n"
-    "2. Do NOT assume, infer, or add any information that is not explicitly written.\n"
-    "3. If the answer is not found in the document, reply exactly:\n"
-    "'The document does not contain this information.'\n\n"
-
-    "RESPONSE STYLE (MANDATORY):\n"
-    "- Use clear section headings (###) with relevant emojis\n"
-    "- Use bullet points for lists with appropriate icons\n"
-    "- Keep a clean, professional, ChatGPT-style structure\n"
-    "- Avoid long paragraphs unless necessary\n"
-    "- Be concise but complete\n"
-    "- Make responses visually engaging with emojis and symbols\n\n"
-
-    "FORMATTING GUIDELINES:\n"
-    "- Use Markdown formatting\n"
-    "- Group related information under meaningful headings with emojis\n"
-    "- Use bold text for key labels when appropriate\n"
-    "- Use visual indicators:\n"
-    "  ✅ for positive points, achievements, or confirmations\n"
-    "  ❌ for limitations, gaps, or things to avoid\n"
-    "  ⚠️ for warnings or important notes\n"
-    "  📋 for lists or summaries\n"
-    "  💼 for work experience\n"
-    "  🎓 for education\n"
-    "  🔧 for skills or tools\n"
-    "  📧 for contact information\n"
-    "  🎯 for goals or objectives\n"
-    "  📍 for location\n"
-    "  📅 for dates or timeline\n"
-    "  💡 for suggestions or tips\n"
-    "  ⭐ for highlights or key points\n"
-    "  🚀 for projects or achievements\n\n"
-
-    "EXAMPLE FORMAT:\n"
-    "### 💼 Work Experience\n"
-    "✅ **Current Role:** Senior Developer at ABC Corp\n"
-    "✅ **Key Achievement:** Led team of 5 developers\n"
-    "❌ **Gap:** No management certification mentioned\n\n"
+def _build_chat_payload(document_context, user_query, guidelines="", history=""):
+    parts = fit_segments([
+        Segment("system", CHATBOT_SYSTEM_PROMPT, fixed=True),
+        Segment("question", user_query, max_tokens=300, boundary="word"),
+        Segment("history", history, max_tokens=settings.CHAT_MEMORY_TOKENS, boundary="section", keep="tail"),
+        Segment("guidelines", guidelines, max_tokens=300),
+        Segment("document", document_context, boundary="section"),
+    ], total_tokens=settings.CHATBOT_PROMPT_TOKEN_BUDGET, site="chat")
 
-    "Your goal is to provide well-structured, visually appealing, recruiter-ready answers "
-    "that strictly reflect the document content while being easy to scan and understand."
-)
+    history_block = f"""
+CONVERSATION SO FAR:
+--------------------
+{parts["history"]}
+""" if parts["history"] else ""
 
+    guideline_block = f"""
+CAREER GUIDELINES:
+------------------
+{parts["guidelines"]}
+""" if parts["guidelines"] else ""
 
     final_prompt = f"""
 DOCUMENT CONTENT:
 ----------------
-{extra_context}
-
+{parts["document"]}
+{guideline_block}{history_block}
 USER QUESTION:
 --------------
-{user_query}
+{parts["question"]}
 """
 
-    # D️⃣ HF FASTAPI CALL
-    fastapi_url = "https://sk1354-llama3-career-api.hf.space/chat"
-
-    payload = {
+    return {
         "prompt": final_prompt,
-        "system_prompt": system_prompt,
-        "max_tokens": 800
+        "system_prompt": CHATBOT_SYSTEM_PROMPT,
+        "max_tokens": CHATBOT_MAX_TOKENS
     }
 
+
+def _chat_answer_key(document_context, user_query, guidelines="", history=""):
+    """
+    Answer-cache key for the first question of a chat, or None. Follow-ups
+    depend on that chat's conversation memory, which no other chat shares,
+    so caching them would only fill the cache with entries that never hit.
+    """
+    if history:
+        return None
+    return make_answer_key(
+        document_context + "\x00" + guidelines,
+        user_query,
+        CHATBOT_SYSTEM_PROMPT_VERSION,
+        CHATBOT_MAX_TOKENS
+    )
+
+
+def _fetch_chat_answer(payload):
+    """Returns (answer, cacheable); only real model answers are cacheable."""
+    try:
+        acquire_llm_slot("huggingface")
+    except RateLimited:
+        return CHATBOT_BUSY_MESSAGE, False
+
     try:
         response = requests.post(
-            fastapi_url,
+            settings.CHATBOT_API_URL,
             json=payload,
             timeout=90
         )
@@ -373,19 +422,56 @@ USER QUESTION:
         resp_json = response.json()
 
         if response.status_code == 200 and "answer" in resp_json:
-            bot_answer = resp_json["answer"]
-        else:
-            bot_answer = f"AI error: {resp_json}"
+            return resp_json["answer"], True
+        return f"AI error: {resp_json}", False
 
     except Exception as e:
-        bot_answer = "Sorry, I couldn't reach the AI server."
+        return "Sorry, I couldn't reach the AI server.", False
+
+
+@login_required
+def resume_chatbot_api(request):
+
+    parsed = _parse_chat_request(request)
+    if isinstance(parsed, JsonResponse):
+        return parsed
+    user_query, session_id = parsed
+
+    # A️⃣ SESSION (+ compact memory of the turns so far)
+    with stage("db"):
+        session = _get_or_create_chat_session(request, user_query, session_id)
+        session_id = session.id
+        history = conversation_memory(session)
+
+        # B️⃣ SAVE USER MSG
+        ChatMessage.objects.create(
+            session=session,
+            sender="user",
+            content=user_query
+        )
+
+    # C️⃣ DOCUMENT CONTEXT
+    with stage("context"):
+        document_context = _document_context(request, user_query, session)
+        guidelines = _guideline_context(user_query)
+        payload = _build_chat_payload(document_context, user_query, guidelines, history)
+
+    # D️⃣ HF FASTAPI CALL (first questions cached, one backend call per identical question)
+    with stage("llm"):
+        cache_key = _chat_answer_key(document_context, user_query, guidelines, history)
+        if cache_key is None:
+            bot_answer, _ = _fetch_chat_answer(payload)
+        else:
+            bot_answer = answer_cache.get_or_compute(cache_key, lambda: _fetch_chat_answer(payload))
 
     # E️⃣ SAVE BOT MSG
-    ChatMessage.objects.create(
-        session=session,
-        sender="bot",
-        content=bot_answer
-    )
+    with stage("db"):
+        ChatMessage.objects.create(
+            session=session,
+            sender="bot",
+            content=bot_answer
+        )
+        maybe_compact(session)
 
     return JsonResponse({
         "answer": bot_answer,
@@ -393,64 +479,343 @@ USER QUESTION:
         "new_title": session.title
     })
 
-    
+
 @login_required
-def chatbot_upload_extra_file(request):
-    print("--- DEBUG: upload_extra_file triggered ---")
+def resume_chatbot_stream_api(request):
+    """
+    Streaming variant of resume_chatbot_api.
+    Relays tokens from the FastAPI /chat/stream endpoint as they arrive.
+    The chat session id and title travel in response headers because
+    the body is the raw answer text.
+    """
+
+    parsed = _parse_chat_request(request)
+    if isinstance(parsed, JsonResponse):
+        return parsed
+    user_query, session_id = parsed
+
+    session = _get_or_create_chat_session(request, user_query, session_id)
+    history = conversation_memory(session)
+
+    ChatMessage.objects.create(
+        session=session,
+        sender="user",
+        content=user_query
+    )
+
+    document_context = _document_context(request, user_query, session)
+    guidelines = _guideline_context(user_query)
+    payload = _build_chat_payload(document_context, user_query, guidelines, history)
+    cache_key = _chat_answer_key(document_context, user_query, guidelines, history)
+    cached_answer = flight = None
+    if cache_key:
+        # Same single-flight as resume_chatbot_api: while an identical first
+        # question is being answered, wait for that answer instead of asking again
+        cached_answer, flight, leader = answer_cache.claim(cache_key)
+        if not leader and flight is not None:
+            cached_answer, flight = flight.wait(), None
+
+    if cached_answer is not None:
+        ChatMessage.objects.create(
+            session=session,
+            sender="bot",
+            content=cached_answer
+        )
+        return _chat_stream_response(iter([cached_answer]), session)
+
+    unavailable_message = "Sorry, I couldn't reach the AI server."
+    try:
+        acquire_llm_slot("huggingface")
+        upstream = requests.post(
+            settings.CHATBOT_STREAM_URL,
+            json=payload,
+            stream=True,
+            timeout=(10, 90)
+        )
+        upstream.raise_for_status()
+    except RateLimited:
+        upstream = None
+        unavailable_message = CHATBOT_BUSY_MESSAGE
+    except Exception:
+        upstream = None
+
+    def relay():
+        parts = []
+        completed = False
+        try:
+            if upstream is None:
+                parts.append(unavailable_message)
+                yield parts[-1]
+                return
+
+            for chunk in upstream.iter_content(chunk_size=None, decode_unicode=True):
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+
+            # A failed generation still ends the stream normally, with an error trailer
+            answer = "".join(parts)
+            if CHATBOT_STREAM_ERROR_MARKER in answer:
+                parts = [answer.split(CHATBOT_STREAM_ERROR_MARKER, 1)[0].rstrip(), CHATBOT_STOPPED_MESSAGE]
+                yield CHATBOT_STOPPED_MESSAGE
+            else:
+                completed = True
+        except Exception:
+            parts.append(CHATBOT_STOPPED_MESSAGE)
+            yield parts[-1]
+        finally:
+            if upstream is not None:
+                upstream.close()
+            bot_answer = "".join(parts)
+            if flight is not None:
+                answer_cache.finish(cache_key, flight, bot_answer, cacheable=completed and bool(bot_answer))
+            ChatMessage.objects.create(
+                session=session,
+                sender="bot",
+                content=bot_answer
+            )
+            maybe_compact(session)
+
+    response = _chat_stream_response(relay(), session)
+    if flight is not None:
+        # A body that is never iterated never runs relay()'s finally; don't leave followers waiting
+        response._resource_closers.append(
+            lambda: answer_cache.finish(cache_key, flight, CHATBOT_STOPPED_MESSAGE)
+        )
+    return response
 
+
+def _chat_stream_response(chunks, session):
+    response = StreamingHttpResponse(chunks, content_type="text/plain; charset=utf-8")
+    response["X-Chat-Session-Id"] = str(session.id)
+    response["X-Chat-Title"] = quote(session.title)
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def chat_cache_stats(request):
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Forbidden"}, status=403)
+    return JsonResponse(dict(answer_cache.stats(), prompt_sizes=prompt_size_stats()))
+
+
+def metrics(request):
+    """Prometheus scrape endpoint: bearer METRICS_TOKEN, or a staff session."""
+    token = settings.METRICS_TOKEN
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return HttpResponse("Forbidden", status=403)
+    elif not request.user.is_staff:
+        return HttpResponse("Forbidden", status=403)
+
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@login_required
+def chatbot_upload_extra_file(request):
     if request.method != "POST":
         return JsonResponse({"message": "Invalid request method."}, status=400)
 
     uploaded_files = request.FILES.getlist("files")
-    print(f"DEBUG: Number of files received: {len(uploaded_files)}")
 
     if not uploaded_files:
         return JsonResponse({"message": "No files uploaded."}, status=400)
 
     try:
-        combined_content = ""
+        new_chunks = []
         file_names = []
 
         for f in uploaded_files:
-            print(f"DEBUG: Processing file: {f.name}")
             path = save_file(f)
             docs = load_document(path)
             content = " ".join([doc.page_content for doc in docs])
 
-            combined_content += f"\n--- Document: {f.name} ---\n{content}\n"
+            new_chunks += chunk_document(content, f.name)
             file_names.append(f.name)
 
-        current_extra = request.session.get("extra_context", "")
-        request.session["extra_context"] = current_extra + combined_content
-        request.session.modified = True
-
-        print("DEBUG SUCCESS: Files processed and session updated.")
+        if "extra_chunks_ids" not in request.session:
+            # Documents an older session uploaded become its first part
+            if "extra_chunks_id" in request.session:
+                request.session["extra_chunks_ids"] = [request.session.pop("extra_chunks_id")]
+            elif request.session.get("extra_context"):
+                append_to_session(
+                    request.session, "extra_chunks",
+                    chunk_document(request.session["extra_context"], "uploaded documents"),
+                )
+        request.session.pop("extra_context", None)
+        append_to_session(request.session, "extra_chunks", new_chunks)
 
         return JsonResponse({
             "message": f"Successfully processed: {', '.join(file_names)}"
         })
 
     except Exception as e:
-        print("DEBUG EXCEPTION:", str(e))
+        logger.exception("Chatbot upload failed")
         return JsonResponse({"message": str(e)}, status=500)
 
 # 1. API to Get Sidebar History
+HISTORY_PAGE_SIZE = 30
+HISTORY_MAX_PAGE_SIZE = 100
+PREVIEW_CHARS = 80
+
+
+def _encode_history_cursor(session):
+    raw = json.dumps([int(session.pinned), session.created_at.isoformat(), session.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_history_cursor(cursor):
+    pinned, created_at, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return bool(pinned), datetime.fromisoformat(created_at), int(session_id)
+
+
+def _page_limit(request, default, maximum):
+    """?limit= capped at maximum; ValueError unless it is a whole number >= 1."""
+    limit = int(request.GET.get("limit", default))
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, maximum)
+
+
 @login_required
 def get_chat_history(request):
-    sessions = ChatSession.objects.filter(user=request.user).order_by('-created_at')
-    data = [{"id": s.id, "title": s.title} for s in sessions]
-    return JsonResponse(data, safe=False)
+    """
+    One page of the sidebar, pinned chats first and newest first.
+    Pass ?cursor=<next_cursor> for the following page; the keyset
+    filter keeps every page as cheap as the first.
+    """
+    try:
+        limit = _page_limit(request, HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "Invalid limit"}, status=400)
+
+    last_message = ChatMessage.objects.filter(session=OuterRef("pk")).order_by("-timestamp", "-id")
+
+    sessions = (
+        ChatSession.objects
+        .filter(user=request.user)
+        .annotate(
+            message_count=Count("messages") + F("archived_count"),
+            last_message=Left(Subquery(last_message.values("content")[:1]), PREVIEW_CHARS),
+        )
+        .order_by("-pinned", "-created_at", "-id")
+    )
+
+    cursor = request.GET.get("cursor")
+    if cursor:
+        try:
+            pinned, created_at, session_id = _decode_history_cursor(cursor)
+        except (ValueError, TypeError, binascii.Error):
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+
+        sessions = sessions.filter(
+            Q(pinned__lt=pinned)
+            | Q(pinned=pinned, created_at__lt=created_at)
+            | Q(pinned=pinned, created_at=created_at, id__lt=session_id)
+        )
+
+    page = list(sessions[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    data = [{
+        "id": s.id,
+        "title": s.title,
+        "pinned": s.pinned,
+        "created_at": s.created_at.isoformat(),
+        "message_count": s.message_count,
+        "last_message": s.last_message or "",
+    } for s in page]
+
+    return JsonResponse({
+        "sessions": data,
+        "next_cursor": _encode_history_cursor(page[-1]) if has_more else None,
+    })
 
 # 2. API to Load Specific Conversation
+MESSAGE_PAGE_SIZE = 50
+MESSAGE_MAX_PAGE_SIZE = 200
+
+
 @login_required
 def get_session_messages(request, session_id):
+    """
+    Newest messages of a chat, oldest first within the page.
+      ?before_id=<id>  older page, for scrolling back
+      ?after_id=<id>   only messages newer than the client already has
+      ?limit=<n>       page size
+    Responses carry an ETag, so an unchanged poll costs a 304.
+    """
     try:
-        session = ChatSession.objects.get(id=session_id, user=request.user)
-        messages = session.messages.all()
-        data = [{"sender": m.sender, "content": m.content} for m in messages]
-        return JsonResponse({"status": "ok", "messages": data})
+        session = ChatSession.objects.only("id", "archived_count").get(id=session_id, user=request.user)
     except ChatSession.DoesNotExist:
         return JsonResponse({"status": "error", "message": "Chat not found"}, status=404)
+
+    try:
+        limit = _page_limit(request, MESSAGE_PAGE_SIZE, MESSAGE_MAX_PAGE_SIZE)
+        before_id = int(request.GET["before_id"]) if request.GET.get("before_id") else None
+        after_id = int(request.GET["after_id"]) if request.GET.get("after_id") else None
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid paging parameters"}, status=400)
+
+    messages = ChatMessage.objects.filter(session=session)
+
+    # The conversation only changes when messages are added or removed
+    state = messages.aggregate(latest=Max("id"), total=Count("id"))
+    etag = '"{}"'.format(hashlib.sha1(
+        f"{session.id}:{state['latest']}:{state['total']}:{request.GET.urlencode()}".encode()
+    ).hexdigest())
+
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    def anchored(message_id, older):
+        anchor = ChatMessage.objects.filter(id=message_id, session=session).values("timestamp")[:1]
+        if older:
+            return Q(timestamp__lt=Subquery(anchor)) | Q(timestamp=Subquery(anchor), id__lt=message_id)
+        return Q(timestamp__gt=Subquery(anchor)) | Q(timestamp=Subquery(anchor), id__gt=message_id)
+
+    if after_id is not None:
+        page = list(
+            messages.filter(anchored(after_id, older=False))
+            .order_by("timestamp", "id")
+            .values("id", "sender", "content")[:limit + 1]
+        )
+        has_more = False
+        has_newer = len(page) > limit
+        page = page[:limit]
+    else:
+        if before_id is not None:
+            messages = messages.filter(anchored(before_id, older=True))
+        page = list(
+            messages.order_by("-timestamp", "-id")
+            .values("id", "sender", "content")[:limit + 1]
+        )
+        has_more = len(page) > limit
+        has_newer = False
+        page = page[:limit][::-1]
+
+        # Hot table exhausted: continue into the compacted archive
+        if not has_more and len(page) < limit and session.archived_count:
+            archive_anchor = page[0]["id"] if page else before_id
+            older, has_more = archived_messages_before(session, archive_anchor, limit - len(page))
+            page = older + page
+
+    response = JsonResponse({
+        "status": "ok",
+        "messages": page,
+        "has_more": has_more,
+        "has_newer": has_newer,
+        "latest_id": state["latest"],
+    })
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
     
 
 @login_required
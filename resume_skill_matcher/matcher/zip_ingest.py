@@ -0,0 +1,236 @@
+# matcher/zip_ingest.py
+
+import atexit
+import hashlib
+import logging
+import os
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from .models import Resume
+from .utils import SUPPORTED_EXTENSIONS, extract_text_from_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveRejected(Exception):
+    """The upload is not a ZIP, or breaks one of the ZIP_UPLOAD_* limits."""
+
+
+# ---------------------------------------------------------
+# WORKER POOL
+# ---------------------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process pool shared by all imports in this worker, or None to extract inline."""
+    global _pool
+    workers = settings.ZIP_UPLOAD_WORKERS
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def discard_pool(pool):
+    """
+    Drops a pool that lost a worker (BrokenProcessPool); a broken pool
+    rejects all further work, so the next get_pool() starts a new one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(pool, data, ext):
+    if pool is not None:
+        return pool.submit(extract_text_from_bytes, data, ext)
+    future = Future()
+    try:
+        future.set_result(extract_text_from_bytes(data, ext))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+# ---------------------------------------------------------
+# ARCHIVE
+# ---------------------------------------------------------
+def _ignored(name):
+    base = os.path.basename(name)
+    return name.startswith("__MACOSX/") or base.startswith(".") or not base
+
+
+def check_archive(archive):
+    """
+    Validates the central directory before anything is read. The sizes
+    checked here are binding: zipfile stops at a member's declared size
+    and fails its CRC check if the data does not match.
+
+    Returns (members to import, names skipped as unsupported).
+    """
+    members, skipped = [], []
+    total = 0
+    for info in archive.infolist():
+        if info.is_dir() or _ignored(info.filename):
+            continue
+        if os.path.splitext(info.filename)[1].lower() not in SUPPORTED_EXTENSIONS:
+            skipped.append(info.filename)
+            continue
+
+        if info.file_size > settings.ZIP_UPLOAD_MAX_MEMBER_BYTES:
+            raise ArchiveRejected(f"{info.filename} is larger than {settings.ZIP_UPLOAD_MAX_MEMBER_BYTES} bytes")
+        if info.file_size > max(info.compress_size, 1) * settings.ZIP_UPLOAD_MAX_RATIO:
+            raise ArchiveRejected(f"{info.filename} has a suspicious compression ratio")
+        total += info.file_size
+        members.append(info)
+
+    if len(members) > settings.ZIP_UPLOAD_MAX_MEMBERS:
+        raise ArchiveRejected(f"Archive has {len(members)} resumes; the limit is {settings.ZIP_UPLOAD_MAX_MEMBERS}")
+    if total > settings.ZIP_UPLOAD_MAX_TOTAL_BYTES:
+        raise ArchiveRejected(f"Archive expands to {total} bytes; the limit is {settings.ZIP_UPLOAD_MAX_TOTAL_BYTES}")
+    return members, skipped
+
+
+def _read_member(archive, info):
+    """Member bytes, streamed from the archive without touching disk."""
+    with archive.open(info) as member:
+        return member.read(settings.ZIP_UPLOAD_MAX_MEMBER_BYTES + 1)
+
+
+# ---------------------------------------------------------
+# IMPORT
+# ---------------------------------------------------------
+def ingest_archive(user, fileobj):
+    """
+    Imports every resume in a ZIP for user. Members are deduplicated by
+    sha256 (within the archive and against the user's earlier imports),
+    parsed in the process pool and bulk-inserted in batches of
+    ZIP_UPLOAD_BATCH_SIZE, one transaction per batch. A member's bytes
+    are written out (or dropped) as soon as it is parsed, so only the
+    parse window holds raw documents.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except (zipfile.BadZipFile, OSError) as e:
+        raise ArchiveRejected(f"Not a valid ZIP archive: {e}")
+
+    with archive:
+        members, skipped = check_archive(archive)
+        summary = {"imported": 0, "resume_ids": [], "duplicates": [], "skipped": skipped, "errors": []}
+
+        seen = set(
+            Resume.objects.filter(user=user).exclude(content_hash="").values_list("content_hash", flat=True)
+        )
+        parsing = {}   # digest -> names of identical members waiting on its parse
+        pool = get_pool()
+        window = 2 * max(1, settings.ZIP_UPLOAD_WORKERS)
+        pending = deque()
+        batch = []
+
+        def collect(name, data, digest, future, source):
+            copies = parsing.pop(digest)
+            try:
+                text = future.result()
+            except Exception as e:
+                # Identical members would fail the same way: they are errors, not duplicates
+                error = f"{type(e).__name__}: {e}"
+                summary["errors"] += [{"file": n, "error": error} for n in [name] + copies]
+                if isinstance(e, BrokenProcessPool):
+                    discard_pool(source)
+                return
+            seen.add(digest)
+            summary["duplicates"] += copies
+            batch.append((digest, text, _store_file(name, data)))
+            if len(batch) >= settings.ZIP_UPLOAD_BATCH_SIZE:
+                _save_batch(user, batch, summary)
+
+        try:
+            for info in members:
+                try:
+                    data = _read_member(archive, info)
+                except (zipfile.BadZipFile, RuntimeError, OSError) as e:
+                    # corrupt data, CRC mismatch or an encrypted member
+                    summary["errors"].append({"file": info.filename, "error": str(e)})
+                    continue
+
+                digest = hashlib.sha256(data).hexdigest()
+                if digest in seen:
+                    summary["duplicates"].append(info.filename)
+                    continue
+                if digest in parsing:
+                    parsing[digest].append(info.filename)
+                    continue
+                parsing[digest] = []
+
+                ext = os.path.splitext(info.filename)[1].lower()
+                try:
+                    future = _submit(pool, data, ext)
+                except BrokenProcessPool:
+                    # A worker died during an earlier import: retry on a fresh pool
+                    discard_pool(pool)
+                    pool = get_pool()
+                    future = _submit(pool, data, ext)
+                pending.append((info.filename, data, digest, future, pool))
+                while len(pending) >= window:
+                    collect(*pending.popleft())
+
+            while pending:
+                collect(*pending.popleft())
+            _save_batch(user, batch, summary)
+        except BaseException:
+            # Files of a batch that never made it into the database
+            _delete_files(stored for _, _, stored in batch)
+            raise
+
+    return summary
+
+
+def _store_file(name, data):
+    """Storage name of the member's saved file, or "" when STORE_UPLOADED_FILES is off."""
+    if not settings.STORE_UPLOADED_FILES:
+        return ""
+    field = Resume._meta.get_field("resume_file")
+    return field.storage.save(field.generate_filename(None, os.path.basename(name)), ContentFile(data))
+
+
+def _delete_files(names):
+    storage = Resume._meta.get_field("resume_file").storage
+    for name in names:
+        if name:
+            storage.delete(name)
+
+
+def _save_batch(user, batch, summary):
+    """
+    Inserts one batch of parsed resumes. Their files were stored as they
+    were parsed; if the insert fails the caller deletes them, so a
+    rolled-back batch leaves no orphaned files.
+    """
+    if not batch:
+        return
+
+    rows = [
+        Resume(user=user, resume_file=stored, extracted_text=text, content_hash=digest)
+        for digest, text, stored in batch
+    ]
+    with transaction.atomic():
+        created = Resume.objects.bulk_create(rows)
+
+    summary["imported"] += len(created)
+    summary["resume_ids"] += [resume.pk for resume in created if resume.pk is not None]
+    batch.clear()
@@ -17,10 +17,101 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Empty = Google's endpoint; load tests point this at benchmarks/stubs.py
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "")
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Chatbot FastAPI service (chatbot/app.py)
+CHATBOT_API_URL = os.getenv("CHATBOT_API_URL", "https://sk1354-llama3-career-api.hf.space/chat")
+CHATBOT_STREAM_URL = os.getenv("CHATBOT_STREAM_URL", CHATBOT_API_URL.rstrip("/") + "/stream")
+
+# Per-process answer cache for repeated chatbot questions
+CHATBOT_ANSWER_CACHE_SIZE = int(os.getenv("CHATBOT_ANSWER_CACHE_SIZE", "512"))
+CHATBOT_ANSWER_CACHE_TTL = int(os.getenv("CHATBOT_ANSWER_CACHE_TTL", "3600"))
+
+# Retrieval over uploaded chatbot documents (chatbot/vector_store.py)
+CHATBOT_CONTEXT_CHAR_BUDGET = int(os.getenv("CHATBOT_CONTEXT_CHAR_BUDGET", "3000"))
+CHATBOT_CONTEXT_TOP_K = int(os.getenv("CHATBOT_CONTEXT_TOP_K", "6"))
+
+# Guideline snippets from chatbot/chatbot-data (built by build_knowledge_index)
+KNOWLEDGE_INDEX_PATH = os.getenv("KNOWLEDGE_INDEX_PATH", str(BASE_DIR / "chatbot" / "knowledge.bm25"))
+KNOWLEDGE_TOP_K = int(os.getenv("KNOWLEDGE_TOP_K", "3"))
+
+# Prompt token budgets (chatbot/prompt_budget.py)
+CHATBOT_PROMPT_TOKEN_BUDGET = int(os.getenv("CHATBOT_PROMPT_TOKEN_BUDGET", "1600"))
+FEEDBACK_PROMPT_TOKEN_BUDGET = int(os.getenv("FEEDBACK_PROMPT_TOKEN_BUDGET", "1000"))
+SYSTEM_PROMPT_DOC_TOKENS = int(os.getenv("SYSTEM_PROMPT_DOC_TOKENS", "1500"))
+
+# Outbound LLM quotas shared by all workers on this host (matcher/rate_limit.py).
+# max_wait is how long a call may queue before it is rejected without being sent.
+LLM_RATE_LIMITS = {
+    "gemini": {
+        "per_minute": int(os.getenv("GEMINI_CALLS_PER_MINUTE", "15")),
+        "burst": int(os.getenv("GEMINI_BURST", "3")),
+        "max_wait": float(os.getenv("GEMINI_MAX_WAIT", "5")),
+    },
+    "huggingface": {
+        "per_minute": int(os.getenv("HF_CALLS_PER_MINUTE", "60")),
+        "burst": int(os.getenv("HF_BURST", "5")),
+        "max_wait": float(os.getenv("HF_MAX_WAIT", "10")),
+    },
+}
+LLM_RATE_LIMIT_DIR = os.getenv("LLM_RATE_LIMIT_DIR", "")
+
+# Rendered PDF/DOCX reports (matcher/report_cache.py); empty dir = system temp
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", "")
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# Bulk ZIP export (matcher/bulk_export.py); 0 workers renders in the request thread
+REPORT_EXPORT_WORKERS = int(os.getenv("REPORT_EXPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+REPORT_EXPORT_MAX = int(os.getenv("REPORT_EXPORT_MAX", "500"))
+
+# Keep uploaded resume/JD files in MEDIA_ROOT (text is always stored);
+# the JSON match API caps decoded base64 documents at MATCH_API_MAX_DOCUMENT_BYTES
+STORE_UPLOADED_FILES = os.getenv("STORE_UPLOADED_FILES", "1") == "1"
+MATCH_API_MAX_DOCUMENT_BYTES = int(os.getenv("MATCH_API_MAX_DOCUMENT_BYTES", str(10 * 1024 * 1024)))
+
+# Seconds a worker keeps its copy of the skill catalog (MASTER_SKILLS + Skill
+# rows) before re-reading it; run rescore_skills after changing the catalog
+SKILL_CATALOG_TTL = int(os.getenv("SKILL_CATALOG_TTL", "60"))
+
+# Bulk resume ZIP uploads (matcher/zip_ingest.py); 0 workers extracts in the request thread
+ZIP_UPLOAD_MAX_MEMBERS = int(os.getenv("ZIP_UPLOAD_MAX_MEMBERS", "1000"))
+ZIP_UPLOAD_MAX_TOTAL_BYTES = int(os.getenv("ZIP_UPLOAD_MAX_TOTAL_BYTES", str(500 * 1024 * 1024)))
+ZIP_UPLOAD_MAX_MEMBER_BYTES = int(os.getenv("ZIP_UPLOAD_MAX_MEMBER_BYTES", str(20 * 1024 * 1024)))
+ZIP_UPLOAD_MAX_RATIO = int(os.getenv("ZIP_UPLOAD_MAX_RATIO", "100"))
+ZIP_UPLOAD_WORKERS = int(os.getenv("ZIP_UPLOAD_WORKERS", str(min(4, os.cpu_count() or 1))))
+ZIP_UPLOAD_BATCH_SIZE = int(os.getenv("ZIP_UPLOAD_BATCH_SIZE", "100"))
+
+# Shared sentence-transformer server (matcher/embeddings.py, run_embedding_server);
+# empty socket = system temp dir
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_SOCKET = os.getenv("EMBEDDING_SOCKET", "")
+EMBEDDING_TIMEOUT = float(os.getenv("EMBEDDING_TIMEOUT", "10"))
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+
+# Chat compaction (matcher/compaction.py): past the threshold, all but the
+# newest CHAT_KEEP_RECENT messages are summarized and archived
+CHAT_COMPACT_THRESHOLD = int(os.getenv("CHAT_COMPACT_THRESHOLD", "100"))
+CHAT_KEEP_RECENT = int(os.getenv("CHAT_KEEP_RECENT", "40"))
+CHAT_SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "400"))
+CHAT_MEMORY_TOKENS = int(os.getenv("CHAT_MEMORY_TOKENS", "300"))
+
+# Server-Timing headers and /metrics (matcher/instrumentation.py);
+# without a token /metrics is staff-only
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "1") == "1"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# On-demand request profiling (matcher/profiling.py): staff send X-Profile: 1,
+# others need X-Profile-Token; empty dir = system temp
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "1") == "1"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_DIR = os.getenv("PROFILING_DIR", "")
+PROFILING_KEEP = int(os.getenv("PROFILING_KEEP", "50"))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
@@ -73,6 +164,7 @@ LOGIN_URL = "/accounts/login/"
 
 
 MIDDLEWARE = [
+    'matcher.instrumentation.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,6 +173,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'matcher.profiling.ProfilingMiddleware',
 ]
 
 
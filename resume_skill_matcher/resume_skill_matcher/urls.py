@@ -24,6 +24,7 @@ urlpatterns = [
     path('accounts/', include('allauth.urls')),
     path('', include('matcher.urls')),
     path("api/skills/", include("skills.api.urls")),
+    path("api/match/", include("matcher.api.urls")),
     path("skills/", include("skills.urls")),
     
 
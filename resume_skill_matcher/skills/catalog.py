@@ -0,0 +1,77 @@
+import re
+import threading
+import time
+
+from django.conf import settings
+
+from skills.master_skills import MASTER_SKILLS
+from skills.models import Skill
+
+
+def builtin_catalog():
+    """MASTER_SKILLS as a catalog: {canonical name: sorted aliases}."""
+    return {skill: sorted(set(aliases)) for skill, aliases in MASTER_SKILLS.items()}
+
+
+def load_catalog():
+    """
+    The skill catalog the matcher scores with: MASTER_SKILLS plus every
+    Skill row (its canonical name and aliases), read fresh from the DB.
+    """
+    catalog = {skill: set(aliases) for skill, aliases in MASTER_SKILLS.items()}
+    for name, aliases in Skill.objects.values_list("canonical_name", "aliases"):
+        # import_skills stores a list; older rows may hold "a|b" strings
+        if isinstance(aliases, str):
+            aliases = aliases.split("|")
+        names = {name.strip().lower()} | {a.strip().lower() for a in aliases or () if a.strip()}
+        catalog.setdefault(name.strip().lower(), set()).update(names)
+    return {skill: sorted(aliases) for skill, aliases in catalog.items()}
+
+
+def alias_pattern(alias):
+    return re.compile(r"\b" + re.escape(alias) + r"\b")
+
+
+# ---------------------------------------------------------
+# PROCESS CACHE
+# ---------------------------------------------------------
+# Reloaded every SKILL_CATALOG_TTL seconds, so admin edits and
+# import_skills reach running workers without a restart.
+_state = {"catalog": None, "patterns": None, "loaded_at": 0.0, "pinned": False}
+_lock = threading.Lock()
+
+
+def _install(catalog, pinned=False):
+    patterns = [
+        (skill, [alias_pattern(alias) for alias in aliases])
+        for skill, aliases in catalog.items()
+    ]
+    _state.update(catalog=catalog, patterns=patterns, loaded_at=time.monotonic(), pinned=pinned)
+
+
+def _current():
+    with _lock:
+        fresh = time.monotonic() - _state["loaded_at"] < settings.SKILL_CATALOG_TTL
+        if _state["patterns"] is None or not (_state["pinned"] or fresh):
+            _install(load_catalog())
+        return _state
+
+
+def get_catalog():
+    return _current()["catalog"]
+
+
+def skill_patterns():
+    """[(canonical name, [compiled alias patterns])] for the current catalog."""
+    return _current()["patterns"]
+
+
+def use_catalog(catalog):
+    """Pins this process to catalog (no DB reads), e.g. in pool workers."""
+    with _lock:
+        _install(catalog, pinned=True)
+
+
+def invalidate_catalog():
+    with _lock:
+        _state.update(catalog=None, patterns=None, loaded_at=0.0, pinned=False)
@@ -21,7 +21,9 @@ def extract_skills_from_text(text: str, threshold=0.85):
     for skill in skills:
         candidates = [skill.canonical_name]
         if skill.aliases:
-            candidates += skill.aliases.split("|")
+            # import_skills stores a list; older rows may hold "a|b" strings
+            aliases = skill.aliases
+            candidates += aliases.split("|") if isinstance(aliases, str) else aliases
 
         for candidate in candidates:
             candidate = candidate.strip()